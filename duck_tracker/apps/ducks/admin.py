@@ -1,7 +1,10 @@
 from django.contrib import admin
 
 from .models import Flock
+from .models import FlockSummary
 from .models import Stats
+from .models import StatsExportJob
+from .models import StatsImportJob
 
 
 @admin.register(Flock)
@@ -25,3 +28,33 @@ class StatsAdmin(admin.ModelAdmin):
     search_fields = ("flock__title",)
     list_filter = ("date",)
     ordering = ("flock", "day")
+
+    def delete_queryset(self, request, queryset):
+        # Queryset deletes bypass Stats.delete, so recount the touched flocks.
+        flock_ids = set(queryset.values_list("flock_id", flat=True))
+        super().delete_queryset(request, queryset)
+        FlockSummary.objects.rebuild(Flock.objects.filter(pk__in=flock_ids))
+
+
+@admin.register(StatsImportJob)
+class StatsImportJobAdmin(admin.ModelAdmin):
+    list_display = (
+        "pk",
+        "flock",
+        "status",
+        "total_rows",
+        "rows_done",
+        "rows_failed",
+        "created_at",
+    )
+    list_filter = ("status",)
+    list_select_related = ("flock",)
+    readonly_fields = ("errors", "started_at", "finished_at")
+
+
+@admin.register(StatsExportJob)
+class StatsExportJobAdmin(admin.ModelAdmin):
+    list_display = ("pk", "status", "rows_done", "size", "duration", "created_at")
+    list_filter = ("status",)
+    filter_horizontal = ("flocks",)
+    readonly_fields = ("errors", "started_at", "finished_at")
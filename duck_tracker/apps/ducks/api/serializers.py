@@ -0,0 +1,229 @@
+import copy
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Max
+from rest_framework import serializers
+
+from apps.ducks.models import Flock
+from apps.ducks.models import Stats
+from apps.ducks.validators import validate_flock_dates
+from apps.ducks.validators import validate_stats_entry
+from apps.ducks.validators import validate_stats_import_row
+
+
+def run_model_validation(instance, validator):
+    """Run one of ``apps.ducks.validators`` and report its errors the DRF way."""
+    try:
+        validator(instance)
+    except DjangoValidationError as e:
+        raise serializers.ValidationError(serializers.as_serializer_error(e)) from e
+
+
+class SparseFieldsetMixin:
+    """Only render the fields listed in ``?fields=a,b`` (reads only)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        if request is None or request.method != "GET":
+            return
+
+        wanted = request.query_params.get("fields")
+        if not wanted:
+            return
+
+        names = {name.strip() for name in wanted.split(",")}
+        for name in set(self.fields) - names:
+            self.fields.pop(name)
+
+
+class DateRangeSerializer(serializers.Serializer):
+    """``?start_date=&end_date=`` of the list endpoints."""
+
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        start_date = attrs.get("start_date")
+        end_date = attrs.get("end_date")
+        if start_date and end_date and end_date < start_date:
+            raise serializers.ValidationError(
+                {"end_date": "End date cannot be before the start date."},
+            )
+        return attrs
+
+
+class FlockSerializer(SparseFieldsetMixin, serializers.ModelSerializer[Flock]):
+    stats_count = serializers.IntegerField(read_only=True)
+    total_harvested = serializers.IntegerField(read_only=True)
+    average_percentage = serializers.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        read_only=True,
+    )
+    total_mortality = serializers.IntegerField(read_only=True)
+    total_feed_consumed = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Flock
+        fields = [
+            "url",
+            "id",
+            "title",
+            "number_of_ducks",
+            "description",
+            "started_date",
+            "culled_date",
+            "is_culled",
+            "last_day",
+            "updated_at",
+            "stats_count",
+            "total_harvested",
+            "average_percentage",
+            "total_mortality",
+            "total_feed_consumed",
+        ]
+        read_only_fields = ["is_culled", "last_day", "updated_at"]
+        extra_kwargs = {
+            "url": {"view_name": "api:flock-detail"},
+        }
+
+    def validate(self, attrs):
+        flock = copy.copy(self.instance) if self.instance else Flock()
+        for name, value in attrs.items():
+            setattr(flock, name, value)
+        run_model_validation(flock, validate_flock_dates)
+        return attrs
+
+
+class FlockField(serializers.PrimaryKeyRelatedField):
+    """Takes flocks from the batch prefetched by ``StatsListSerializer``."""
+
+    def to_internal_value(self, data):
+        flocks = getattr(self.root, "flocks", None)
+        if flocks is not None:
+            try:
+                return flocks[int(data)]
+            except (KeyError, TypeError, ValueError):
+                pass  # let the default lookup produce the error message
+        return super().to_internal_value(data)
+
+
+class StatsListSerializer(serializers.ListSerializer):
+    """Validates a batch of new daily entries together and inserts it at once.
+
+    Flocks, already recorded dates and each flock's last date are read
+    with three queries for the whole batch; every entry is then checked in
+    memory, in date order per flock, with the rules of the CSV import.
+    Errors come back as a list with one (possibly empty) dict per entry.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            flock_ids = set()
+            for item in data:
+                try:
+                    flock_ids.add(int(item.get("flock")))
+                except (AttributeError, TypeError, ValueError):
+                    continue
+            self.flocks = Flock.objects.in_bulk(flock_ids)
+
+        entries = super().to_internal_value(data)
+        self.validate_batch(entries)
+        return entries
+
+    def validate_batch(self, entries):
+        flock_ids = {entry["flock"].pk for entry in entries}
+        known_dates = defaultdict(set)
+        recorded = Stats.objects.filter(
+            flock_id__in=flock_ids,
+            date__in={entry["date"] for entry in entries},
+        ).values_list("flock_id", "date")
+        for flock_id, recorded_date in recorded:
+            known_dates[flock_id].add(recorded_date)
+        last_dates = dict(
+            Stats.objects.filter(flock_id__in=flock_ids)
+            .order_by()
+            .values("flock_id")
+            .annotate(last_date=Max("date"))
+            .values_list("flock_id", "last_date"),
+        )
+
+        errors = [{} for _ in entries]
+        for index in sorted(range(len(entries)), key=lambda i: entries[i]["date"]):
+            entry = entries[index]
+            flock_id = entry["flock"].pk
+            try:
+                validate_stats_import_row(
+                    entry,
+                    entry["flock"],
+                    known_dates=known_dates[flock_id],
+                    last_date=last_dates.get(flock_id),
+                )
+            except DjangoValidationError as e:
+                errors[index] = e.message_dict
+                continue
+            known_dates[flock_id].add(entry["date"])
+            last_date = last_dates.get(flock_id, entry["date"])
+            last_dates[flock_id] = max(last_date, entry["date"])
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+
+    def create(self, validated_data):
+        """Insert the entries (days in date order) in one transaction per flock.
+
+        Call inside ``transaction.atomic`` to make the whole batch atomic.
+        """
+        instances = [self.child.Meta.model(**attrs) for attrs in validated_data]
+        batches = defaultdict(list)
+        for instance in sorted(instances, key=lambda instance: instance.date):
+            batches[instance.flock].append(instance)
+        for flock, batch in batches.items():
+            Stats.objects.bulk_insert(flock, batch)
+        return instances
+
+
+class StatsSerializer(SparseFieldsetMixin, serializers.ModelSerializer[Stats]):
+    flock = FlockField(queryset=Flock.objects.all())
+
+    class Meta:
+        model = Stats
+        fields = [
+            "url",
+            "id",
+            "flock",
+            "day",
+            "date",
+            "harvested",
+            "percentage",
+            "mortality",
+            "feed_consumed",
+            "notes",
+            "updated_at",
+        ]
+        read_only_fields = ["day", "percentage", "updated_at"]
+        # (flock, date) is checked per batch and enforced by the database.
+        validators = []
+        list_serializer_class = StatsListSerializer
+        extra_kwargs = {
+            "url": {"view_name": "api:stats-detail"},
+        }
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.instance is not None:
+            # A row keeps its flock: its day is a slot in that flock's numbering.
+            fields["flock"] = FlockField(read_only=True)
+        return fields
+
+    def validate(self, attrs):
+        if self.parent is not None:
+            return attrs  # StatsListSerializer validates the batch
+
+        stats = copy.copy(self.instance) if self.instance else Stats()
+        for name, value in attrs.items():
+            setattr(stats, name, value)
+        run_model_validation(stats, validate_stats_entry)
+        return attrs
@@ -0,0 +1,138 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import Q
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+from rest_framework.serializers import as_serializer_error
+from rest_framework.viewsets import ModelViewSet
+
+from apps.ducks.models import Flock
+from apps.ducks.models import Stats
+
+from .serializers import DateRangeSerializer
+from .serializers import FlockSerializer
+from .serializers import StatsSerializer
+
+STATS_BULK_MAX_SIZE = 1000
+
+
+class FlockCursorPagination(CursorPagination):
+    ordering = ("started_date", "id")
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+
+class StatsCursorPagination(CursorPagination):
+    ordering = ("date", "id")
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+
+class DateRangeMixin:
+    def get_date_range(self):
+        serializer = DateRangeSerializer(data=self.request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        return data.get("start_date"), data.get("end_date")
+
+
+class ModelValidationMixin:
+    """Report ``ValidationError``s raised by model saves as 400s."""
+
+    def perform_update(self, serializer):
+        try:
+            super().perform_update(serializer)
+        except DjangoValidationError as e:
+            raise ValidationError(as_serializer_error(e)) from e
+
+    def perform_destroy(self, instance):
+        try:
+            super().perform_destroy(instance)
+        except DjangoValidationError as e:
+            raise ValidationError(as_serializer_error(e)) from e
+
+
+class FlockViewSet(DateRangeMixin, ModelValidationMixin, ModelViewSet):
+    """Flocks with their summary totals.
+
+    ``?start_date=&end_date=`` keeps the flocks active at some point of the
+    range (started by its end, not culled before its start).
+    """
+
+    serializer_class = FlockSerializer
+    queryset = Flock.objects.select_related("summary")
+    pagination_class = FlockCursorPagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action != "list":
+            return queryset
+
+        start_date, end_date = self.get_date_range()
+        if start_date:
+            queryset = queryset.filter(
+                Q(culled_date__isnull=True) | Q(culled_date__gte=start_date),
+            )
+        if end_date:
+            queryset = queryset.filter(started_date__lte=end_date)
+        return queryset
+
+
+class StatsViewSet(DateRangeMixin, ModelValidationMixin, ModelViewSet):
+    """Daily stats, filtered by ``?flock=`` and ``?start_date=&end_date=``.
+
+    ``POST`` takes one entry or a list of up to ``STATS_BULK_MAX_SIZE``
+    entries (any mix of flocks). A list is validated as a whole and
+    inserted in a single transaction; if any entry is invalid nothing is
+    saved and the response holds one error dict per entry, in order.
+    """
+
+    serializer_class = StatsSerializer
+    queryset = Stats.objects.all()
+    pagination_class = StatsCursorPagination
+    bulk_max_size = STATS_BULK_MAX_SIZE
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action != "list":
+            return queryset
+
+        flock = self.request.query_params.get("flock")
+        if flock:
+            if not flock.isdigit():
+                raise ValidationError({"flock": "A valid flock id is required."})
+            queryset = queryset.filter(flock_id=int(flock))
+
+        start_date, end_date = self.get_date_range()
+        if start_date:
+            queryset = queryset.filter(date__gte=start_date)
+        if end_date:
+            queryset = queryset.filter(date__lte=end_date)
+        return queryset
+
+    def create(self, request, *args, **kwargs):
+        many = isinstance(request.data, list)
+        serializer = self.get_serializer(
+            data=request.data if many else [request.data],
+            many=True,
+            max_length=self.bulk_max_size,
+        )
+        if not serializer.is_valid():
+            errors = serializer.errors
+            if not many and isinstance(errors, list):
+                errors = errors[0]
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            with transaction.atomic():
+                serializer.save()
+        except DjangoValidationError as e:
+            # Dates saved concurrently since the batch was validated.
+            raise ValidationError(as_serializer_error(e)) from e
+
+        data = serializer.data if many else serializer.data[0]
+        return Response(data, status=status.HTTP_201_CREATED)
@@ -0,0 +1,229 @@
+"""
+View-level benchmarks over synthetic farms (see ``manage.py benchmark_views``).
+
+Every case is measured on a farm built by ``factories.make_farm`` inside a
+transaction that is rolled back afterwards, with a dummy cache so that each
+request pays its full database cost. A case records the median wall time,
+the queries of one run and the peak memory traced by ``tracemalloc``.
+"""
+
+import statistics
+import time
+import tracemalloc
+from dataclasses import dataclass
+from functools import cache
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.db import transaction
+from django.test import Client
+from django.test import override_settings
+from django.urls import reverse
+
+from .factories import FARM_START_DATE
+from .factories import FlockFactory
+from .factories import make_farm
+from .models import StatsImportJob
+from .resources import StatsResource
+from .services import CohortData
+from .services import FlockCohortComparison
+from .tasks import import_stats
+from .utils import iter_csv_export
+
+BENCHMARK_SETTINGS = {
+    "ALLOWED_HOSTS": ["*"],
+    "CACHES": {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}},
+}
+DEFAULT_SCENARIOS = ("10x30", "100x30", "10x365")
+# Wall time and memory vary from run to run; query counts must not grow.
+DEFAULT_TOLERANCE = 0.5
+
+
+@dataclass(frozen=True)
+class Scenario:
+    flocks: int
+    days: int
+
+    @classmethod
+    def parse(cls, value):
+        """``"100x365"`` -> 100 flocks of 365 days each."""
+        flocks, _, days = value.lower().partition("x")
+        scenario = cls(int(flocks), int(days))
+        if scenario.flocks < 1 or scenario.days < 1:
+            msg = f"Scenario {value!r} needs at least one flock and one day."
+            raise ValueError(msg)
+        return scenario
+
+    def __str__(self):
+        return f"{self.flocks}x{self.days}"
+
+
+class QueryCounter:
+    """``execute_wrapper`` counting queries; the test client's
+    ``request_started`` signal resets ``connection.queries``."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def measure(run, setup=None, repeat=3):
+    """Median wall time, queries and peak memory of ``run(setup())``.
+
+    ``setup`` is not measured. A first run warms up templates and
+    connections; memory is traced in a separate last run, as tracing slows
+    everything down.
+    """
+
+    def prepare():
+        return setup() if setup else None
+
+    run(prepare())
+    timings = []
+    for _ in range(repeat):
+        argument = prepare()
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            started = time.perf_counter()
+            run(argument)
+            timings.append(time.perf_counter() - started)
+    argument = prepare()
+    tracemalloc.start()
+    try:
+        run(argument)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        "wall_time": round(statistics.median(timings), 6),
+        "queries": counter.count,
+        "peak_memory": peak_memory,
+    }
+
+
+def get(client, url, **headers):
+    response = client.get(url, headers=headers)
+    if response.status_code != 200:  # noqa: PLR2004
+        msg = f"GET {url} returned {response.status_code}"
+        raise AssertionError(msg)
+    return response
+
+
+def benchmark_cases(client, farm):
+    """Case name -> ``(run, setup)`` for one farm."""
+    flock = farm[0]
+    detail_url = reverse("ducks:flock-detail", kwargs={"pk": flock.pk})
+    cohort_url = reverse("ducks:flock-cohort", kwargs={"pk": flock.pk})
+
+    def next_cursor():
+        # The second page when there is one, as infinite scroll requests it.
+        return get(client, detail_url).context["next_cursor"] or ""
+
+    def export(_):
+        response = client.post(
+            reverse("ducks:flock-export", kwargs={"pk": flock.pk}),
+            {"format": 0},
+        )
+        b"".join(response.streaming_content)
+
+    def new_import():
+        # A fresh flock and file per run: imports only add new dates.
+        target = FlockFactory(started_date=FARM_START_DATE)
+        resource = StatsResource()
+        content = "".join(iter_csv_export(resource, flock.stats.order_by("date")))
+        return target, SimpleUploadedFile("stats.csv", content.encode())
+
+    def run_import(arguments):
+        target, upload = arguments
+        client.post(
+            reverse("ducks:flock-import", kwargs={"pk": target.pk}),
+            {"file": upload},
+        )
+        import_stats(StatsImportJob.objects.filter(flock=target).get().pk)
+
+    @cache
+    def cohort_data():
+        return CohortData.load()
+
+    return {
+        "flock_list": (lambda _: get(client, reverse("ducks:flock-list")), None),
+        "flock_detail": (lambda _: get(client, detail_url), None),
+        "flock_detail_xhr": (
+            lambda cursor: get(
+                client,
+                f"{detail_url}?cursor={cursor}",
+                x_requested_with="XMLHttpRequest",
+            ),
+            next_cursor,
+        ),
+        "flock_export": (export, None),
+        "flock_import": (run_import, new_import),
+        "recalculate_percentage": (
+            lambda _: flock.recalculate_stats_percentage(),
+            None,
+        ),
+        # The view loads the whole farm on every request under the dummy cache.
+        "flock_cohort": (
+            lambda _: get(client, cohort_url),
+            None,
+        ),
+        "cohort_load": (lambda _: CohortData.load(), None),
+        "cohort_compare": (
+            lambda data: FlockCohortComparison.from_data(flock.pk, data),
+            cohort_data,
+        ),
+    }
+
+
+def run_benchmarks(scenarios, repeat=3, cases=None):
+    """Results of every case (or the named ``cases``) per scenario."""
+    results = {}
+    storages = {
+        **settings.STORAGES,
+        "default": {"BACKEND": "django.core.files.storage.InMemoryStorage"},
+    }
+    with override_settings(**BENCHMARK_SETTINGS, STORAGES=storages):
+        client = Client()
+        for scenario in scenarios:
+            with transaction.atomic():
+                farm = make_farm(scenario.flocks, scenario.days)
+                results[str(scenario)] = {
+                    name: measure(run, setup, repeat=repeat)
+                    for name, (run, setup) in benchmark_cases(client, farm).items()
+                    if cases is None or name in cases
+                }
+                transaction.set_rollback(True)
+    return results
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Regressions of ``results`` against ``baseline``, one message each.
+
+    Query counts must not increase at all; wall time and peak memory may
+    exceed the baseline by ``tolerance`` (a fraction) before they count.
+    Cases missing from the baseline are skipped.
+    """
+    regressions = []
+    for scenario, cases in results.items():
+        for name, metrics in cases.items():
+            expected = baseline.get(scenario, {}).get(name)
+            if expected is None:
+                continue
+            label = f"{scenario} {name}"
+            if metrics["queries"] > expected["queries"]:
+                regressions.append(
+                    f"{label}: {metrics['queries']} queries "
+                    f"(baseline {expected['queries']})",
+                )
+            for key in ("wall_time", "peak_memory"):
+                limit = expected[key] * (1 + tolerance)
+                if metrics[key] > limit:
+                    regressions.append(
+                        f"{label}: {key} {metrics[key]} "
+                        f"(baseline {expected[key]}, limit {limit:.6g})",
+                    )
+    return regressions
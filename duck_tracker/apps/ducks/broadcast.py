@@ -0,0 +1,81 @@
+import asyncio
+import json
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from functools import cache
+
+import redis
+import redis.asyncio
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+def flock_channel(flock_id):
+    return f"ducks:flock:{flock_id}"
+
+
+class InProcessBroadcast:
+    """Delivers messages to subscribers of this process only.
+
+    Enough for the tests and a single-process ``runserver``; ``publish``
+    may be called from any thread (the sync views run in a thread pool).
+    """
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+
+    def publish(self, channel, message):
+        for loop, queue in list(self._subscribers[channel]):
+            loop.call_soon_threadsafe(queue.put_nowait, message)
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        queue = asyncio.Queue()
+        subscriber = (asyncio.get_running_loop(), queue)
+        self._subscribers[channel].add(subscriber)
+        try:
+            yield self._messages(queue)
+        finally:
+            self._subscribers[channel].discard(subscriber)
+
+    @staticmethod
+    async def _messages(queue):
+        while True:
+            yield await queue.get()
+
+
+class RedisBroadcast:
+    """Fans messages out through Redis pub/sub, across processes and hosts."""
+
+    def __init__(self, url=None):
+        self.url = url or settings.REDIS_URL
+        self._client = None
+
+    def publish(self, channel, message):
+        if self._client is None:
+            self._client = redis.Redis.from_url(self.url)
+        self._client.publish(channel, json.dumps(message))
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        client = redis.asyncio.Redis.from_url(self.url)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(channel)
+        try:
+            yield self._messages(pubsub)
+        finally:
+            await pubsub.unsubscribe(channel)
+            await pubsub.aclose()
+            await client.aclose()
+
+    @staticmethod
+    async def _messages(pubsub):
+        async for message in pubsub.listen():
+            if message["type"] == "message":
+                yield json.loads(message["data"])
+
+
+@cache
+def get_broadcast():
+    """The backend named by ``DUCKS_BROADCAST_BACKEND``, shared by the process."""
+    return import_string(settings.DUCKS_BROADCAST_BACKEND)()
@@ -0,0 +1,62 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+FLOCK_CACHE_TIMEOUT = 60 * 60 * 24
+# Pseudo flock id whose version changes with every flock's: cross-flock values.
+ALL_FLOCKS = "all"
+
+
+def flock_version_key(flock_id):
+    return f"ducks:flock:{flock_id}:version"
+
+
+def flock_cache_key(name, flock_id, version, *parts):
+    """Key of a cached per-flock value; changes whenever the flock is written."""
+    return ":".join(str(part) for part in ("ducks", name, flock_id, version, *parts))
+
+
+def get_flock_versions(flock_ids):
+    """Current cache version of each flock, in one cache round trip.
+
+    A missing version (never set, or evicted) is started from the clock so
+    it can never match a key that was cached under an earlier version.
+    """
+    keys = {flock_version_key(flock_id): flock_id for flock_id in flock_ids}
+    found = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        found.update(missing)
+    return {flock_id: found[key] for key, flock_id in keys.items()}
+
+
+def bump_flock_versions(flock_ids):
+    """Invalidate everything cached for ``flock_ids`` once the write commits.
+
+    Bumping before the commit would let a concurrent request cache the old
+    numbers under the new version.
+    """
+    flock_ids = set(flock_ids)
+    if flock_ids:
+        flock_ids.add(ALL_FLOCKS)
+
+    def bump():
+        for flock_id in flock_ids:
+            try:
+                cache.incr(flock_version_key(flock_id))
+            except ValueError:
+                cache.set(flock_version_key(flock_id), time.time_ns(), timeout=None)
+
+    if flock_ids:
+        transaction.on_commit(bump)
+
+
+def bump_flock_version(flock_id):
+    bump_flock_versions([flock_id])
+
+
+def get_stats_version():
+    """Cache version of the stats of all flocks together."""
+    return get_flock_versions([ALL_FLOCKS])[ALL_FLOCKS]
@@ -1,3 +1,4 @@
+import numpy as np
 from django import forms
 
 from config.settings.base import DATE_INPUT_FORMATS
@@ -5,6 +6,8 @@ from ckeditor.widgets import CKEditorWidget
 
 from .models import Flock
 from .models import Stats
+from .models import StatsExportJob
+from .models import StatsRollup
 
 
 class FlockForm(forms.ModelForm):
@@ -120,6 +123,8 @@ class StatsFilterForm(forms.Form):
         ("date_asc", "Date (Oldest)"),
         ("date_desc", "Date (Newest)"),
     ]
+    DAILY = "day"
+    GRANULARITY_CHOICES = [(DAILY, "Daily"), *StatsRollup.Granularity.choices]
     start_date = forms.DateField(
         required=False,
         label="Start Date",
@@ -143,6 +148,12 @@ class StatsFilterForm(forms.Form):
         choices=SORT_CHOICES,
         widget=forms.Select(attrs={"class": "form-select"}),
     )
+    granularity = forms.ChoiceField(
+        required=False,
+        label="Group By",
+        choices=GRANULARITY_CHOICES,
+        widget=forms.Select(attrs={"class": "form-select"}),
+    )
 
     def __init__(self, *args, **kwargs):
         min_date = kwargs.pop("min_date", None)
@@ -154,21 +165,10 @@ class StatsFilterForm(forms.Form):
         self.fields["end_date"].widget.attrs["id"] = "end_date"
         # self.fields["day"].widget.attrs["id"] = "day"
         self.fields["sort"].widget.attrs["id"] = "sort"
+        self.fields["granularity"].widget.attrs["id"] = "granularity"
 
 
-        # ✅ Add min/max for dates
-        if min_date:
-            self.fields["start_date"].widget.attrs["min"] = min_date.strftime(DATE_INPUT_FORMATS[0])
-            self.fields["end_date"].widget.attrs["min"] = min_date.strftime(DATE_INPUT_FORMATS[0])
-
-        if max_date:
-            self.fields["start_date"].widget.attrs["max"] = max_date.strftime(DATE_INPUT_FORMATS[0])
-            self.fields["end_date"].widget.attrs["max"] = max_date.strftime(DATE_INPUT_FORMATS[0])
-
-         # ✅ Set initial start_date = min_date (ONLY if no GET param)
-        if not self.is_bound and min_date or max_date:
-            self.initial["start_date"] = min_date
-            self.initial["end_date"] = max_date
+        self.set_date_bounds(min_date, max_date)
 
         # Disable logic
         # data = self.data or None
@@ -187,6 +187,45 @@ class StatsFilterForm(forms.Form):
         #     if start_date_value or end_date_value:
         #         self.fields["day"].widget.attrs["disabled"] = "disabled"
 
+    def get_date_range(self):
+        """Valid ``(start_date, end_date)``; an end before the start is dropped."""
+        if not self.is_valid():
+            return None, None
+
+        start_date = self.cleaned_data.get("start_date")
+        end_date = self.cleaned_data.get("end_date")
+        if start_date and end_date and end_date < start_date:
+            end_date = None
+        return start_date, end_date
+
+    def get_granularity(self):
+        """``"week"``/``"month"`` for rollup views, ``None`` for daily rows."""
+        if not self.is_valid():
+            return None
+        granularity = self.cleaned_data.get("granularity")
+        if granularity in (None, "", self.DAILY):
+            return None
+        return granularity
+
+    def set_date_bounds(self, min_date, max_date):
+        """Limit the date pickers to the flock's recorded range.
+
+        Can be called after validation, once the bounds are known.
+        """
+        # ✅ Add min/max for dates
+        if min_date:
+            self.fields["start_date"].widget.attrs["min"] = min_date.strftime(DATE_INPUT_FORMATS[0])
+            self.fields["end_date"].widget.attrs["min"] = min_date.strftime(DATE_INPUT_FORMATS[0])
+
+        if max_date:
+            self.fields["start_date"].widget.attrs["max"] = max_date.strftime(DATE_INPUT_FORMATS[0])
+            self.fields["end_date"].widget.attrs["max"] = max_date.strftime(DATE_INPUT_FORMATS[0])
+
+         # ✅ Set initial start_date = min_date (ONLY if no GET param)
+        if not self.is_bound and min_date or max_date:
+            self.initial["start_date"] = min_date
+            self.initial["end_date"] = max_date
+
         # Add valiation, end date cannot be before start date
     def clean(self):
         cleaned = super().clean()
@@ -198,6 +237,23 @@ class StatsFilterForm(forms.Form):
 
         return cleaned
 
+
+class StatsExportJobForm(forms.ModelForm):
+    """Flocks and optional date range of a background CSV export."""
+
+    class Meta:
+        model = StatsExportJob
+        fields = ["flocks", "start_date", "end_date"]
+
+    def clean(self):
+        cleaned_data = super().clean()
+        start_date = cleaned_data.get("start_date")
+        end_date = cleaned_data.get("end_date")
+        if start_date and end_date and end_date < start_date:
+            self.add_error("end_date", "End date cannot be before the start date.")
+        return cleaned_data
+
+
 class FlockIncomeForm(forms.Form):
     flock_size = forms.IntegerField(
         min_value=1,
@@ -213,6 +269,36 @@ class FlockIncomeForm(forms.Form):
     )
 
 
+class FlockIncomeSourceForm(forms.Form):
+    """The flock and date range of the calculator's "from flock" mode."""
+
+    flock = forms.ModelChoiceField(
+        queryset=Flock.objects.order_by("title"),
+        label="Flock",
+        widget=forms.Select(attrs={"class": "form-control"}),
+    )
+    start_date = forms.DateField(
+        required=False,
+        label="Start Date",
+        input_formats=DATE_INPUT_FORMATS,
+        widget=forms.DateInput(attrs={"class": "form-control", "type": "date"}),
+    )
+    end_date = forms.DateField(
+        required=False,
+        label="End Date",
+        input_formats=DATE_INPUT_FORMATS,
+        widget=forms.DateInput(attrs={"class": "form-control", "type": "date"}),
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        start_date = cleaned_data.get("start_date")
+        end_date = cleaned_data.get("end_date")
+        if start_date and end_date and end_date < start_date:
+            self.add_error("end_date", "End date cannot be before the start date.")
+        return cleaned_data
+
+
 class EggTypeForm(forms.Form):
     name = forms.CharField(
         label="Egg Type",
@@ -304,3 +390,143 @@ class FeedConsumedForm(forms.Form):
         widget=forms.NumberInput(attrs={"class": "form-control"}),
         label="Price per sack",
     )
+
+
+INCOME_SWEEP_MAX_VALUES = 1000
+INCOME_SWEEP_MAX_SCENARIOS = 250_000
+
+
+class ValueSweepField(forms.CharField):
+    """A list (``5, 6.5, 8``) or an inclusive range (``100:500:50``) of numbers.
+
+    Cleans to a list of floats, or ``None`` when left blank.
+    """
+
+    default_error_messages = {
+        "invalid": "Enter numbers separated by commas, or start:stop:step.",
+        "invalid_range": "The step must be positive and stop not below start.",
+        "too_many": "At most %(max)s values.",
+        "min_value": "Values must be at least %(min)s.",
+        "max_value": "Values must be at most %(max)s.",
+        "integer": "Values must be whole numbers.",
+    }
+
+    def __init__(
+        self,
+        *,
+        min_value=0,
+        max_value=None,
+        integer=False,
+        max_values=INCOME_SWEEP_MAX_VALUES,
+        **kwargs,
+    ):
+        self.min_value = min_value
+        self.max_value = max_value
+        self.integer = integer
+        self.max_values = max_values
+        kwargs.setdefault("required", False)
+        kwargs.setdefault(
+            "widget",
+            forms.TextInput(attrs={"class": "form-control"}),
+        )
+        super().__init__(**kwargs)
+
+    def to_python(self, value):
+        value = super().to_python(value)
+        if not value:
+            return None
+        try:
+            if ":" in value:
+                values = self._parse_range(value)
+            else:
+                values = [float(part) for part in value.split(",") if part.strip()]
+        except ValueError as e:
+            raise forms.ValidationError(
+                self.error_messages["invalid"],
+                code="invalid",
+            ) from e
+        return values or None
+
+    def _parse_range(self, value):
+        start, stop, step = (float(part) for part in value.split(":"))
+        if step <= 0 or stop < start:
+            raise forms.ValidationError(
+                self.error_messages["invalid_range"],
+                code="invalid_range",
+            )
+        if (stop - start) / step >= self.max_values:
+            raise forms.ValidationError(
+                self.error_messages["too_many"],
+                code="too_many",
+                params={"max": self.max_values},
+            )
+        # Half a step of slack keeps ``stop`` despite float rounding.
+        return np.arange(start, stop + step / 2, step).round(6).tolist()
+
+    def validate(self, value):
+        super().validate(value)
+        if not value:
+            return
+        if len(value) > self.max_values:
+            raise forms.ValidationError(
+                self.error_messages["too_many"],
+                code="too_many",
+                params={"max": self.max_values},
+            )
+        if min(value) < self.min_value:
+            raise forms.ValidationError(
+                self.error_messages["min_value"],
+                code="min_value",
+                params={"min": self.min_value},
+            )
+        if self.max_value is not None and max(value) > self.max_value:
+            raise forms.ValidationError(
+                self.error_messages["max_value"],
+                code="max_value",
+                params={"max": self.max_value},
+            )
+        if self.integer and any(not float(v).is_integer() for v in value):
+            raise forms.ValidationError(
+                self.error_messages["integer"],
+                code="integer",
+            )
+
+
+class IncomeSweepForm(forms.Form):
+    """The inputs varied by the income calculator's what-if sweep.
+
+    A blank field keeps the single value entered in the calculator above.
+    """
+
+    flock_sizes = ValueSweepField(
+        min_value=1,
+        integer=True,
+        label="Flock Sizes",
+        help_text="e.g. 100, 200, 300 or 100:1000:50",
+    )
+    production_percents = ValueSweepField(
+        max_value=100,
+        label="Egg Production (%)",
+        help_text="e.g. 60:95:5",
+    )
+    egg_prices = ValueSweepField(
+        label="Price per Egg (first egg type)",
+        help_text="e.g. 7, 7.5, 8",
+    )
+    feed_prices = ValueSweepField(
+        label="Feed Price per Sack",
+        help_text="e.g. 1400:1800:100",
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        scenarios = 1
+        for values in cleaned_data.values():
+            scenarios *= len(values or [None])
+        if scenarios > INCOME_SWEEP_MAX_SCENARIOS:
+            msg = (
+                f"The sweep has {scenarios:,} scenarios; "
+                f"at most {INCOME_SWEEP_MAX_SCENARIOS:,} are allowed."
+            )
+            raise forms.ValidationError(msg)
+        return cleaned_data
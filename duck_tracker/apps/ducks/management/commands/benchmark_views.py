@@ -0,0 +1,108 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from apps.ducks.benchmarks import DEFAULT_SCENARIOS
+from apps.ducks.benchmarks import DEFAULT_TOLERANCE
+from apps.ducks.benchmarks import Scenario
+from apps.ducks.benchmarks import compare
+from apps.ducks.benchmarks import run_benchmarks
+
+DEFAULT_BASELINE = Path(__file__).resolve().parents[2] / "benchmarks_baseline.json"
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the flock views, import/export and percentage recalculation "
+        "on synthetic farms, and compare the results against a stored baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            dest="scenarios",
+            metavar="FLOCKSxDAYS",
+            help=(
+                "A farm size such as 100x365; repeat for several "
+                f"(default: {', '.join(DEFAULT_SCENARIOS)})."
+            ),
+        )
+        parser.add_argument(
+            "--case",
+            action="append",
+            dest="cases",
+            help="Only run this case; repeat for several (default: all).",
+        )
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument(
+            "--output",
+            type=Path,
+            help="Write the results to this JSON file.",
+        )
+        parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=DEFAULT_TOLERANCE,
+            help="Allowed wall time and memory growth, as a fraction.",
+        )
+        parser.add_argument(
+            "--update-baseline",
+            action="store_true",
+            help="Store the results as the new baseline instead of comparing.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            scenarios = [
+                Scenario.parse(value)
+                for value in options["scenarios"] or DEFAULT_SCENARIOS
+            ]
+        except ValueError as e:
+            raise CommandError(e) from e
+
+        results = run_benchmarks(
+            scenarios,
+            repeat=options["repeat"],
+            cases=options["cases"],
+        )
+        for scenario, cases in results.items():
+            for name, metrics in cases.items():
+                self.stdout.write(
+                    f"{scenario:>10} {name:<24} {metrics['wall_time'] * 1000:9.1f} ms "
+                    f"{metrics['queries']:5} queries "
+                    f"{metrics['peak_memory'] / 1024:9.0f} KiB",
+                )
+
+        if options["output"]:
+            write_json(options["output"], results)
+
+        baseline_path = options["baseline"]
+        if options["update_baseline"]:
+            baseline = read_json(baseline_path) if baseline_path.exists() else {}
+            for scenario, cases in results.items():
+                baseline.setdefault(scenario, {}).update(cases)
+            write_json(baseline_path, baseline)
+            self.stdout.write(self.style.SUCCESS(f"Updated {baseline_path}."))
+            return
+
+        if not baseline_path.exists():
+            self.stdout.write(self.style.WARNING(f"No baseline at {baseline_path}."))
+            return
+
+        regressions = compare(results, read_json(baseline_path), options["tolerance"])
+        if regressions:
+            raise CommandError("Regressions:\n" + "\n".join(regressions))
+        self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
+
+
+def read_json(path):
+    return json.loads(path.read_text())
+
+
+def write_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n")
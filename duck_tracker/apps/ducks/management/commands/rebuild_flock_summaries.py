@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.ducks.models import Flock
+from apps.ducks.models import FlockSummary
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-flock stats summaries and weekly/monthly rollups."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "flock_ids",
+            nargs="*",
+            type=int,
+            help="Only rebuild these flocks (default: all flocks).",
+        )
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        flocks = Flock.objects.all()
+        if options["flock_ids"]:
+            flocks = flocks.filter(pk__in=options["flock_ids"])
+
+        rebuilt = FlockSummary.objects.rebuild(flocks)
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {rebuilt} flock summaries and their rollups."),
+        )
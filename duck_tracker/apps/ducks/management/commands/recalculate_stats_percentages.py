@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.ducks.models import Flock
+from apps.ducks.models import FlockSummary
+from apps.ducks.models import Stats
+
+
+class Command(BaseCommand):
+    help = "Recompute stats percentages from each flock's duck count, in chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "flock_ids",
+            nargs="*",
+            type=int,
+            help="Only recalculate these flocks (default: all flocks).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=100,
+            help="Number of flocks updated per transaction (default: 100).",
+        )
+
+    def handle(self, *args, **options):
+        flocks = Flock.objects.order_by("pk")
+        if options["flock_ids"]:
+            flocks = flocks.filter(pk__in=options["flock_ids"])
+        flock_ids = list(flocks.values_list("pk", flat=True))
+
+        chunk_size = max(1, options["chunk_size"])
+        updated = 0
+        for start in range(0, len(flock_ids), chunk_size):
+            chunk = flock_ids[start : start + chunk_size]
+            with transaction.atomic():
+                updated += Stats.objects.filter(
+                    flock_id__in=chunk,
+                ).recalculate_percentage()
+                FlockSummary.objects.rebuild(Flock.objects.filter(pk__in=chunk))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Recalculated {updated} stats rows across {len(flock_ids)} flocks.",
+            ),
+        )
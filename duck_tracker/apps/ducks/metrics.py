@@ -0,0 +1,77 @@
+import time
+
+from django.conf import settings
+
+from config.metrics import Counter
+from config.metrics import Histogram
+
+DURATION_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+import_upload_bytes = Counter(
+    "ducks_import_upload_bytes_total",
+    "Bytes of stats CSV files uploaded for import.",
+)
+import_rows = Counter(
+    "ducks_import_rows_total",
+    "Stats rows of finished imports, by result (imported or failed).",
+    ["result"],
+)
+import_rows_per_second = Histogram(
+    "ducks_import_rows_per_second",
+    "Insert rate of the imports that wrote rows.",
+    buckets=(10, 50, 100, 500, 1000, 2500, 5000, 10000, 25000, 50000),
+)
+import_duration = Histogram(
+    "ducks_import_duration_seconds",
+    "Runtime of import jobs, by final status.",
+    ["status"],
+    buckets=DURATION_BUCKETS,
+)
+export_bytes = Counter(
+    "ducks_export_bytes_total",
+    "Bytes of stats exported, by kind (download or job).",
+    ["kind"],
+)
+export_duration = Histogram(
+    "ducks_export_duration_seconds",
+    "Time to produce a stats export, by kind (download or job).",
+    ["kind"],
+    buckets=DURATION_BUCKETS,
+)
+
+
+def metered_export(chunks):
+    """Encode a streamed download, recording its size and duration.
+
+    Recorded once the stream is exhausted, i.e. when the client got it all.
+    """
+    started = time.perf_counter()
+    size = 0
+    for chunk in chunks:
+        data = chunk.encode(settings.DEFAULT_CHARSET)
+        size += len(data)
+        yield data
+    export_bytes.inc(size, kind="download")
+    export_duration.observe(time.perf_counter() - started, kind="download")
+
+
+def record_import(job):
+    """Record a finished ``StatsImportJob``."""
+    if job.finished_at is None:
+        return
+    import_rows.inc(job.rows_done, result="imported")
+    import_rows.inc(job.rows_failed, result="failed")
+    if job.rows_done:
+        import_rows_per_second.observe(job.rows_per_second)
+    if job.started_at:
+        import_duration.observe(
+            (job.finished_at - job.started_at).total_seconds(),
+            status=job.status,
+        )
+
+
+def record_export(job):
+    """Record a ``StatsExportJob`` that wrote its file."""
+    if job.status == job.Status.SUCCEEDED:
+        export_bytes.inc(job.size, kind="job")
+        export_duration.observe(job.duration, kind="job")
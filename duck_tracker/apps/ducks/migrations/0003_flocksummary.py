@@ -0,0 +1,48 @@
+# Generated by Django 5.2.9 on 2026-10-17 00:08
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+def build_summaries(apps, schema_editor):
+    Flock = apps.get_model("ducks", "Flock")
+    FlockSummary = apps.get_model("ducks", "FlockSummary")
+
+    summaries = []
+    for flock in Flock.objects.all().iterator():
+        totals = flock.stats.aggregate(
+            stats_count=models.Count("pk"),
+            total_harvested=models.Sum("harvested", default=0),
+            total_percentage=models.Sum("percentage", default=Decimal("0.00")),
+            total_mortality=models.Sum("mortality", default=0),
+            total_feed_consumed=models.Sum("feed_consumed", default=0.0),
+        )
+        summaries.append(FlockSummary(flock=flock, **totals))
+
+    FlockSummary.objects.bulk_create(summaries, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ducks', '0002_alter_flock_description_alter_stats_notes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FlockSummary',
+            fields=[
+                ('flock', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary', serialize=False, to='ducks.flock')),
+                ('stats_count', models.PositiveIntegerField(default=0)),
+                ('total_harvested', models.PositiveBigIntegerField(default=0)),
+                ('total_percentage', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('total_mortality', models.PositiveBigIntegerField(default=0)),
+                ('total_feed_consumed', models.FloatField(default=0.0)),
+            ],
+            options={
+                'verbose_name_plural': 'Flock summaries',
+            },
+        ),
+        migrations.RunPython(build_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.9 on 2026-10-17 00:20
+
+import django.db.models.deletion
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db import migrations, models
+
+# Duplicates listed in the error, per constraint.
+MAX_REPORTED_DUPLICATES = 20
+
+
+def check_duplicates(apps, schema_editor):
+    """Stop before the constraints if existing stats would violate them.
+
+    Which of two rows for the same day is right is for the farm to decide,
+    so nothing is deleted or renumbered here: the error lists the rows to
+    fix (delete the wrong one, or move it to a free date/day) before
+    migrating again.
+    """
+    Stats = apps.get_model("ducks", "Stats")
+    problems = []
+    for field in ("date", "day"):
+        duplicates = (
+            Stats.objects.filter(**{f"{field}__isnull": False})
+            .values("flock_id", field)
+            .annotate(ids=ArrayAgg("pk", order_by="pk"), count=models.Count("pk"))
+            .filter(count__gt=1)
+            .order_by("flock_id", field)
+        )
+        total = duplicates.count()
+        problems.extend(
+            f"  flock {row['flock_id']}, {field} {row[field]}: stats ids {row['ids']}"
+            for row in duplicates[:MAX_REPORTED_DUPLICATES]
+        )
+        if total > MAX_REPORTED_DUPLICATES:
+            problems.append(
+                f"  ... and {total - MAX_REPORTED_DUPLICATES} more duplicate {field}s",
+            )
+    if problems:
+        msg = (
+            "Cannot add the unique (flock, date) and (flock, day) constraints; "
+            "fix these duplicate stats first:\n" + "\n".join(problems)
+        )
+        raise RuntimeError(msg)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ducks', '0003_flocksummary'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='stats',
+            constraint=models.UniqueConstraint(fields=('flock', 'date'), name='ducks_stats_unique_flock_date'),
+        ),
+        migrations.AddConstraint(
+            model_name='stats',
+            constraint=models.UniqueConstraint(fields=('flock', 'day'), include=('percentage',), name='ducks_stats_unique_flock_day'),
+        ),
+        # Only after the composite indexes exist to serve flock_id lookups.
+        migrations.AlterField(
+            model_name='stats',
+            name='flock',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='ducks.flock'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.9 on 2026-10-17 00:23
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def backfill_last_day(apps, schema_editor):
+    Flock = apps.get_model("ducks", "Flock")
+    Stats = apps.get_model("ducks", "Stats")
+
+    max_day = (
+        Stats.objects.filter(flock=models.OuterRef("pk"))
+        .order_by()
+        .values("flock")
+        .annotate(max_day=models.Max("day"))
+        .values("max_day")
+    )
+    Flock.objects.update(last_day=Coalesce(models.Subquery(max_day), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ducks', '0004_stats_constraints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='flock',
+            name='last_day',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_last_day, migrations.RunPython.noop),
+    ]
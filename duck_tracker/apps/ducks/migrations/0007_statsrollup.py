@@ -0,0 +1,58 @@
+# Generated by Django 5.2.9 on 2026-10-17 00:33
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models.functions import TruncMonth, TruncWeek
+
+
+def backfill_rollups(apps, schema_editor):
+    Stats = apps.get_model("ducks", "Stats")
+    StatsRollup = apps.get_model("ducks", "StatsRollup")
+
+    rollups = []
+    for granularity, trunc in (("week", TruncWeek), ("month", TruncMonth)):
+        grouped = (
+            Stats.objects.order_by()
+            .annotate(period_start=trunc("date"))
+            .values("flock_id", "period_start")
+            .annotate(
+                stats_count=models.Count("pk"),
+                total_harvested=models.Sum("harvested"),
+                total_percentage=models.Sum("percentage"),
+                total_mortality=models.Sum("mortality"),
+                total_feed_consumed=models.Sum("feed_consumed"),
+            )
+        )
+        rollups.extend(StatsRollup(granularity=granularity, **row) for row in grouped)
+    StatsRollup.objects.bulk_create(rollups, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ducks', '0006_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatsRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('week', 'Weekly'), ('month', 'Monthly')], max_length=5)),
+                ('period_start', models.DateField()),
+                ('stats_count', models.IntegerField(default=0)),
+                ('total_harvested', models.BigIntegerField(default=0)),
+                ('total_percentage', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('total_mortality', models.BigIntegerField(default=0)),
+                ('total_feed_consumed', models.FloatField(default=0.0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('flock', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='ducks.flock')),
+            ],
+            options={
+                'ordering': ['flock', 'granularity', 'period_start'],
+                'constraints': [models.UniqueConstraint(fields=('flock', 'granularity', 'period_start'), name='ducks_statsrollup_unique_period')],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
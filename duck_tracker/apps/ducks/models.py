@@ -1,18 +1,82 @@
+from collections import defaultdict
+from datetime import timedelta
+from decimal import ROUND_HALF_UP
 from decimal import Decimal
+from functools import partial
 
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError
+from django.db import connection
 from django.db import models
+from django.db import transaction
+from django.db.models.functions import Cast
+from django.db.models.functions import Coalesce
+from django.db.models.functions import Lag
+from django.db.models.functions import Lead
+from django.db.models.functions import Now
+from django.db.models.functions import NullIf
+from django.db.models.functions import Round
+from django.db.models.functions import TruncMonth
+from django.db.models.functions import TruncWeek
 from django.utils import timezone
+from django.utils.functional import cached_property
 from ckeditor.fields import RichTextField
 from config.settings.base import DATE_FORMAT
 
+from .broadcast import flock_channel
+from .broadcast import get_broadcast
+from .cache import bump_flock_version
+from .cache import bump_flock_versions
+from .validators import STATS_UNIQUE_DATE
+from .validators import STATS_UNIQUE_DAY
+from .validators import duplicate_date_message
+from .validators import stats_integrity_error
 from .validators import validate_flock_dates
 from .validators import validate_stats_entry
 
 
+PERCENTAGE_PLACES = Decimal("0.01")
+
+# Stats column -> FlockSummary column it is summed into.
+SUMMARY_SOURCES = {
+    "harvested": "total_harvested",
+    "percentage": "total_percentage",
+    "mortality": "total_mortality",
+    "feed_consumed": "total_feed_consumed",
+}
+SUMMARY_FIELDS = ["stats_count", *SUMMARY_SOURCES.values()]
+# What a Stats row contributes to its flock's summary and rollups.
+ROLLUP_KEYS = ("flock_id", "date", *SUMMARY_SOURCES)
+
+
 def today():
     return timezone.now().date()
 
 
+def compute_percentage(harvested, number_of_ducks):
+    """Production % rounded the same way the database stores it."""
+    if number_of_ducks <= 0:
+        return Decimal("0.00")
+    percentage = Decimal(harvested) * 100 / Decimal(number_of_ducks)
+    return percentage.quantize(PERCENTAGE_PLACES, rounding=ROUND_HALF_UP)
+
+
+def percentage_expression(number_of_ducks):
+    """SQL counterpart of ``compute_percentage`` (``ROUND`` also rounds half up)."""
+    # numeric, not bigint: integer division would truncate the ratio.
+    harvested = Cast("harvested", models.DecimalField(max_digits=20, decimal_places=0))
+    ratio = models.ExpressionWrapper(
+        harvested * 100 / NullIf(number_of_ducks, models.Value(0)),
+        output_field=models.DecimalField(),
+    )
+    return Coalesce(
+        Round(ratio, 2),
+        models.Value(Decimal("0.00")),
+        output_field=models.DecimalField(max_digits=5, decimal_places=2),
+    )
+
+
 class Flock(models.Model):
     title = models.CharField(max_length=100)
     number_of_ducks = models.PositiveIntegerField()
@@ -20,6 +84,10 @@ class Flock(models.Model):
     started_date = models.DateField(default=today)
     culled_date = models.DateField(blank=True, null=True)
     is_culled = models.BooleanField(default=False)
+    # Highest Stats.day handed out so far; only ever moved by reserve_days
+    # and Stats.delete, never written by Flock.save.
+    last_day = models.PositiveIntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["started_date"]
@@ -48,76 +116,390 @@ class Flock(models.Model):
         if self.is_culled and self.culled_date is None:
             self.culled_date = today()
 
-        super().save(*args, **kwargs)
+        if old_duck_count is not None and kwargs.get("update_fields") is None:
+            # A stale instance must not roll the day counter back.
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "last_day"
+            ]
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            bump_flock_version(self.pk)
 
-        # 🔁 Recalculate stats percentage if duck count changed
-        if old_duck_count is not None and old_duck_count != self.number_of_ducks:
-            self.recalculate_stats_percentage()
+            if old_duck_count is None:
+                FlockSummary.objects.get_or_create(flock=self)
+
+            # 🔁 Recalculate stats percentage if duck count changed
+            if old_duck_count is not None and old_duck_count != self.number_of_ducks:
+                self.recalculate_stats_percentage()
+
+    def delete(self, *args, **kwargs):
+        # Its stats go with it: drop them from cached cross-flock figures.
+        bump_flock_version(self.pk)
+        return super().delete(*args, **kwargs)
 
 
     def clean(self):
         validate_flock_dates(self)
 
+    def reserve_days(self, count=1):
+        """Advance ``last_day`` by ``count`` and return the first reserved day.
+
+        A single ``UPDATE ... RETURNING``: the row lock it takes serializes
+        concurrent writers to the same flock until their transaction ends,
+        so no two inserts can be handed the same day.
+        """
+        table = connection.ops.quote_name(self._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {table} SET last_day = last_day + %s "  # noqa: S608
+                "WHERE id = %s RETURNING last_day",
+                [count, self.pk],
+            )
+            (self.last_day,) = cursor.fetchone()
+        return self.last_day - count + 1
+
+    @transaction.atomic
     def recalculate_stats_percentage(self):
-        if self.number_of_ducks <= 0:
-            self.stats.update(percentage=Decimal("0.00"))
-            return
+        self.stats.recalculate_percentage(self.number_of_ducks)
+        FlockSummary.objects.refresh(self)
 
-        stats_to_update = []
-        for stat in self.stats.all():
-            percentage = (stat.harvested / self.number_of_ducks) * 100
-            stat.percentage = percentage
-            stats_to_update.append(stat)
+    # Aggregates are read from the denormalized FlockSummary row instead of
+    # scanning the flock's stats on every access. Use
+    # ``select_related("summary")`` when listing flocks.
 
-        self.stats.bulk_update(stats_to_update, ["percentage"])
+    @property
+    def flock_summary(self):
+        try:
+            return self.summary
+        except FlockSummary.DoesNotExist:
+            return FlockSummary(flock=self)
 
+    @property
+    def stats_count(self):
+        return self.flock_summary.stats_count
 
     @property
     def total_harvested(self):
-        return (
-            self.stats.aggregate(
-                total=models.Sum("harvested"),
-            )["total"]
-            or 0
-        )
+        return self.flock_summary.total_harvested
 
     @property
     def avg_harvested(self):
-        days_count = self.stats.count()
-        if days_count == 0:
-            return 0
-        return self.total_harvested // days_count
+        return self.flock_summary.avg_harvested
 
     @property
     def total_mortality(self):
-        return (
-            self.stats.aggregate(
-                total=models.Sum("mortality"),
-            )["total"]
-            or 0
-        )
+        return self.flock_summary.total_mortality
 
     @property
     def average_percentage(self):
-        return self.stats.aggregate(
-            average=models.Avg("percentage"),
-        )["average"] or Decimal("0.00")
+        return self.flock_summary.average_percentage
 
     @property
     def total_feed_consumed(self):
-        return (
-            self.stats.aggregate(
-                total=models.Sum("feed_consumed"),
-            )["total"]
-            or 0.0
+        return self.flock_summary.total_feed_consumed
+
+    @property
+    def avg_daily_feed_consumed(self):
+        return self.flock_summary.avg_daily_feed_consumed
+
+
+class FlockSummaryManager(models.Manager):
+    def totals_expressions(self):
+        """Aggregates of the summary columns over a set of Stats rows."""
+        return {
+            "stats_count": models.Count("pk"),
+            "total_harvested": models.Sum("harvested", default=0),
+            "total_percentage": models.Sum("percentage", default=Decimal("0.00")),
+            "total_mortality": models.Sum("mortality", default=0),
+            "total_feed_consumed": models.Sum("feed_consumed", default=0.0),
+        }
+
+    def totals(self, stats_qs):
+        """Return the summary columns aggregated from a Stats queryset."""
+        return stats_qs.aggregate(**self.totals_expressions())
+
+    def refresh(self, flock):
+        """Recompute one flock's summary from its stats."""
+        summary, _ = self.update_or_create(
+            flock_id=flock.pk,
+            defaults=self.totals(Stats.objects.filter(flock_id=flock.pk)),
+        )
+        flock.summary = summary
+        StatsRollup.objects.rebuild([flock.pk])
+        bump_flock_version(flock.pk)
+        return summary
+
+    def rebuild(self, flocks=None):
+        """Recompute the summaries of ``flocks`` (all flocks by default).
+
+        Runs one grouped aggregate over ``ducks_stats`` and upserts the
+        result, so the cost does not depend on the number of flocks.
+        """
+        if flocks is None:
+            flocks = Flock.objects.all()
+        flock_ids = list(flocks.values_list("pk", flat=True))
+
+        grouped = (
+            Stats.objects.filter(flock_id__in=flock_ids)
+            .order_by()
+            .values("flock_id")
+            .annotate(
+                stats_count=models.Count("pk"),
+                total_harvested=models.Sum("harvested"),
+                total_percentage=models.Sum("percentage"),
+                total_mortality=models.Sum("mortality"),
+                total_feed_consumed=models.Sum("feed_consumed"),
+            )
+        )
+        totals = {row.pop("flock_id"): row for row in grouped}
+
+        summaries = [
+            self.model(flock_id=flock_id, **totals.get(flock_id, {}))
+            for flock_id in flock_ids
+        ]
+        self.bulk_create(
+            summaries,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=["flock"],
+            update_fields=[*SUMMARY_FIELDS, "updated_at"],
         )
+        StatsRollup.objects.rebuild(flock_ids)
+        bump_flock_versions(flock_ids)
+        return len(summaries)
+
+    def apply_delta(self, flock, **deltas):
+        """Shift a flock's summary columns by ``deltas`` in a single UPDATE.
+
+        Always stamps ``updated_at``: edits that leave the totals unchanged
+        (notes, for example) still change what the flock's pages show.
+        """
+        changes = {
+            field: models.F(field) + value for field, value in deltas.items() if value
+        }
+        if self.filter(flock_id=flock.pk).update(**changes, updated_at=Now()):
+            # The in-memory summary cached on the flock is now stale.
+            if Flock.summary.related.is_cached(flock):
+                Flock.summary.related.delete_cached_value(flock)
+            bump_flock_version(flock.pk)
+        else:
+            # No summary row yet (e.g. data predating the table).
+            self.refresh(flock)
+
+
+class FlockSummary(models.Model):
+    """Running totals of a flock's stats, kept in step with every write.
+
+    Stats.save/delete apply their own contribution, bulk paths call
+    ``FlockSummary.objects.refresh``. ``manage.py rebuild_flock_summaries``
+    recomputes everything from scratch. Refreshing or rebuilding a summary
+    also rebuilds the flock's ``StatsRollup`` rows, and every manager write
+    bumps the flock's cache version (see ``apps.ducks.cache``).
+    """
+
+    flock = models.OneToOneField(
+        Flock,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="summary",
+    )
+    stats_count = models.PositiveIntegerField(default=0)
+    total_harvested = models.PositiveBigIntegerField(default=0)
+    total_percentage = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal("0.00"),
+    )
+    total_mortality = models.PositiveBigIntegerField(default=0)
+    total_feed_consumed = models.FloatField(default=0.0)
+    # Last change to any of the flock's stats; the detail page's validator.
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = FlockSummaryManager()
+
+    class Meta:
+        verbose_name_plural = "Flock summaries"
+
+    def __str__(self):
+        return f"Summary of {self.flock_id}: {self.stats_count} stat entries"
+
+    @property
+    def avg_harvested(self):
+        if self.stats_count == 0:
+            return 0
+        return self.total_harvested // self.stats_count
+
+    @property
+    def average_percentage(self):
+        if self.stats_count == 0:
+            return Decimal("0.00")
+        return self.total_percentage / self.stats_count
 
     @property
     def avg_daily_feed_consumed(self):
-        days_count = self.stats.count()
-        if days_count == 0:
+        if self.stats_count == 0:
             return 0.0
-        return self.total_feed_consumed / days_count
+        return self.total_feed_consumed / self.stats_count
+
+    def as_aggregates(self):
+        """Same keys as the aggregates FlockDetailView computes from stats."""
+        count = self.stats_count or 1
+        return {
+            "total_harvested": self.total_harvested,
+            "avg_harvested": self.total_harvested / count,
+            "average_percentage": float(self.average_percentage),
+            "total_feed_consumed": self.total_feed_consumed,
+            "avg_daily_feed_consumed": self.avg_daily_feed_consumed,
+            "total_mortality": self.total_mortality,
+        }
+
+
+def publish_stats_change(flock_id, event, row, count=1):
+    """Send one stats change and the flock's new totals to its subscribers.
+
+    Runs after the commit (see ``Stats.publish_change``), so the summary read
+    here already includes the change. ``count`` is the number of rows the
+    event covers; ``row`` is the last of them.
+    """
+    summary = FlockSummary.objects.filter(flock_id=flock_id).first()
+    aggregates = None
+    if summary is not None:
+        aggregates = {"stats_count": summary.stats_count, **summary.as_aggregates()}
+    get_broadcast().publish(
+        flock_channel(flock_id),
+        {
+            "type": "stats",
+            "flock": flock_id,
+            "event": event,
+            "count": count,
+            "row": row,
+            "aggregates": aggregates,
+        },
+    )
+
+
+class StatsQuerySet(models.QuerySet):
+    def bulk_insert(self, flock, instances, batch_size=None):
+        """Insert new, already validated stats of ``flock`` in one transaction.
+
+        Hands out consecutive days with a single ``reserve_days`` call, sets
+        each percentage, inserts with ``bulk_create`` and shifts the summary
+        and rollups once. A date saved concurrently by someone else surfaces
+        as the ``ValidationError`` of ``stats_integrity_error``.
+        """
+        instances = list(instances)
+        if not instances:
+            return instances
+
+        deltas = dict.fromkeys(SUMMARY_SOURCES.values(), 0)
+        for instance in instances:
+            instance.flock = flock
+            instance.percentage = compute_percentage(
+                instance.harvested,
+                flock.number_of_ducks,
+            )
+            for field, total in SUMMARY_SOURCES.items():
+                deltas[total] += getattr(instance, field)
+
+        try:
+            with transaction.atomic():
+                first_day = flock.reserve_days(len(instances))
+                for day, instance in enumerate(instances, start=first_day):
+                    instance.day = day
+                self.bulk_create(instances, batch_size=batch_size)
+                FlockSummary.objects.apply_delta(
+                    flock,
+                    stats_count=len(instances),
+                    **deltas,
+                )
+                StatsRollup.objects.apply_rows(
+                    added=[
+                        instance._summary_contribution()  # noqa: SLF001
+                        for instance in instances
+                    ],
+                )
+        except IntegrityError as e:
+            for instance in instances:
+                instance.day = None
+            error = stats_integrity_error(None, e)
+            if error is None:
+                raise
+            raise error from e
+
+        for instance in instances:
+            contribution = instance._summary_contribution()  # noqa: SLF001
+            instance._loaded_contribution = contribution  # noqa: SLF001
+        instances[-1].publish_change("imported", count=len(instances))
+        return instances
+
+    def recalculate_percentage(self, number_of_ducks=None):
+        """Recompute ``percentage`` for every selected row in one UPDATE.
+
+        Uses ``number_of_ducks`` when given (the rows of one flock), otherwise
+        each row's own flock. Returns the number of rows updated.
+        """
+        if number_of_ducks is None:
+            number_of_ducks = models.Subquery(
+                Flock.objects.filter(pk=models.OuterRef("flock_id")).values(
+                    "number_of_ducks",
+                )[:1],
+            )
+        else:
+            number_of_ducks = models.Value(number_of_ducks)
+        return self.update(
+            percentage=percentage_expression(number_of_ducks),
+            updated_at=Now(),
+        )
+
+    def with_deltas(self):
+        """Annotate ``prev_harvested``, ``harvested_delta`` and ``harvested_delta_pct``.
+
+        The previous day comes from a LAG() window over the flock ordered by
+        date, so a page of rows is rendered with a single query. The window
+        only sees the rows this queryset selects; for the first of them (the
+        first row of a filtered or paginated range) the true predecessor is
+        looked up instead, which Postgres only evaluates when LAG() is NULL.
+        """
+        # Run the window in the same direction as the page so it can stream.
+        if self.query.order_by and self.query.order_by[0] == "-date":
+            window_function, date_order = Lead, models.F("date").desc()
+        else:
+            window_function, date_order = Lag, models.F("date").asc()
+
+        predecessor = (
+            self.model.objects.filter(
+                flock=models.OuterRef("flock"),
+                date__lt=models.OuterRef("date"),
+            )
+            .order_by("-date")
+            .values("harvested")[:1]
+        )
+        prev_harvested = Coalesce(
+            models.Window(
+                window_function("harvested"),
+                partition_by=models.F("flock_id"),
+                order_by=date_order,
+            ),
+            models.Subquery(predecessor),
+            output_field=models.BigIntegerField(),
+        )
+        prev_float = Cast("prev_harvested", models.FloatField())
+
+        return self.annotate(prev_harvested=prev_harvested).annotate(
+            harvested_delta=models.ExpressionWrapper(
+                models.F("harvested") - models.F("prev_harvested"),
+                output_field=models.BigIntegerField(),
+            ),
+            harvested_delta_pct=models.ExpressionWrapper(
+                (Cast("harvested", models.FloatField()) - prev_float)
+                * 100
+                / NullIf(prev_float, models.Value(0.0)),
+                output_field=models.FloatField(),
+            ),
+        )
 
 
 class Stats(models.Model):
@@ -125,6 +507,8 @@ class Stats(models.Model):
         Flock,
         on_delete=models.CASCADE,
         related_name="stats",
+        # The (flock, date) and (flock, day) constraints lead with flock_id.
+        db_index=False,
     )
     day = models.PositiveIntegerField(blank=True, null=True)
     date = models.DateField(default=today)
@@ -141,34 +525,164 @@ class Stats(models.Model):
         help_text="Feed consumed (sacks)",
         default=0.0,
     )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = StatsQuerySet.as_manager()
 
     class Meta:
         ordering = ["day"]
         verbose_name_plural = "Stats"
+        constraints = [
+            # Also the index behind date lookups, ranges and sorts per flock.
+            models.UniqueConstraint(
+                fields=["flock", "date"],
+                name=STATS_UNIQUE_DATE,
+            ),
+            # Covers the comparison chart (day range -> percentage) on its own.
+            models.UniqueConstraint(
+                fields=["flock", "day"],
+                include=["percentage"],
+                name=STATS_UNIQUE_DAY,
+            ),
+        ]
 
     def __str__(self):
         return f"Day {self.day}: {self.harvested} harvested"
 
     def save(self, *args, **kwargs):
-        # Auto-set day
-        if self.day is None:
-            last_stat = (
-                type(self).objects.filter(flock=self.flock).order_by("-day").first()
-            )
-            self.day = (last_stat.day + 1) if last_stat else 1
-
         # Auto-calc percentage
-        if self.flock.number_of_ducks > 0:
-            self.percentage = (self.harvested / self.flock.number_of_ducks) * 100
+        self.percentage = compute_percentage(self.harvested, self.flock.number_of_ducks)
+
+        created = self._state.adding
+        reserved_day = self.day is None
+        try:
+            with transaction.atomic():
+                # Auto-set day (the reservation rolls back with a failed insert)
+                if reserved_day:
+                    self.day = self.flock.reserve_days()
+                super().save(*args, **kwargs)
+                old = getattr(self, "_loaded_contribution", None)
+                self._update_summary(
+                    old=old,
+                    new=self._summary_contribution(),
+                    created=created,
+                )
+                self.publish_change("created" if created else "updated")
+                if old is not None and old["flock_id"] != self.flock_id:
+                    self.publish_change("deleted", flock_id=old["flock_id"])
+        except IntegrityError as e:
+            if reserved_day:
+                self.day = None
+            error = stats_integrity_error(self, e)
+            if error is None:
+                raise
+            raise error from e
+        self._loaded_contribution = self._summary_contribution()
+
+    def delete(self, *args, **kwargs):
+        old = getattr(self, "_loaded_contribution", None)
+        with transaction.atomic():
+            # Before the delete clears the primary key.
+            self.publish_change("deleted")
+            result = super().delete(*args, **kwargs)
+            # Deleting the newest entry frees its day for the next insert.
+            Flock.objects.filter(pk=self.flock_id, last_day=self.day).update(
+                last_day=models.F("last_day") - 1,
+            )
+            if old is None:
+                FlockSummary.objects.refresh(self.flock)
+            else:
+                FlockSummary.objects.apply_delta(
+                    self.flock,
+                    stats_count=-1,
+                    **{
+                        SUMMARY_SOURCES[field]: -old[field] for field in SUMMARY_SOURCES
+                    },
+                )
+                StatsRollup.objects.apply_rows(removed=[old])
+        return result
+
+    def _update_summary(self, old, new, *, created):
+        if created:
+            FlockSummary.objects.apply_delta(
+                self.flock,
+                stats_count=1,
+                **{SUMMARY_SOURCES[field]: new[field] for field in SUMMARY_SOURCES},
+            )
+            StatsRollup.objects.apply_rows(added=[new])
+        elif old is None or old["flock_id"] != new["flock_id"]:
+            # Unknown previous values (or a moved row): recount from scratch.
+            FlockSummary.objects.refresh(self.flock)
+            if old is not None:
+                FlockSummary.objects.refresh(Flock(pk=old["flock_id"]))
         else:
-            self.percentage = 0
-
-        super().save(*args, **kwargs)
+            FlockSummary.objects.apply_delta(
+                self.flock,
+                **{
+                    SUMMARY_SOURCES[field]: new[field] - old[field]
+                    for field in SUMMARY_SOURCES
+                },
+            )
+            StatsRollup.objects.apply_rows(added=[new], removed=[old])
 
     def clean(self):
         validate_stats_entry(self)
 
-    @property
+    def unique_error_message(self, model_class, unique_check):
+        if tuple(unique_check) == ("flock", "date") and self.date:
+            return ValidationError(
+                duplicate_date_message(self.date),
+                code="unique_together",
+            )
+        return super().unique_error_message(model_class, unique_check)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what this row contributed to the flock summary so that a
+        # later save/delete can apply the difference without re-reading it.
+        instance._loaded_contribution = instance._summary_contribution()  # noqa: SLF001
+        return instance
+
+    def as_broadcast_row(self):
+        """The row as pushed to websocket subscribers by ``publish_change``."""
+        return {
+            "id": self.pk,
+            "day": self.day,
+            "date": str(self.date),
+            "harvested": self.harvested,
+            "percentage": float(self.percentage),
+            "mortality": self.mortality,
+            "feed_consumed": self.feed_consumed,
+        }
+
+    def publish_change(self, event, count=1, flock_id=None):
+        """Queue ``publish_stats_change`` for when the current transaction commits.
+
+        Robust: an unreachable broadcast backend is logged, never raised
+        into the request that already committed the write.
+        """
+        transaction.on_commit(
+            partial(
+                publish_stats_change,
+                flock_id or self.flock_id,
+                event,
+                self.as_broadcast_row(),
+                count,
+            ),
+            robust=True,
+        )
+
+    def _summary_contribution(self):
+        values = self.__dict__
+        if any(values.get(field) is None for field in ROLLUP_KEYS):
+            return None
+        return {field: values[field] for field in ROLLUP_KEYS}
+
+    # Cached (and overridable) so that rows annotated by
+    # ``Stats.objects.with_deltas()`` never fall back to a per-row query.
+
+    @cached_property
     def previous(self):
         return (
             type(self)
@@ -180,16 +694,299 @@ class Stats(models.Model):
             .first()
         )
 
-    @property
+    @cached_property
     def harvested_delta(self):
         prev = self.previous
         if not prev:
             return None
         return int(self.harvested) - int(prev.harvested)
 
-    @property
+    @cached_property
     def harvested_delta_pct(self):
         prev = self.previous
         if not prev or prev.harvested == 0:
             return None
         return ((self.harvested - prev.harvested) / prev.harvested) * 100
+
+
+class StatsRollupManager(models.Manager):
+    def in_range(self, flock, granularity, start_date=None, end_date=None):
+        """Non-empty rollups of ``flock`` overlapping the date range, oldest first.
+
+        Buckets are whole weeks/months, so the first and last one may also
+        cover days just outside the range.
+        """
+        queryset = self.filter(
+            flock_id=flock.pk,
+            granularity=granularity,
+            stats_count__gt=0,
+        )
+        if start_date:
+            queryset = queryset.filter(
+                period_start__gte=period_start(granularity, start_date),
+            )
+        if end_date:
+            queryset = queryset.filter(period_start__lte=end_date)
+        return queryset.order_by("period_start")
+
+    def apply_rows(self, added=(), removed=()):
+        """Add/remove Stats contributions to their weekly and monthly rollups.
+
+        ``added``/``removed`` are dicts as returned by
+        ``Stats._summary_contribution``. Every touched bucket is shifted by
+        one ``INSERT ... ON CONFLICT DO UPDATE``, which also creates buckets
+        that do not exist yet.
+        """
+        deltas = defaultdict(lambda: dict.fromkeys(SUMMARY_FIELDS, 0))
+        for rows, sign in ((added, 1), (removed, -1)):
+            for row in rows:
+                for granularity in self.model.Granularity:
+                    bucket = deltas[
+                        row["flock_id"],
+                        granularity.value,
+                        period_start(granularity, row["date"]),
+                    ]
+                    bucket["stats_count"] += sign
+                    for field, total in SUMMARY_SOURCES.items():
+                        bucket[total] += sign * row[field]
+        if not deltas:
+            return
+
+        table = connection.ops.quote_name(self.model._meta.db_table)  # noqa: SLF001
+        columns = ["flock_id", "granularity", "period_start", *SUMMARY_FIELDS]
+        now = timezone.now()
+        params = []
+        for key, bucket in deltas.items():
+            params.extend([*key, *(bucket[field] for field in SUMMARY_FIELDS), now])
+        placeholders = ", ".join(
+            ["(" + ", ".join(["%s"] * (len(columns) + 1)) + ")"] * len(deltas),
+        )
+        updates = ", ".join(
+            f"{field} = {table}.{field} + EXCLUDED.{field}" for field in SUMMARY_FIELDS
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} ({', '.join(columns)}, updated_at) "  # noqa: S608
+                f"VALUES {placeholders} "
+                "ON CONFLICT (flock_id, granularity, period_start) "
+                f"DO UPDATE SET {updates}, updated_at = EXCLUDED.updated_at",
+                params,
+            )
+
+    def rebuild(self, flock_ids):
+        """Recompute every rollup of ``flock_ids`` with one grouped query each."""
+        flock_ids = list(flock_ids)
+        self.filter(flock_id__in=flock_ids).delete()
+        rollups = []
+        for granularity, trunc in ROLLUP_TRUNCATES.items():
+            grouped = (
+                Stats.objects.filter(flock_id__in=flock_ids)
+                .order_by()
+                .annotate(period_start=trunc("date"))
+                .values("flock_id", "period_start")
+                .annotate(**FlockSummary.objects.totals_expressions())
+            )
+            rollups.extend(
+                self.model(granularity=granularity, **row) for row in grouped
+            )
+        self.bulk_create(rollups, batch_size=500)
+        return len(rollups)
+
+
+class StatsRollup(models.Model):
+    """Totals of a flock's stats per week (from Monday) or calendar month.
+
+    Kept current by the same writes that maintain ``FlockSummary`` and
+    rebuilt along with it, so long date ranges can be charted and listed
+    from tens of rows instead of hundreds of daily ones.
+    """
+
+    class Granularity(models.TextChoices):
+        WEEK = "week", "Weekly"
+        MONTH = "month", "Monthly"
+
+    flock = models.ForeignKey(
+        Flock,
+        on_delete=models.CASCADE,
+        related_name="rollups",
+        # The unique constraint leads with flock_id.
+        db_index=False,
+    )
+    granularity = models.CharField(max_length=5, choices=Granularity.choices)
+    period_start = models.DateField()
+    # Signed: apply_rows adds negative deltas through INSERT ... ON CONFLICT.
+    stats_count = models.IntegerField(default=0)
+    total_harvested = models.BigIntegerField(default=0)
+    total_percentage = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal("0.00"),
+    )
+    total_mortality = models.BigIntegerField(default=0)
+    total_feed_consumed = models.FloatField(default=0.0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = StatsRollupManager()
+
+    class Meta:
+        ordering = ["flock", "granularity", "period_start"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["flock", "granularity", "period_start"],
+                name="ducks_statsrollup_unique_period",
+            ),
+        ]
+
+    def __str__(self):
+        label = self.get_granularity_display()
+        return f"{label} {self.period_start}: {self.stats_count} stat entries"
+
+    @property
+    def period_end(self):
+        return period_end(self.granularity, self.period_start)
+
+    @property
+    def average_percentage(self):
+        if self.stats_count <= 0:
+            return Decimal("0.00")
+        return self.total_percentage / self.stats_count
+
+
+ROLLUP_TRUNCATES = {
+    StatsRollup.Granularity.WEEK: TruncWeek,
+    StatsRollup.Granularity.MONTH: TruncMonth,
+}
+
+
+def period_start(granularity, day):
+    """First day of the week (Monday) or month containing ``day``."""
+    if granularity == StatsRollup.Granularity.WEEK:
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def period_end(granularity, start):
+    """Last day of the period beginning on ``start``."""
+    if granularity == StatsRollup.Granularity.WEEK:
+        return start + timedelta(days=6)
+    next_month = (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return next_month - timedelta(days=1)
+
+
+class BackgroundJob(models.Model):
+    """Status and timing shared by the import and export jobs run on Celery.
+
+    The tasks write through ``update_progress`` as they go, so the pages
+    polling a job see each step as soon as it is committed.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        RUNNING = "running", "Running"
+        SUCCEEDED = "succeeded", "Succeeded"
+        FAILED = "failed", "Failed"
+
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
+    errors = models.JSONField(default=list, blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        abstract = True
+        ordering = ["-created_at"]
+
+    @property
+    def is_finished(self):
+        return self.status in (self.Status.SUCCEEDED, self.Status.FAILED)
+
+    def update_progress(self, **fields):
+        """Write ``fields`` straight away (and to this instance) with one UPDATE."""
+        for name, value in fields.items():
+            setattr(self, name, value)
+        type(self).objects.filter(pk=self.pk).update(**fields)
+
+
+class StatsImportJob(BackgroundJob):
+    """A CSV upload of stats, imported in the background by ``tasks.import_stats``.
+
+    The task updates the counters after every chunk it commits.
+    """
+
+    flock = models.ForeignKey(
+        Flock,
+        on_delete=models.CASCADE,
+        related_name="import_jobs",
+    )
+    file = models.FileField(upload_to="imports/stats/%Y/%m/")
+    total_rows = models.PositiveIntegerField(default=0)
+    rows_done = models.PositiveIntegerField(default=0)
+    rows_failed = models.PositiveIntegerField(default=0)
+    rows_per_second = models.FloatField(default=0.0)
+
+    class Meta(BackgroundJob.Meta):
+        pass
+
+    def __str__(self):
+        return f"Import #{self.pk} for {self.flock_id}: {self.get_status_display()}"
+
+    @property
+    def progress(self):
+        """Share of the rows handled so far, ``0..100``."""
+        if not self.total_rows:
+            return 100 if self.is_finished else 0
+        handled = self.rows_done + self.rows_failed
+        return round(100 * handled / self.total_rows)
+
+    def as_progress(self):
+        return {
+            "id": self.pk,
+            "status": self.status,
+            "finished": self.is_finished,
+            "progress": self.progress,
+            "total_rows": self.total_rows,
+            "rows_done": self.rows_done,
+            "rows_failed": self.rows_failed,
+            "rows_per_second": round(self.rows_per_second, 1),
+            "errors": self.errors,
+        }
+
+
+class StatsExportJob(BackgroundJob):
+    """A CSV export of one or more flocks, written by ``tasks.export_stats``."""
+
+    flocks = models.ManyToManyField(Flock, related_name="export_jobs")
+    start_date = models.DateField(blank=True, null=True)
+    end_date = models.DateField(blank=True, null=True)
+    file = models.FileField(upload_to="exports/stats/%Y/%m/", blank=True)
+    rows_done = models.PositiveIntegerField(default=0)
+    size = models.PositiveBigIntegerField(default=0, help_text="Bytes written")
+    duration = models.FloatField(default=0.0, help_text="Seconds")
+
+    class Meta(BackgroundJob.Meta):
+        pass
+
+    def __str__(self):
+        return f"Export #{self.pk}: {self.get_status_display()}"
+
+    def as_progress(self):
+        return {
+            "id": self.pk,
+            "status": self.status,
+            "finished": self.is_finished,
+            "rows_done": self.rows_done,
+            "size": self.size,
+            "duration": round(self.duration, 2),
+            "errors": self.errors,
+        }
@@ -0,0 +1,109 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+class KeysetPage:
+    """A page of rows located by the keys of the last row of the previous page.
+
+    Mirrors the parts of ``django.core.paginator.Page`` the views use.
+    """
+
+    def __init__(self, object_list, next_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+class KeysetPaginator:
+    """Cursor pagination over a unique, ordered tuple of model fields.
+
+    Unlike ``Paginator`` it never counts rows and never uses OFFSET: each
+    page is ``WHERE (keys) > cursor ORDER BY keys LIMIT per_page + 1``, so
+    every page costs the same however deep the client has scrolled. The
+    cursor handed to clients is opaque (url-safe base64 of the key values).
+    """
+
+    def __init__(self, queryset, per_page, keys=("date", "id"), *, descending=False):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.keys = keys
+        self.descending = descending
+
+    @property
+    def ordering(self):
+        prefix = "-" if self.descending else ""
+        return [f"{prefix}{key}" for key in self.keys]
+
+    def encode_cursor(self, row):
+        values = [getattr(row, key) for key in self.keys]
+        raw = json.dumps(values, cls=DjangoJSONEncoder, separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+            msg = "Malformed cursor."
+            raise InvalidCursor(msg) from e
+
+        if not isinstance(values, list) or len(values) != len(self.keys):
+            msg = "Cursor does not match the pagination keys."
+            raise InvalidCursor(msg)
+
+        opts = self.queryset.model._meta  # noqa: SLF001
+        try:
+            return [
+                opts.get_field(key).to_python(value)
+                for key, value in zip(self.keys, values, strict=True)
+            ]
+        except ValidationError as e:
+            msg = "Cursor holds invalid key values."
+            raise InvalidCursor(msg) from e
+
+    def after(self, values):
+        """Q matching rows strictly past ``values`` in the page order."""
+        lookup = "lt" if self.descending else "gt"
+        condition = Q()
+        for index in reversed(range(len(self.keys))):
+            equal = dict(zip(self.keys[:index], values, strict=False))
+            past = Q(**equal, **{f"{self.keys[index]}__{lookup}": values[index]})
+            condition = past | condition if condition else past
+        return condition
+
+    def page(self, cursor=None):
+        queryset = self.queryset.order_by(*self.ordering)
+        if cursor:
+            queryset = queryset.filter(self.after(self.decode_cursor(cursor)))
+
+        rows = list(queryset[: self.per_page + 1])
+        next_cursor = None
+        if len(rows) > self.per_page:
+            rows = rows[: self.per_page]
+            next_cursor = self.encode_cursor(rows[-1])
+        return KeysetPage(rows, next_cursor)
+
+    def get_page(self, cursor=None):
+        """Like ``page`` but falls back to the first page on a bad cursor."""
+        try:
+            return self.page(cursor)
+        except InvalidCursor:
+            return self.page()
@@ -1,12 +1,28 @@
+from django.core.exceptions import ValidationError
 from import_export import fields
 from import_export import resources
+from import_export.results import Error
+from import_export.results import Result
+from import_export.results import RowResult
 
 from config.settings.base import DATE_INPUT_FORMATS
 
 from .models import Flock
 from .models import Stats
+from .validators import validate_stats_import_row
 from .widgets import MultiFormatDateWidget
 
+IMPORT_CHUNK_SIZE = 500
+
+
+def import_error_messages(result):
+    """Base errors, then one ``"Row N: ..."`` line per failed row."""
+    return [str(err.error) for err in result.base_errors] + [
+        f"Row {row}: {err.error}"
+        for row, row_errors in result.row_errors()
+        for err in row_errors
+    ]
+
 
 class FlockResource(resources.ModelResource):
     class Meta:
@@ -31,7 +47,6 @@ class StatsResource(resources.ModelResource):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.flock = None
-        self._day_counter = None
 
     # 🔹 inject FK BEFORE validation
     def init_instance(self, row=None):
@@ -44,23 +59,89 @@ class StatsResource(resources.ModelResource):
             msg = "Flock must be set on resource before import"
             raise ValueError(msg)
 
-        last_day = (
-            Stats.objects.filter(flock=self.flock)
-            .order_by("-day")
-            .values_list("day", flat=True)
-            .first()
-        )
-        self._day_counter = (last_day or 0) + 1
-
     def before_import_row(self, row, **kwargs):
-        self._set_day(row)
-
-    def _set_day(self, row):
+        # Days come from Flock.reserve_days when each row is saved.
         row.pop("id", None)
         row.pop("flock", None)
-        if not row.get("day"):
-            row["day"] = self._day_counter
-            self._day_counter += 1
+
+    def bulk_validate(self, dataset):
+        """
+        Validate every row of ``dataset`` in memory, without writing.
+
+        Reads the flock's existing dates once and checks file duplicates,
+        gaps, date bounds and harvested vs. flock size. Returns the
+        ``Result`` and the unsaved ``Stats`` of the valid rows, in order.
+        """
+        if not self.flock:
+            msg = "Flock must be set on resource before import"
+            raise ValueError(msg)
+
+        result = Result()
+        headers = dataset.headers or []
+        result.add_dataset_headers(headers)
+        result.total_rows = len(dataset)
+
+        known_dates = set(self.flock.stats.order_by().values_list("date", flat=True))
+        last_date = max(known_dates, default=None)
+
+        columns = [
+            name for name, field in self.fields.items() if field.column_name in headers
+        ]
+        instances = []
+        for row in dataset.dict:
+            row_result = RowResult()
+            instance, errors = self._clean_bulk_row(
+                row,
+                columns,
+                known_dates,
+                last_date,
+            )
+            if errors:
+                row_result.import_type = RowResult.IMPORT_TYPE_ERROR
+                row_result.errors.append(Error(ValidationError(errors), row=row))
+            else:
+                known_dates.add(instance.date)
+                last_date = max(last_date or instance.date, instance.date)
+                row_result.import_type = RowResult.IMPORT_TYPE_NEW
+                row_result.instance = instance
+                instances.append(instance)
+            result.increment_row_result_total(row_result)
+            result.append_row_result(row_result)
+        return result, instances
+
+    def _clean_bulk_row(self, row, columns, known_dates, last_date):
+        errors = {}
+        values = {}
+        for name in columns:
+            try:
+                values[name] = self.fields[name].clean(row)
+            except (ValueError, ArithmeticError) as e:
+                errors.setdefault(name, []).append(str(e))
+
+        instance = Stats(flock=self.flock, **values)
+        unchecked = [
+            field.name
+            for field in Stats._meta.fields  # noqa: SLF001
+            if field.name not in values
+        ]
+        try:
+            instance.clean_fields(exclude=unchecked)
+        except ValidationError as e:
+            for name, messages in e.message_dict.items():
+                errors.setdefault(name, []).extend(messages)
+
+        try:
+            validate_stats_import_row(
+                {name: value for name, value in values.items() if name not in errors},
+                self.flock,
+                known_dates=known_dates,
+                last_date=last_date,
+            )
+        except ValidationError as e:
+            for name, messages in e.message_dict.items():
+                errors.setdefault(name, []).extend(messages)
+
+        return instance, errors
 
     class Meta:
         model = Stats
@@ -75,3 +156,13 @@ class StatsResource(resources.ModelResource):
         skip_unchanged = True
         use_transactions = True
         clean_model_instances = True
+
+
+class FlockStatsResource(StatsResource):
+    """``StatsResource`` with each row's flock, for exports of several flocks."""
+
+    flock_id = fields.Field(column_name="flock_id", attribute="flock_id")
+    flock = fields.Field(column_name="flock", attribute="flock__title")
+
+    class Meta(StatsResource.Meta):
+        fields = ("flock_id", "flock", *StatsResource.Meta.fields)
@@ -0,0 +1,922 @@
+import csv
+import io
+from dataclasses import dataclass
+from datetime import date
+from functools import lru_cache
+
+import numpy as np
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.core.cache import cache
+from django.db.models import Avg
+from django.db.models import Count
+from django.db.models import FloatField
+from django.db.models import Max
+from django.db.models import Min
+from django.db.models import Q
+from django.db.models import Sum
+from django.db.models.functions import Cast
+
+from .cache import FLOCK_CACHE_TIMEOUT
+from .cache import flock_cache_key
+from .models import Flock
+from .models import Stats
+from .models import StatsRollup
+from .utils import Echo
+
+
+@dataclass(frozen=True)
+class FlockStatsSnapshot:
+    """Date bounds and aggregates of a flock's stats for one date range.
+
+    ``min_date``/``max_date`` always cover the whole flock (they feed the
+    filter widgets); every other number covers only the selected range.
+    """
+
+    min_date: date | None
+    max_date: date | None
+    stats_count: int
+    total_harvested: int
+    avg_harvested: float
+    average_percentage: float
+    total_feed_consumed: float
+    avg_daily_feed_consumed: float
+    total_mortality: int
+
+    # Mortality and feed are never negative, so "every row is zero" is the
+    # same as "the sum is zero" and needs no extra EXISTS query.
+    @property
+    def all_mortality_zero(self):
+        return not self.total_mortality
+
+    @property
+    def all_feed_zero(self):
+        return not self.total_feed_consumed
+
+    @property
+    def aggregates(self):
+        """The numbers shown by ``components/flock_info_card.html``."""
+        return {
+            "total_harvested": self.total_harvested,
+            "avg_harvested": self.avg_harvested,
+            "average_percentage": self.average_percentage,
+            "total_feed_consumed": self.total_feed_consumed,
+            "avg_daily_feed_consumed": self.avg_daily_feed_consumed,
+            "total_mortality": self.total_mortality,
+        }
+
+    @classmethod
+    def for_flock(cls, flock, start_date=None, end_date=None):
+        """Build the snapshot with a single query.
+
+        Without a date range the totals come from the maintained
+        ``FlockSummary`` and only the (index-backed) date bounds are read.
+        """
+        if start_date is None and end_date is None:
+            bounds = flock.stats.order_by().aggregate(
+                min_date=Min("date"),
+                max_date=Max("date"),
+            )
+            summary = flock.flock_summary
+            return cls(
+                **bounds,
+                stats_count=summary.stats_count,
+                **summary.as_aggregates(),
+            )
+
+        in_range = Q()
+        if start_date:
+            in_range &= Q(date__gte=start_date)
+        if end_date:
+            in_range &= Q(date__lte=end_date)
+
+        row = flock.stats.order_by().aggregate(
+            min_date=Min("date"),
+            max_date=Max("date"),
+            stats_count=Count("pk", filter=in_range),
+            total_harvested=Sum("harvested", filter=in_range, default=0),
+            avg_harvested=Avg("harvested", filter=in_range, default=0.0),
+            average_percentage=Avg("percentage", filter=in_range, default=0.0),
+            total_feed_consumed=Sum("feed_consumed", filter=in_range, default=0.0),
+            avg_daily_feed_consumed=Avg("feed_consumed", filter=in_range, default=0.0),
+            total_mortality=Sum("mortality", filter=in_range, default=0),
+        )
+        row["average_percentage"] = float(row["average_percentage"])
+        return cls(**row)
+
+
+CHART_DEFAULT_DAYS = 30
+CHART_MAX_DAYS = 3650
+CHART_MAX_POINTS = 120
+
+
+def parse_chart_days(value, default=CHART_DEFAULT_DAYS):
+    """Clamp the ``days`` query parameter to ``1..CHART_MAX_DAYS``."""
+    try:
+        days = int(value)
+    except (TypeError, ValueError):
+        days = default
+    return max(1, min(days, CHART_MAX_DAYS))
+
+
+@dataclass(frozen=True)
+class FlockChartSeries:
+    """Day-aligned laying percentages of several flocks for the comparison chart.
+
+    Every dataset has one point per label; days without a record are
+    ``None`` so Chart.js draws a gap instead of shifting later days left.
+    Windows longer than ``max_points`` days are averaged into equal buckets.
+    """
+
+    days: int
+    bucket_size: int
+    labels: list
+    datasets: list
+
+    @classmethod
+    def for_flocks(cls, flocks, days, max_points=CHART_MAX_POINTS, versions=None):
+        """Build the series for ``flocks`` (in their given order) with one query.
+
+        With ``versions`` (see ``apps.ducks.cache.get_flock_versions``) each
+        flock's row is cached under its version and only the flocks missing
+        from the cache are queried.
+        """
+        flocks = list(flocks)
+        bucket_size = max(1, -(-days // max_points))
+        bucket_count = -(-days // bucket_size)
+
+        rows = {}
+        keys = {}
+        if versions is not None:
+            keys = {
+                flock.pk: flock_cache_key(
+                    "chart",
+                    flock.pk,
+                    versions[flock.pk],
+                    days,
+                    bucket_size,
+                )
+                for flock in flocks
+            }
+            cached = cache.get_many(keys.values())
+            rows = {pk: cached[key] for pk, key in keys.items() if key in cached}
+
+        missing = [flock.pk for flock in flocks if flock.pk not in rows]
+        if missing:
+            built = dict(
+                zip(
+                    missing,
+                    cls._build_rows(missing, days, bucket_size, bucket_count),
+                    strict=True,
+                ),
+            )
+            rows.update(built)
+            if keys:
+                cache.set_many(
+                    {keys[pk]: row for pk, row in built.items()},
+                    FLOCK_CACHE_TIMEOUT,
+                )
+
+        if bucket_size > 1:
+            labels = [
+                f"{start}-{min(start + bucket_size - 1, days)}"
+                for start in range(1, days + 1, bucket_size)
+            ]
+        else:
+            labels = list(range(1, days + 1))
+
+        datasets = [{"label": flock.title, "data": rows[flock.pk]} for flock in flocks]
+        return cls(
+            days=days,
+            bucket_size=bucket_size,
+            labels=labels,
+            datasets=datasets,
+        )
+
+    @staticmethod
+    def _build_rows(flock_ids, days, bucket_size, bucket_count):
+        """One row of (bucketed) percentages per flock id, gaps as ``None``."""
+        grid = np.full((len(flock_ids), bucket_count * bucket_size), np.nan)
+        row_of = {flock_id: row for row, flock_id in enumerate(flock_ids)}
+        records = list(
+            Stats.objects.filter(
+                flock_id__in=row_of,
+                day__gte=1,
+                day__lte=days,
+            )
+            .order_by()
+            .values_list("flock_id", "day", "percentage"),
+        )
+        if records:
+            record_flocks, day_numbers, percentages = zip(*records, strict=True)
+            rows = np.fromiter(
+                (row_of[flock_id] for flock_id in record_flocks),
+                dtype=np.intp,
+                count=len(records),
+            )
+            columns = np.asarray(day_numbers, dtype=np.intp) - 1
+            grid[rows, columns] = np.asarray(percentages, dtype=float)
+
+        if bucket_size > 1:
+            buckets = grid.reshape(len(flock_ids), bucket_count, bucket_size)
+            present = ~np.isnan(buckets)
+            counts = present.sum(axis=2)
+            sums = np.where(present, buckets, 0.0).sum(axis=2)
+            grid = np.divide(
+                sums,
+                counts,
+                out=np.full(counts.shape, np.nan),
+                where=counts > 0,
+            )
+
+        values = np.round(grid, 2).astype(object)
+        values[np.isnan(grid)] = None
+        return values.tolist()
+
+
+CHART_DATA_DEFAULT_POINTS = 300
+CHART_DATA_MIN_POINTS = 10
+CHART_DATA_MAX_POINTS = 2000
+CHART_DATA_FIELDS = ("harvested", "percentage", "mortality", "feed_consumed")
+
+
+def parse_chart_points(value, default=CHART_DATA_DEFAULT_POINTS):
+    """Clamp the ``points`` query parameter to the supported range."""
+    try:
+        points = int(value)
+    except (TypeError, ValueError):
+        points = default
+    return max(CHART_DATA_MIN_POINTS, min(points, CHART_DATA_MAX_POINTS))
+
+
+def lttb_indices(x, y, threshold):
+    """Indices of the points kept by Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept; every bucket in between keeps
+    the point forming the largest triangle with the previously kept point
+    and the average of the next bucket, so peaks and dips survive the
+    downsampling where a plain bucket mean would flatten them.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    # The two end points plus at least one bucket.
+    if threshold >= n or threshold < 3:  # noqa: PLR2004
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.intp)
+    kept = np.empty(threshold, dtype=np.intp)
+    kept[0] = 0
+    kept[-1] = n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        next_stop = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x = x[stop:next_stop].mean()
+        next_y = y[stop:next_stop].mean()
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:stop] - y[previous])
+            - (x[previous] - x[start:stop]) * (next_y - y[previous]),
+        )
+        previous = start + int(areas.argmax())
+        kept[bucket + 1] = previous
+    return kept
+
+
+@dataclass(frozen=True)
+class FlockChartData:
+    """The detail page charts of one flock, downsampled to ``points`` per series.
+
+    Each series carries its own ``labels`` (ISO dates) because LTTB keeps a
+    different subset of days for every metric.
+    """
+
+    total: int
+    points: int
+    series: dict
+
+    def as_json(self):
+        return {"total": self.total, "points": self.points, "series": self.series}
+
+    @classmethod
+    def for_flock(  # noqa: PLR0913
+        cls,
+        flock,
+        start_date=None,
+        end_date=None,
+        points=CHART_DATA_DEFAULT_POINTS,
+        granularity=None,
+        version=None,
+    ):
+        """Build the series with one query; cached per flock ``version`` if given.
+
+        With a ``granularity`` (``"week"``/``"month"``) each point is one
+        ``StatsRollup`` bucket: totals for harvest, mortality and feed and
+        the mean laying percentage.
+        """
+        key = None
+        if version is not None:
+            key = flock_cache_key(
+                "chart-data",
+                flock.pk,
+                version,
+                start_date,
+                end_date,
+                points,
+                granularity,
+            )
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+
+        if granularity:
+            records = cls._rollup_records(flock, granularity, start_date, end_date)
+        else:
+            queryset = flock.stats.order_by("date")
+            if start_date:
+                queryset = queryset.filter(date__gte=start_date)
+            if end_date:
+                queryset = queryset.filter(date__lte=end_date)
+            records = list(queryset.values_list("date", *CHART_DATA_FIELDS))
+        data = cls._build(records, points)
+
+        if key is not None:
+            cache.set(key, data, FLOCK_CACHE_TIMEOUT)
+        return data
+
+    @staticmethod
+    def _rollup_records(flock, granularity, start_date, end_date):
+        rollups = StatsRollup.objects.in_range(
+            flock,
+            granularity,
+            start_date,
+            end_date,
+        ).values_list(
+            "period_start",
+            "stats_count",
+            "total_harvested",
+            "total_percentage",
+            "total_mortality",
+            "total_feed_consumed",
+        )
+        return [
+            (start, harvested, percentage / count, mortality, feed)
+            for start, count, harvested, percentage, mortality, feed in rollups
+        ]
+
+    @classmethod
+    def _build(cls, records, points):
+        if not records:
+            series = {field: {"labels": [], "data": []} for field in CHART_DATA_FIELDS}
+            return cls(total=0, points=points, series=series)
+
+        dates, *columns = zip(*records, strict=True)
+        ordinals = np.fromiter((day.toordinal() for day in dates), dtype=float)
+        labels = np.array([day.isoformat() for day in dates], dtype=object)
+
+        series = {}
+        for field, column in zip(CHART_DATA_FIELDS, columns, strict=True):
+            values = np.asarray(column, dtype=float)
+            kept = lttb_indices(ordinals, values, points)
+            series[field] = {
+                "labels": labels[kept].tolist(),
+                "data": np.round(values[kept], 2).tolist(),
+            }
+        return cls(total=len(records), points=points, series=series)
+
+
+COHORT_PERCENTILES = {"p10": 10, "median": 50, "p90": 90}
+
+
+def _distribution(grid):
+    """Per column of ``grid`` (``nan`` = no record): count, mean and percentiles.
+
+    The percentiles interpolate linearly between the closest ranks, like
+    ``np.nanpercentile``, but from a single sort of the whole grid instead
+    of a partition per column.
+    """
+    present = ~np.isnan(grid)
+    counts = present.sum(axis=0)
+    sums = np.where(present, grid, 0).sum(axis=0, dtype=float)
+    curves = {
+        "mean": np.divide(
+            sums,
+            counts,
+            out=np.full(counts.shape, np.nan),
+            where=counts > 0,
+        ),
+    }
+    if not len(grid):
+        curves.update(dict.fromkeys(COHORT_PERCENTILES, curves["mean"]))
+        return counts, curves
+
+    ordered = np.sort(grid, axis=0)  # ``nan`` sorts last
+    last = np.maximum(counts - 1, 0)
+    for name, percentile in COHORT_PERCENTILES.items():
+        position = last * (percentile / 100)
+        lower = np.floor(position).astype(np.intp)
+        upper = np.minimum(lower + 1, last)
+        low = np.take_along_axis(ordered, lower[None, :], axis=0)[0]
+        high = np.take_along_axis(ordered, upper[None, :], axis=0)[0]
+        values = low + (high - low) * (position - lower)
+        values[counts == 0] = np.nan
+        curves[name] = values
+    return counts, curves
+
+
+def percentile_ranks(grid, values):
+    """Percentile rank of ``values[d]`` among column ``d`` of ``grid``.
+
+    Ties count half, so a value equal to every flock's ranks 50; ``nan``
+    where the value or the whole column is missing.
+    """
+    values = np.asarray(values, dtype=float)
+    counts = (~np.isnan(grid)).sum(axis=0)
+    below = (grid < values).sum(axis=0)
+    equal = (grid == values).sum(axis=0)
+    ranks = np.divide(
+        (below + equal / 2) * 100,
+        counts,
+        out=np.full(counts.shape, np.nan),
+        where=counts > 0,
+    )
+    ranks[np.isnan(values)] = np.nan
+    return ranks
+
+
+def _json_values(values):
+    """``values`` rounded to 2 decimals, ``nan`` as ``None``."""
+    values = np.asarray(values, dtype=float)
+    rounded = np.round(values, 2).astype(object)
+    rounded[np.isnan(values)] = None
+    return rounded.tolist()
+
+
+@dataclass(frozen=True)
+class CohortData:
+    """Laying percentage and cumulative mortality of every flock by day of lay.
+
+    Row ``i`` of both grids is flock ``flock_ids[i]`` and column ``d`` its
+    day ``d + 1``; days without a record are ``nan``. Mortality is the
+    running total of deaths as a percentage of the flock's ``number_of_ducks``.
+    """
+
+    version: int | None
+    flock_ids: np.ndarray
+    percentage: np.ndarray
+    mortality: np.ndarray
+
+    @property
+    def days(self):
+        return self.percentage.shape[1]
+
+    @classmethod
+    def load(cls, version=None, max_days=CHART_MAX_DAYS):
+        """Read ``(flock_id, day, percentage, mortality)`` of every record.
+
+        One aggregate query returns each column as a single array (in the
+        same row order, as all the aggregates read the same rows), and a
+        second one the flock sizes; the grids are filled by fancy indexing.
+        """
+        row = (
+            Stats.objects.filter(day__gte=1, day__lte=max_days)
+            .order_by()
+            .aggregate(
+                flock_ids=ArrayAgg("flock_id", default=[]),
+                days=ArrayAgg("day", default=[]),
+                percentage=ArrayAgg(Cast("percentage", FloatField()), default=[]),
+                mortality=ArrayAgg("mortality", default=[]),
+            )
+        )
+        flock_ids, rows = np.unique(
+            np.asarray(row["flock_ids"], dtype=np.int64),
+            return_inverse=True,
+        )
+        columns = np.asarray(row["days"], dtype=np.intp) - 1
+        shape = (len(flock_ids), int(columns.max()) + 1 if len(columns) else 0)
+
+        percentage = np.full(shape, np.nan, dtype=np.float32)
+        percentage[rows, columns] = row["percentage"]
+        deaths = np.zeros(shape)
+        deaths[rows, columns] = row["mortality"]
+
+        sizes = dict(
+            Flock.objects.filter(pk__in=flock_ids.tolist()).values_list(
+                "pk",
+                "number_of_ducks",
+            ),
+        )
+        flock_sizes = np.fromiter(
+            (sizes.get(flock_id, 0) for flock_id in flock_ids.tolist()),
+            dtype=float,
+            count=len(flock_ids),
+        )
+        mortality = np.divide(
+            np.cumsum(deaths, axis=1) * 100,
+            flock_sizes[:, None],
+            out=np.full(shape, np.nan),
+            where=flock_sizes[:, None] > 0,
+        ).astype(np.float32)
+        mortality[np.isnan(percentage)] = np.nan
+        return cls(
+            version=version,
+            flock_ids=flock_ids,
+            percentage=percentage,
+            mortality=mortality,
+        )
+
+    @classmethod
+    def current(cls, version):
+        """The data of stats ``version``, loaded once per process."""
+        return _load_cohort_data(version)
+
+    def flock_row(self, flock_id):
+        """Index of ``flock_id`` in the grids, or ``None`` without records."""
+        row = int(np.searchsorted(self.flock_ids, flock_id))
+        if row < len(self.flock_ids) and self.flock_ids[row] == flock_id:
+            return row
+        return None
+
+
+@lru_cache(maxsize=1)
+def _load_cohort_data(version):
+    return CohortData.load(version)
+
+
+@dataclass(frozen=True)
+class FlockCohortComparison:
+    """One flock against the distribution of every other flock, by day of lay.
+
+    ``percentage`` and ``mortality`` (cumulative, % of the starting ducks)
+    hold the cohort's ``mean``, ``median``, ``p10`` and ``p90`` per day,
+    plus the flock's own value (``flock``) and, for the laying percentage,
+    its percentile ``rank`` within the cohort. Each list has one entry per
+    day in ``labels``; ``None`` where there is nothing to show.
+    """
+
+    flock_id: int
+    labels: list
+    cohort_size: list
+    percentage: dict
+    mortality: dict
+    latest: dict | None
+
+    def as_json(self):
+        return {
+            "labels": self.labels,
+            "cohort_size": self.cohort_size,
+            "percentage": self.percentage,
+            "mortality": self.mortality,
+            "latest": self.latest,
+        }
+
+    @classmethod
+    def for_flock(cls, flock, version=None, data=None):
+        """Compare ``flock`` with the others; cached per stats ``version`` if given.
+
+        ``version`` is ``apps.ducks.cache.get_stats_version()``, which every
+        stats write changes; the grids of that version are loaded once per
+        process and shared by every flock's comparison.
+        """
+        key = None
+        if version is not None:
+            key = flock_cache_key("cohort", flock.pk, version)
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+
+        if data is None:
+            data = CohortData.load() if version is None else CohortData.current(version)
+        comparison = cls.from_data(flock.pk, data)
+
+        if key is not None:
+            cache.set(key, comparison, FLOCK_CACHE_TIMEOUT)
+        return comparison
+
+    @classmethod
+    def from_data(cls, flock_id, data):
+        row = data.flock_row(flock_id)
+        others = np.ones(len(data.flock_ids), dtype=bool)
+        own_percentage = own_mortality = np.full(data.days, np.nan)
+        if row is not None:
+            others[row] = False
+            own_percentage = data.percentage[row].astype(float)
+            own_mortality = data.mortality[row].astype(float)
+        cohort_percentage = data.percentage[others]
+        counts, percentage = _distribution(cohort_percentage)
+        _, mortality = _distribution(data.mortality[others])
+        ranks = percentile_ranks(cohort_percentage, own_percentage)
+
+        latest = None
+        recorded = np.flatnonzero(~np.isnan(own_percentage))
+        if len(recorded):
+            day = int(recorded[-1])
+            latest = {
+                "day": day + 1,
+                "percentage": _json_values(own_percentage[day : day + 1])[0],
+                "median": _json_values(percentage["median"][day : day + 1])[0],
+                "rank": _json_values(ranks[day : day + 1])[0],
+                "cohort_size": int(counts[day]),
+            }
+
+        return cls(
+            flock_id=flock_id,
+            labels=list(range(1, data.days + 1)),
+            cohort_size=counts.tolist(),
+            percentage={
+                **{name: _json_values(values) for name, values in percentage.items()},
+                "flock": _json_values(own_percentage),
+                "rank": _json_values(ranks),
+            },
+            mortality={
+                **{name: _json_values(values) for name, values in mortality.items()},
+                "flock": _json_values(own_mortality),
+            },
+            latest=latest,
+        )
+
+
+FEED_SACK_GRAMS = 50 * 1000
+INCOME_SWEEP_TABLE_ROWS = 50
+INCOME_SWEEP_CSV_CHUNK_SIZE = 10_000
+# Break-even surfaces are only drawn as tables up to this many rows/columns.
+INCOME_SWEEP_SURFACE_MAX_SIZE = 25
+
+
+@dataclass(frozen=True)
+class IncomeSweep:
+    """The income calculator evaluated over every combination of its inputs.
+
+    Flock sizes, production percentages, prices of the first egg type and
+    feed prices span a 4-D grid that is computed in one pass of NumPy
+    broadcasting with the calculator's own formulas; ``columns`` holds one
+    flat array per output, one entry per scenario. ``break_even`` gives, per
+    feed price, flock size and production %, the first egg type's price at
+    which the net income is zero (``nan`` when that type lays no eggs).
+    Per-type incomes are keyed ``income_<row>``, as egg type names need not
+    be unique; ``egg_type_names`` gives the name of each row.
+    """
+
+    flock_sizes: np.ndarray
+    production_percents: np.ndarray
+    egg_prices: np.ndarray
+    feed_prices: np.ndarray
+    egg_type_names: list
+    columns: dict
+    break_even: np.ndarray
+
+    @property
+    def size(self):
+        return len(self.columns["net_income"])
+
+    @classmethod
+    def evaluate(  # noqa: PLR0913
+        cls,
+        flock_sizes,
+        production_percents,
+        egg_prices,
+        feed_prices,
+        egg_types,
+        feed_quantity_g,
+        expenses_total,
+    ):
+        """``egg_types`` is ``(name, percent, price)`` per row; the first
+        row's price is replaced by each of ``egg_prices``."""
+        sizes = np.asarray(flock_sizes, dtype=float)
+        percents = np.asarray(production_percents, dtype=float)
+        prices = np.asarray(egg_prices, dtype=float)
+        feeds = np.asarray(feed_prices, dtype=float)
+        expenses = float(expenses_total)
+        shape = (len(sizes), len(percents), len(prices), len(feeds))
+
+        # Axes: flock size, production %, egg price, feed price.
+        size = sizes[:, None, None, None]
+        total_eggs = size * percents[None, :, None, None] / 100
+        incomes = {}
+        for index, (_, percent, price) in enumerate(egg_types):
+            type_price = prices[None, None, :, None] if index == 0 else float(price)
+            incomes[f"income_{index}"] = total_eggs * (percent / 100) * type_price
+        total_income = sum(incomes.values(), np.zeros(shape))
+        feed_cost = size * (feed_quantity_g / FEED_SACK_GRAMS) * feeds
+        net_income = total_income - feed_cost - expenses
+        expenses_per_egg = np.divide(
+            expenses,
+            total_eggs,
+            out=np.zeros_like(total_eggs),
+            where=total_eggs > 0,
+        )
+        cost_per_egg = feeds / FEED_SACK_GRAMS * feed_quantity_g + expenses_per_egg
+
+        first_type_eggs = total_eggs * (egg_types[0][1] / 100 if egg_types else 0)
+        other_income = total_income - incomes.get("income_0", 0)
+        # Same for every egg price: take the first slice of that axis.
+        break_even = np.divide(
+            feed_cost + expenses - other_income[:, :, :1, :],
+            first_type_eggs,
+            out=np.full(np.broadcast_shapes(feed_cost.shape, total_eggs.shape), np.nan),
+            where=first_type_eggs > 0,
+        ).clip(min=0)
+
+        grid = np.meshgrid(sizes, percents, prices, feeds, indexing="ij")
+        outputs = {
+            "flock_size": grid[0],
+            "production_percent": grid[1],
+            "egg_price": grid[2],
+            "feed_price_per_sack": grid[3],
+            "total_eggs": total_eggs,
+            **incomes,
+            "total_income": total_income,
+            "feed_cost": feed_cost,
+            "expenses": np.full(shape, expenses),
+            "net_income": net_income,
+            "production_cost_per_egg": cost_per_egg,
+            "break_even_egg_price": break_even,
+        }
+        columns = {
+            name: np.broadcast_to(values, shape).ravel()
+            for name, values in outputs.items()
+        }
+        return cls(
+            flock_sizes=sizes,
+            production_percents=percents,
+            egg_prices=prices,
+            feed_prices=feeds,
+            egg_type_names=[name for name, _, _ in egg_types],
+            columns=columns,
+            # (size, percent, 1, feed) -> (feed, size, percent)
+            break_even=break_even[:, :, 0, :].transpose(2, 0, 1),
+        )
+
+    @property
+    def profitable_count(self):
+        return int((self.columns["net_income"] > 0).sum())
+
+    def best_rows(self, limit=INCOME_SWEEP_TABLE_ROWS):
+        """The ``limit`` scenarios with the highest net income, best first."""
+        net_income = self.columns["net_income"]
+        limit = min(limit, self.size)
+        top = np.argpartition(-net_income, limit - 1)[:limit]
+        top = top[np.argsort(-net_income[top], kind="stable")]
+        return [
+            {name: values[index].item() for name, values in self.columns.items()}
+            for index in top
+        ]
+
+    def surfaces(self):
+        """Break-even tables per feed price, or ``[]`` if too large to show."""
+        if max(len(self.flock_sizes), len(self.production_percents)) > (
+            INCOME_SWEEP_SURFACE_MAX_SIZE
+        ):
+            return []
+        surfaces = []
+        for feed_price, surface in zip(self.feed_prices, self.break_even, strict=True):
+            values = np.round(surface, 2).astype(object)
+            values[np.isnan(surface)] = None
+            rows = [
+                {"flock_size": int(size), "prices": row}
+                for size, row in zip(self.flock_sizes, values.tolist(), strict=True)
+            ]
+            surfaces.append({"feed_price": feed_price.item(), "rows": rows})
+        return surfaces
+
+    def column_labels(self):
+        """Column names for display, with each egg type's name in its income."""
+        labels = {
+            f"income_{index}": f"income_{name}"
+            for index, name in enumerate(self.egg_type_names)
+        }
+        return [labels.get(name, name) for name in self.columns]
+
+    def iter_csv(self, chunk_size=INCOME_SWEEP_CSV_CHUNK_SIZE):
+        """Every scenario as CSV, in grid order, ``chunk_size`` rows per chunk."""
+        # Rows are numbers, but names in the header may need quoting.
+        yield csv.writer(Echo(), lineterminator="\n").writerow(self.column_labels())
+        table = np.column_stack(list(self.columns.values()))
+        for start in range(0, len(table), chunk_size):
+            buffer = io.StringIO()
+            np.savetxt(
+                buffer,
+                table[start : start + chunk_size],
+                delimiter=",",
+                fmt="%.10g",
+            )
+            yield buffer.getvalue()
+
+
+@dataclass(frozen=True)
+class FlockIncomeReport:
+    """Realized income of a flock over a date range, from its recorded stats.
+
+    The income calculator's formulas applied to every recorded day: eggs
+    are the day's ``harvested`` split by the egg types' percentages, feed
+    cost is the day's ``feed_consumed`` (sacks) at ``feed_price`` and
+    ``expenses`` are per day. ``days`` holds one array per column; per-type
+    incomes are ``income_<row>``, named by ``egg_type_names``.
+    """
+
+    flock: object
+    egg_type_names: list
+    days: dict
+    totals: dict
+
+    @property
+    def day_count(self):
+        return len(self.days["date"])
+
+    @classmethod
+    def for_flock(  # noqa: PLR0913
+        cls,
+        flock,
+        egg_types,
+        feed_price,
+        expenses,
+        start_date=None,
+        end_date=None,
+    ):
+        """Build the report from one aggregate query over the flock's stats.
+
+        ``egg_types`` is ``(name, percent, price)`` per row, as in the
+        calculator's egg type formset.
+        """
+        queryset = flock.stats.order_by()
+        if start_date:
+            queryset = queryset.filter(date__gte=start_date)
+        if end_date:
+            queryset = queryset.filter(date__lte=end_date)
+        row = queryset.aggregate(
+            dates=ArrayAgg("date", order_by="date", default=[]),
+            harvested=ArrayAgg("harvested", order_by="date", default=[]),
+            percentage=ArrayAgg("percentage", order_by="date", default=[]),
+            feed_consumed=ArrayAgg("feed_consumed", order_by="date", default=[]),
+        )
+
+        harvested = np.asarray(row["harvested"], dtype=float)
+        feed_consumed = np.asarray(row["feed_consumed"], dtype=float)
+        expenses = float(expenses)
+
+        incomes = {
+            f"income_{index}": harvested * (percent / 100) * float(price)
+            for index, (_, percent, price) in enumerate(egg_types)
+        }
+        income = sum(incomes.values(), np.zeros_like(harvested))
+        feed_cost = feed_consumed * float(feed_price)
+        cost = feed_cost + expenses
+        net_income = income - cost
+        cost_per_egg = np.divide(
+            cost,
+            harvested,
+            out=np.full_like(harvested, np.nan),
+            where=harvested > 0,
+        )
+
+        days = {
+            "date": row["dates"],
+            "harvested": harvested,
+            "percentage": np.asarray(row["percentage"], dtype=float),
+            "feed_consumed": feed_consumed,
+            **incomes,
+            "income": income,
+            "feed_cost": feed_cost,
+            "expenses": np.full_like(harvested, expenses),
+            "net_income": net_income,
+            "cumulative_net_income": np.cumsum(net_income),
+            "cost_per_egg": cost_per_egg,
+        }
+        total_eggs = harvested.sum()
+        summed = (
+            "harvested",
+            "feed_consumed",
+            *incomes,
+            "income",
+            "feed_cost",
+            "expenses",
+            "net_income",
+        )
+        totals = {name: float(days[name].sum()) for name in summed}
+        totals["average_percentage"] = (
+            float(days["percentage"].mean()) if len(harvested) else 0.0
+        )
+        totals["cost_per_egg"] = (
+            float((feed_cost.sum() + expenses * len(harvested)) / total_eggs)
+            if total_eggs
+            else None
+        )
+        return cls(
+            flock=flock,
+            egg_type_names=[name for name, _, _ in egg_types],
+            days=days,
+            totals=totals,
+        )
+
+    def rows(self):
+        """One dict per day for the template; ``None`` where undefined."""
+        columns = {
+            name: values if name == "date" else np.round(values, 2).tolist()
+            for name, values in self.days.items()
+        }
+        return [
+            {
+                name: None if isinstance(value, float) and np.isnan(value) else value
+                for name, value in zip(columns, values, strict=True)
+            }
+            for values in zip(*columns.values(), strict=True)
+        ]
@@ -0,0 +1,171 @@
+import tempfile
+import time
+from itertools import batched
+
+from celery import shared_task
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.utils import timezone
+from tablib import Dataset
+from tablib.core import UnsupportedFormat
+
+from .metrics import record_export
+from .metrics import record_import
+from .models import Stats
+from .models import StatsExportJob
+from .models import StatsImportJob
+from .resources import IMPORT_CHUNK_SIZE
+from .resources import FlockStatsResource
+from .resources import StatsResource
+from .resources import import_error_messages
+from .utils import EXPORT_CHUNK_SIZE
+from .utils import iter_csv_export
+
+# Enough to fix a file by; the counters still cover every row.
+IMPORT_JOB_MAX_ERRORS = 50
+# Large files outlive the project-wide CELERY_TASK_SOFT_TIME_LIMIT.
+IMPORT_JOB_SOFT_TIME_LIMIT = 30 * 60
+# Exports are spooled in memory up to this size, then to a temporary file.
+EXPORT_SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+
+@shared_task(
+    soft_time_limit=IMPORT_JOB_SOFT_TIME_LIMIT,
+    time_limit=IMPORT_JOB_SOFT_TIME_LIMIT + 60,
+)
+def import_stats(job_id, chunk_size=IMPORT_CHUNK_SIZE):
+    """Import the CSV of a ``StatsImportJob``.
+
+    Every row is validated first, so an invalid file writes nothing. The
+    rows are then inserted ``chunk_size`` at a time, each chunk in its own
+    transaction, and the job's counters are updated after every commit.
+    A chunk that fails (a date saved concurrently) stops the import; the
+    chunks before it stay imported.
+    """
+    job = StatsImportJob.objects.select_related("flock").get(pk=job_id)
+    if job.status != StatsImportJob.Status.PENDING:
+        return job.status  # redelivered message
+
+    job.update_progress(
+        status=StatsImportJob.Status.RUNNING,
+        started_at=timezone.now(),
+    )
+    try:
+        _run_import(job, chunk_size)
+    except Exception:
+        _finish(job, StatsImportJob.Status.FAILED, ["The import failed unexpectedly."])
+        raise
+    finally:
+        record_import(job)
+    return job.status
+
+
+def _run_import(job, chunk_size):
+    dataset = Dataset()
+    try:
+        with job.file.open("rb") as file:
+            dataset.load(file.read().decode("utf-8-sig"), format="csv")
+    except (UnicodeDecodeError, UnsupportedFormat) as e:
+        _finish(job, StatsImportJob.Status.FAILED, [f"Could not read CSV file: {e}"])
+        return
+
+    resource = StatsResource()
+    resource.flock = job.flock
+    result, instances = resource.bulk_validate(dataset)
+    job.update_progress(total_rows=len(dataset))
+    if result.has_errors():
+        job.update_progress(rows_failed=len(result.row_errors()))
+        _finish(job, StatsImportJob.Status.FAILED, import_error_messages(result))
+        return
+
+    started = time.monotonic()
+    rows_done = 0
+    for chunk in batched(instances, chunk_size, strict=False):
+        try:
+            Stats.objects.bulk_insert(job.flock, chunk)
+        except ValidationError as e:
+            job.update_progress(rows_failed=len(instances) - rows_done)
+            _finish(job, StatsImportJob.Status.FAILED, e.messages)
+            return
+        rows_done += len(chunk)
+        elapsed = time.monotonic() - started
+        job.update_progress(
+            rows_done=rows_done,
+            rows_per_second=rows_done / elapsed if elapsed else 0.0,
+        )
+    _finish(job, StatsImportJob.Status.SUCCEEDED, [])
+
+
+def _finish(job, status, errors):
+    job.update_progress(
+        status=status,
+        errors=errors[:IMPORT_JOB_MAX_ERRORS],
+        finished_at=timezone.now(),
+    )
+
+
+@shared_task(
+    soft_time_limit=IMPORT_JOB_SOFT_TIME_LIMIT,
+    time_limit=IMPORT_JOB_SOFT_TIME_LIMIT + 60,
+)
+def export_stats(job_id, chunk_size=EXPORT_CHUNK_SIZE):
+    """Write the CSV of a ``StatsExportJob`` to ``default_storage``.
+
+    Rows are rendered ``chunk_size`` at a time by ``iter_csv_export`` into a
+    spooled temporary file, which is saved to the job's ``file`` once
+    complete; ``rows_done`` is updated after every chunk.
+    """
+    job = StatsExportJob.objects.get(pk=job_id)
+    if job.status != StatsExportJob.Status.PENDING:
+        return job.status  # redelivered message
+
+    job.update_progress(
+        status=StatsExportJob.Status.RUNNING,
+        started_at=timezone.now(),
+    )
+    try:
+        _run_export(job, chunk_size)
+    except Exception:
+        _finish(job, StatsExportJob.Status.FAILED, ["The export failed unexpectedly."])
+        raise
+    finally:
+        record_export(job)
+    return job.status
+
+
+def _run_export(job, chunk_size):
+    flock_ids = list(job.flocks.values_list("pk", flat=True))
+    queryset = Stats.objects.filter(flock_id__in=flock_ids)
+    if job.start_date:
+        queryset = queryset.filter(date__gte=job.start_date)
+    if job.end_date:
+        queryset = queryset.filter(date__lte=job.end_date)
+
+    if len(flock_ids) == 1:
+        resource = StatsResource()
+        queryset = queryset.order_by("date")
+    else:
+        resource = FlockStatsResource()
+        queryset = queryset.select_related("flock").order_by("flock_id", "date")
+
+    started = time.monotonic()
+    rows_done = 0
+
+    def on_chunk(rows):
+        nonlocal rows_done
+        rows_done += rows
+        job.update_progress(rows_done=rows_done)
+
+    with tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_SIZE) as spool:
+        for data in iter_csv_export(resource, queryset, chunk_size, on_chunk):
+            spool.write(data.encode())
+        size = spool.tell()
+        spool.seek(0)
+        job.file.save(f"stats_export_{job.pk}.csv", File(spool), save=False)
+
+    job.update_progress(
+        file=job.file.name,
+        size=size,
+        duration=time.monotonic() - started,
+    )
+    _finish(job, StatsExportJob.Status.SUCCEEDED, [])
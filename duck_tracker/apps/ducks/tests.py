@@ -1,12 +1,83 @@
+import asyncio
+import csv
+import io
+import json
+import re
+import tempfile
+import time
+from collections.abc import Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import date
 from datetime import timedelta
+from decimal import Decimal
+from http import HTTPStatus
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
+import numpy as np
 import pytest
+from asgiref.sync import async_to_sync
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db import transaction
 from django.test import TestCase
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 from django.utils import timezone
+from tablib import Dataset
 
+from config.metrics import ARCHIVE_FILE_NAME
+from config.metrics import Counter
+from config.metrics import Histogram
+from config.metrics import Registry
+from config.timing import RequestTimings
+from config.websocket import websocket_application
+
+from .benchmarks import Scenario
+from .benchmarks import compare
+from .benchmarks import run_benchmarks
+from .cache import get_flock_versions
+from .factories import FARM_START_DATE
+from .factories import FlockFactory
+from .factories import make_farm
 from .models import Flock
+from .models import FlockSummary
 from .models import Stats
+from .models import StatsExportJob
+from .models import StatsImportJob
+from .models import StatsRollup
+from .models import compute_percentage
+from .pagination import InvalidCursor
+from .pagination import KeysetPaginator
+from .resources import StatsResource
+from .services import CHART_DATA_MAX_POINTS
+from .services import CHART_DATA_MIN_POINTS
+from .services import CHART_MAX_DAYS
+from .services import CohortData
+from .services import FlockChartData
+from .services import FlockChartSeries
+from .services import FlockCohortComparison
+from .services import FlockIncomeReport
+from .services import FlockStatsSnapshot
+from .services import IncomeSweep
+from .services import lttb_indices
+from .services import parse_chart_days
+from .services import percentile_ranks
+from .tasks import export_stats
+from .tasks import import_stats
+from .urls import urlpatterns
+from .utils import iter_csv_export
+from .validators import duplicate_date_message
 
 DEFAULT_DUCK_COUNT = 100
 SMALL_DUCK_COUNT = 50
@@ -19,8 +90,35 @@ SECOND_DAY = 2
 HARVEST_DELTA = 5
 
 ZERO = 0
+METRICS_TOKEN = "s3cret"  # noqa: S105
 REL_TOLERANCE = 1e-2
 
+IN_MEMORY_STORAGES = {
+    **settings.STORAGES,
+    "default": {"BACKEND": "django.core.files.storage.InMemoryStorage"},
+}
+
+
+def data_queries(captured):
+    """SQL of captured queries, without ATOMIC_REQUESTS savepoints."""
+    return [
+        query["sql"]
+        for query in captured
+        if not query["sql"].startswith(("SAVEPOINT", "RELEASE SAVEPOINT"))
+    ]
+
+
+def import_dataset(flock, dataset, **kwargs):
+    """Upload ``dataset`` as a ``StatsImportJob`` and run ``import_stats``."""
+    with override_settings(STORAGES=IN_MEMORY_STORAGES):
+        job = StatsImportJob.objects.create(
+            flock=flock,
+            file=SimpleUploadedFile("stats.csv", dataset.csv.encode()),
+        )
+        import_stats(job.pk, **kwargs)
+    job.refresh_from_db()
+    return job
+
 
 class FlockModelTests(TestCase):
     """Unit tests for Flock model."""
@@ -123,6 +221,89 @@ class StatsModelTests(TestCase):
         with pytest.raises(ValidationError):
             duplicate.full_clean()
 
+    def test_day_comes_from_flock_counter(self):
+        with CaptureQueriesContext(connection) as captured:
+            stats = Stats.objects.create(
+                flock=self.flock,
+                date=timezone.now().date() - timedelta(days=2),
+                harvested=DEFAULT_HARVEST,
+            )
+        assert stats.day == SECOND_DAY + 1
+        lookups = [sql for sql in data_queries(captured) if "ORDER BY" in sql]
+        assert not lookups
+        self.flock.refresh_from_db()
+        assert self.flock.last_day == stats.day
+
+    def test_stale_flock_save_keeps_day_counter(self):
+        stale = Flock.objects.get(pk=self.flock.pk)
+        Stats.objects.create(
+            flock=self.flock,
+            date=timezone.now().date() - timedelta(days=2),
+            harvested=DEFAULT_HARVEST,
+        )
+        stale.title = "Renamed"
+        stale.save()
+        self.flock.refresh_from_db()
+        assert self.flock.title == "Renamed"
+        assert self.flock.last_day == SECOND_DAY + 1
+
+    def test_deleting_newest_entry_frees_its_day(self):
+        Stats.objects.get(pk=self.stats2.pk).delete()
+        stats = Stats.objects.create(
+            flock=self.flock,
+            date=self.stats2.date,
+            harvested=DEFAULT_HARVEST,
+        )
+        assert stats.day == SECOND_DAY
+
+    def test_failed_insert_does_not_consume_a_day(self):
+        duplicate = Stats(flock=self.flock, date=self.stats1.date, harvested=1)
+        with pytest.raises(ValidationError):
+            duplicate.save()
+        assert duplicate.day is None
+        self.flock.refresh_from_db()
+        assert self.flock.last_day == SECOND_DAY
+
+    def test_duplicate_date_save_maps_integrity_error(self):
+        duplicate = Stats(
+            flock=self.flock,
+            date=self.stats1.date,
+            harvested=HARVEST_DELTA,
+        )
+        with pytest.raises(ValidationError) as excinfo:
+            duplicate.save()
+        assert excinfo.value.message_dict["date"] == [
+            duplicate_date_message(self.stats1.date),
+        ]
+        assert self.flock.stats.count() == SECOND_DAY
+        assert FlockSummary.objects.get(flock=self.flock).stats_count == SECOND_DAY
+
+    def test_duplicate_date_full_clean_message(self):
+        duplicate = Stats(
+            flock=self.flock,
+            date=self.stats1.date,
+            harvested=HARVEST_DELTA,
+        )
+        with pytest.raises(ValidationError) as excinfo:
+            duplicate.full_clean()
+        assert duplicate_date_message(self.stats1.date) in excinfo.value.messages
+
+    def test_duplicate_date_form_error(self):
+        url = reverse("ducks:stats-add") + f"?flock={self.flock.pk}"
+        data = {
+            "date": self.stats1.date.isoformat(),
+            "harvested": HARVEST_DELTA,
+            "mortality": 0,
+            "feed_consumed": 0,
+            "notes": "",
+        }
+        # No query checks the date up front; the constraint rejects it.
+        response = self.client.post(url, data)
+        assert response.status_code == HTTPStatus.OK
+        assert response.context["form"].errors["date"] == [
+            duplicate_date_message(self.stats1.date),
+        ]
+
     def test_stats_date_before_flock_started_invalid(self):
         invalid = Stats(
             flock=self.flock,
@@ -163,3 +344,2308 @@ class StatsModelTests(TestCase):
         value = str(self.stats1)
         assert "Day 1" in value
         assert str(DEFAULT_HARVEST) in value
+
+
+class FlockSummaryTests(TestCase):
+    """The denormalized summary follows every Stats write."""
+
+    def setUp(self):
+        today = timezone.now().date()
+        self.flock = Flock.objects.create(
+            title="Summary Flock",
+            number_of_ducks=DEFAULT_DUCK_COUNT,
+            started_date=today - timedelta(days=5),
+        )
+        self.stats1 = Stats.objects.create(
+            flock=self.flock,
+            date=today - timedelta(days=4),
+            harvested=DEFAULT_HARVEST,
+            mortality=1,
+            feed_consumed=1.5,
+        )
+        self.stats2 = Stats.objects.create(
+            flock=self.flock,
+            date=today - timedelta(days=3),
+            harvested=SECOND_HARVEST,
+            feed_consumed=2.0,
+        )
+
+    def assert_summary_matches_stats(self):
+        summary = FlockSummary.objects.get(flock=self.flock)
+        expected = FlockSummary.objects.totals(self.flock.stats.all())
+        for field, value in expected.items():
+            assert getattr(summary, field) == pytest.approx(value), field
+
+    def test_summary_created_with_flock(self):
+        flock = Flock.objects.create(title="Empty", number_of_ducks=SMALL_DUCK_COUNT)
+        assert flock.summary.stats_count == ZERO
+        assert flock.total_harvested == ZERO
+
+    def test_summary_tracks_create(self):
+        self.assert_summary_matches_stats()
+        flock = Flock.objects.select_related("summary").get(pk=self.flock.pk)
+        with self.assertNumQueries(0):
+            assert flock.total_harvested == DEFAULT_HARVEST + SECOND_HARVEST
+            assert flock.avg_harvested == (DEFAULT_HARVEST + SECOND_HARVEST) // 2
+            assert flock.total_mortality == 1
+            assert flock.total_feed_consumed == pytest.approx(3.5)
+            assert flock.stats_count == SECOND_DAY
+
+    def test_summary_tracks_update(self):
+        stats = Stats.objects.get(pk=self.stats1.pk)
+        stats.harvested = SECOND_HARVEST
+        stats.mortality = ZERO
+        stats.save()
+        self.assert_summary_matches_stats()
+
+    def test_summary_tracks_delete(self):
+        Stats.objects.get(pk=self.stats2.pk).delete()
+        self.assert_summary_matches_stats()
+
+    def test_summary_tracks_percentage_recalculation(self):
+        self.flock.number_of_ducks = SMALL_DUCK_COUNT
+        self.flock.save()
+        self.assert_summary_matches_stats()
+        assert self.flock.average_percentage == pytest.approx(25)
+
+    def test_rebuild_command_restores_summary(self):
+        FlockSummary.objects.all().delete()
+        call_command("rebuild_flock_summaries", stdout=StringIO())
+        self.assert_summary_matches_stats()
+
+
+class PercentageRecalculationTests(TestCase):
+    """Percentages are recomputed with one UPDATE, rounded like Python."""
+
+    DUCK_COUNTS = (3, 7, 20000)
+
+    def setUp(self):
+        today = timezone.now().date()
+        self.flocks = []
+        for number_of_ducks in self.DUCK_COUNTS:
+            flock = Flock.objects.create(
+                title=f"{number_of_ducks} ducks",
+                number_of_ducks=number_of_ducks,
+                started_date=today - timedelta(days=10),
+            )
+            for offset, harvested in enumerate((0, 1, 2, 3)):
+                Stats.objects.create(
+                    flock=flock,
+                    date=flock.started_date + timedelta(days=offset),
+                    harvested=harvested,
+                )
+            self.flocks.append(flock)
+
+    def assert_percentages_match_python(self):
+        for stat in Stats.objects.select_related("flock"):
+            assert stat.percentage == compute_percentage(
+                stat.harvested,
+                stat.flock.number_of_ducks,
+            ), (stat.harvested, stat.flock.number_of_ducks)
+
+    def test_duck_count_change_is_one_update(self):
+        flock = self.flocks[0]
+        flock.number_of_ducks = SMALL_DUCK_COUNT * 3
+        with CaptureQueriesContext(connection) as captured:
+            flock.save()
+        updates = [sql for sql in data_queries(captured) if '"ducks_stats"' in sql]
+        # the percentage UPDATE, the summary aggregate, weekly/monthly rollups
+        assert len(updates) == 4  # noqa: PLR2004
+        assert updates[0].startswith('UPDATE "ducks_stats"')
+        self.assert_percentages_match_python()
+
+    def test_sql_rounding_matches_compute_percentage(self):
+        Stats.objects.recalculate_percentage()
+        self.assert_percentages_match_python()
+        # 1 / 20000 * 100 = 0.005 rounds half up
+        assert self.flocks[2].stats.get(harvested=1).percentage == Decimal("0.01")
+
+    def test_backfill_command_in_chunks(self):
+        Stats.objects.update(percentage=Decimal("99.00"))
+        out = StringIO()
+        call_command("recalculate_stats_percentages", "--chunk-size=1", stdout=out)
+        assert "Recalculated 12 stats rows across 3 flocks" in out.getvalue()
+        self.assert_percentages_match_python()
+        summary = FlockSummary.objects.get(flock=self.flocks[0])
+        assert summary.total_percentage == sum(
+            stat.percentage for stat in self.flocks[0].stats.all()
+        )
+
+
+class StatsWithDeltasTests(TestCase):
+    """``with_deltas`` matches the per-row ``previous`` based properties."""
+
+    def setUp(self):
+        today = timezone.now().date()
+        self.flock = Flock.objects.create(
+            title="Delta Flock",
+            number_of_ducks=DEFAULT_DUCK_COUNT,
+            started_date=today - timedelta(days=10),
+        )
+        for offset, harvested in enumerate([DEFAULT_HARVEST, SECOND_HARVEST, 0, 12]):
+            Stats.objects.create(
+                flock=self.flock,
+                date=self.flock.started_date + timedelta(days=offset),
+                harvested=harvested,
+            )
+
+    def assert_matches_properties(self, rows):
+        for row in rows:
+            plain = Stats.objects.get(pk=row.pk)
+            assert row.harvested_delta == plain.harvested_delta
+            if plain.harvested_delta_pct is None:
+                assert row.harvested_delta_pct is None
+            else:
+                assert row.harvested_delta_pct == pytest.approx(
+                    plain.harvested_delta_pct,
+                    rel=REL_TOLERANCE,
+                )
+
+    def test_with_deltas_single_query(self):
+        with self.assertNumQueries(1):
+            rows = list(self.flock.stats.order_by("date").with_deltas())
+            assert rows[0].harvested_delta is None
+            assert rows[1].harvested_delta == HARVEST_DELTA
+            assert rows[3].harvested_delta_pct is None
+        self.assert_matches_properties(rows)
+
+    def test_with_deltas_descending(self):
+        rows = list(self.flock.stats.order_by("-date").with_deltas())
+        self.assert_matches_properties(rows)
+
+    def test_with_deltas_keeps_predecessor_outside_filter(self):
+        start = self.flock.started_date + timedelta(days=1)
+        rows = list(
+            self.flock.stats.filter(date__gte=start).order_by("date").with_deltas(),
+        )
+        assert rows[0].harvested_delta == HARVEST_DELTA
+        self.assert_matches_properties(rows)
+
+    def test_detail_xhr_page_renders_deltas(self):
+        url = reverse("ducks:flock-detail", kwargs={"pk": self.flock.pk})
+        response = self.client.get(url, headers={"x-requested-with": "XMLHttpRequest"})
+        assert response.status_code == HTTPStatus.OK
+        assert f"+{HARVEST_DELTA}" in response.json()["html"]
+
+
+class KeysetPaginationTests(TestCase):
+    """Cursor mode of the flock detail infinite scroll."""
+
+    def setUp(self):
+        today = timezone.now().date()
+        self.flock = Flock.objects.create(
+            title="Scroll Flock",
+            number_of_ducks=DEFAULT_DUCK_COUNT,
+            started_date=today - timedelta(days=30),
+        )
+        for offset in range(25):
+            Stats.objects.create(
+                flock=self.flock,
+                date=self.flock.started_date + timedelta(days=offset),
+                harvested=offset,
+            )
+        self.url = reverse("ducks:flock-detail", kwargs={"pk": self.flock.pk})
+
+    def scroll(self, **params):
+        ids, cursor = [], None
+        while True:
+            if cursor:
+                params["cursor"] = cursor
+            response = self.client.get(
+                self.url,
+                params,
+                headers={"x-requested-with": "XMLHttpRequest"},
+            )
+            data = response.json()
+            ids += [int(i) for i in re.findall(r'data-stats-id="(\d+)"', data["html"])]
+            if not data["has_next"]:
+                assert data["next_cursor"] is None
+                return ids
+            cursor = data["next_cursor"]
+
+    def test_cursor_walks_every_row_in_order(self):
+        expected = list(self.flock.stats.order_by("date").values_list("pk", flat=True))
+        assert self.scroll() == expected
+
+    def test_cursor_respects_descending_sort(self):
+        expected = list(self.flock.stats.order_by("-date").values_list("pk", flat=True))
+        assert self.scroll(sort="date_desc") == expected
+
+    def test_cursor_page_runs_no_count_query(self):
+        paginator = KeysetPaginator(
+            self.flock.stats.with_deltas(),
+            10,
+            keys=("date", "id"),
+        )
+        cursor = paginator.page().next_cursor
+        with CaptureQueriesContext(connection) as queries:
+            page = paginator.page(cursor)
+            assert len(page) == 10  # noqa: PLR2004
+        assert len(queries) == 1
+        assert "COUNT(" not in queries[0]["sql"]
+        assert "OFFSET" not in queries[0]["sql"]
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        paginator = KeysetPaginator(self.flock.stats.all(), 10)
+        with pytest.raises(InvalidCursor):
+            paginator.page("not-a-cursor")
+        assert paginator.get_page("not-a-cursor").object_list[0].day == 1
+
+
+class FlockStatsSnapshotTests(TestCase):
+    """One query for bounds, filtered aggregates and zero-column flags."""
+
+    def setUp(self):
+        today = timezone.now().date()
+        self.flock = Flock.objects.create(
+            title="Snapshot Flock",
+            number_of_ducks=DEFAULT_DUCK_COUNT,
+            started_date=today - timedelta(days=10),
+        )
+        for offset in range(5):
+            Stats.objects.create(
+                flock=self.flock,
+                date=self.flock.started_date + timedelta(days=offset),
+                harvested=DEFAULT_HARVEST + offset,
+                mortality=1 if offset == 0 else 0,
+            )
+        self.flock = Flock.objects.select_related("summary").get(pk=self.flock.pk)
+
+    def test_unfiltered_snapshot_matches_summary(self):
+        with self.assertNumQueries(1):
+            snapshot = FlockStatsSnapshot.for_flock(self.flock)
+        assert snapshot.min_date == self.flock.started_date
+        assert snapshot.total_harvested == self.flock.total_harvested
+        assert not snapshot.all_mortality_zero
+        assert snapshot.all_feed_zero
+
+    def test_filtered_snapshot_single_query(self):
+        start = self.flock.started_date + timedelta(days=1)
+        with self.assertNumQueries(1):
+            snapshot = FlockStatsSnapshot.for_flock(self.flock, start_date=start)
+        in_range = self.flock.stats.filter(date__gte=start)
+        assert snapshot.min_date == self.flock.started_date
+        assert snapshot.stats_count == in_range.count()
+        assert snapshot.total_harvested == sum(s.harvested for s in in_range)
+        assert snapshot.all_mortality_zero
+
+    def test_detail_page_query_count(self):
+        url = reverse("ducks:flock-detail", kwargs={"pk": self.flock.pk})
+        # flock + summary, page of rows, snapshot; charts load separately
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert len(data_queries(captured)) == 3  # noqa: PLR2004
+        # flock + summary, page of rows for the XHR path
+        with CaptureQueriesContext(connection) as captured:
+            self.client.get(url, headers={"x-requested-with": "XMLHttpRequest"})
+        assert len(data_queries(captured)) == 2  # noqa: PLR2004
+
+    def test_detail_page_with_date_filter(self):
+        url = reverse("ducks:flock-detail", kwargs={"pk": self.flock.pk})
+        start = self.flock.started_date + timedelta(days=1)
+        response = self.client.get(url, {"start_date": start.isoformat()})
+        assert response.status_code == HTTPStatus.OK
+        assert response.context["snapshot"].all_mortality_zero
+        assert response.context["form"].fields["start_date"].widget.attrs["min"] == (
+            self.flock.started_date.isoformat()
+        )
+
+
+class FlockChartSeriesTests(TestCase):
+    """One query for all flocks, gaps kept as None, long windows bucketed."""
+
+    def setUp(self):
+        cache.clear()
+        today = timezone.now().date()
+        self.flocks = []
+        for index in range(3):
+            flock = Flock.objects.create(
+                title=f"Chart Flock {index}",
+                number_of_ducks=DEFAULT_DUCK_COUNT,
+                started_date=today - timedelta(days=30),
+            )
+            self.flocks.append(flock)
+        for offset in range(4):
+            Stats.objects.create(
+                flock=self.flocks[0],
+                date=self.flocks[0].started_date + timedelta(days=offset),
+                harvested=DEFAULT_HARVEST + offset,
+            )
+        Stats.objects.create(
+            flock=self.flocks[1],
+            date=self.flocks[1].started_date,
+            harvested=SECOND_HARVEST,
+        )
+        # Leave day 2 empty so day 3 has to stay in its own column.
+        Stats.objects.filter(flock=self.flocks[0], day=SECOND_DAY).delete()
+
+    def test_day_aligned_with_null_gaps(self):
+        with self.assertNumQueries(1):
+            series = FlockChartSeries.for_flocks(self.flocks, days=5)
+        assert series.labels == [1, 2, 3, 4, 5]
+        assert series.bucket_size == 1
+        first, second, third = (dataset["data"] for dataset in series.datasets)
+        assert first == [10.0, None, 12.0, 13.0, None]
+        assert second == [15.0, None, None, None, None]
+        assert third == [None] * 5
+
+    def test_long_window_is_bucketed(self):
+        series = FlockChartSeries.for_flocks(self.flocks, days=10, max_points=4)
+        assert series.bucket_size == 3  # noqa: PLR2004
+        assert series.labels == ["1-3", "4-6", "7-9", "10-10"]
+        first = series.datasets[0]["data"]
+        # Day 2 is missing, so the first bucket averages days 1 and 3 only.
+        assert first == [11.0, 13.0, None, None]
+
+    def test_no_flocks(self):
+        with self.assertNumQueries(0):
+            series = FlockChartSeries.for_flocks([], days=3)
+        assert series.datasets == []
+
+    def test_parse_chart_days_is_bounded(self):
+        assert parse_chart_days(None) == 30  # noqa: PLR2004
+        assert parse_chart_days("abc") == 30  # noqa: PLR2004
+        assert parse_chart_days("-4") == 1
+        assert parse_chart_days("999999") == CHART_MAX_DAYS
+
+    def test_list_page_query_count_is_flat(self):
+        url = reverse("ducks:flock-list")
+        # flocks + summaries, chart series (max day comes from Flock.last_day)
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url, {"days": "999999"})
+        assert response.status_code == HTTPStatus.OK
+        assert len(data_queries(captured)) == 2  # noqa: PLR2004
+        assert response.context["days"] == CHART_MAX_DAYS
+        assert response.context["max_days"] == 4  # noqa: PLR2004
+
+
+class FlockChartDataTests(TestCase):
+    """The lazy chart endpoint downsamples with LTTB and keeps the spikes."""
+
+    days = 200
+    spike_day = 77
+
+    def setUp(self):
+        cache.clear()
+        self.flock = Flock.objects.create(
+            title="Long Flock",
+            number_of_ducks=DEFAULT_DUCK_COUNT,
+            started_date=timezone.now().date() - timedelta(days=self.days),
+        )
+        Stats.objects.bulk_create(
+            Stats(
+                flock=self.flock,
+                date=self.flock.started_date + timedelta(days=offset),
+                day=offset + 1,
+                harvested=DEFAULT_HARVEST,
+                percentage=Decimal("10.00"),
+                mortality=5 if offset == self.spike_day else 0,
+            )
+            for offset in range(self.days)
+        )
+        # bulk_create skips the day counter.
+        Flock.objects.filter(pk=self.flock.pk).update(last_day=self.days)
+        self.url = reverse("ducks:flock-chart-data", kwargs={"pk": self.flock.pk})
+
+    def test_lttb_keeps_ends_and_peaks(self):
+        x = list(range(100))
+        y = [0.0] * 100
+        y[40] = 9.0
+        kept = lttb_indices(x, y, 10).tolist()
+        assert len(kept) == 10  # noqa: PLR2004
+        assert kept[0] == 0
+        assert kept[-1] == 99  # noqa: PLR2004
+        assert 40 in kept  # noqa: PLR2004
+        assert kept == sorted(kept)
+
+    def test_lttb_short_series_is_untouched(self):
+        assert lttb_indices([1, 2, 3], [1, 2, 3], 10).tolist() == [0, 1, 2]
+
+    def test_endpoint_downsamples_every_series(self):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(self.url, {"points": 20})
+        assert response.status_code == HTTPStatus.OK
+        # flock + summary, chart rows
+        assert len(data_queries(captured)) == 2  # noqa: PLR2004
+        payload = response.json()
+        assert payload["total"] == self.days
+        mortality = payload["series"]["mortality"]
+        assert len(mortality["labels"]) == 20  # noqa: PLR2004
+        assert max(mortality["data"]) == 5  # noqa: PLR2004
+        assert mortality["labels"][0] == self.flock.started_date.isoformat()
+
+    def test_endpoint_applies_date_filter(self):
+        start = self.flock.started_date + timedelta(days=self.days - 5)
+        response = self.client.get(self.url, {"start_date": start.isoformat()})
+        series = response.json()["series"]["harvested"]
+        assert series["labels"][0] == start.isoformat()
+        assert series["data"] == [10.0] * 5
+
+    def test_points_are_clamped_and_cached(self):
+        chart = FlockChartData.for_flock(self.flock, points=CHART_DATA_MIN_POINTS)
+        assert len(chart.series["percentage"]["data"]) == CHART_DATA_MIN_POINTS
+        response = self.client.get(self.url, {"points": "100000"})
+        assert response.json()["points"] == CHART_DATA_MAX_POINTS
+        with CaptureQueriesContext(connection) as captured:
+            self.client.get(self.url, {"points": "100000"})
+        # the series itself comes from the cache
+        assert len(data_queries(captured)) == 1
+
+    def test_not_modified_until_stats_change(self):
+        response = self.client.get(self.url)
+        response = self.client.get(self.url)
+        etag = response["ETag"]
+        assert (
+            self.client.get(self.url, headers={"if-none-match": etag}).status_code
+            == HTTPStatus.NOT_MODIFIED
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            Stats.objects.create(
+                flock=self.flock,
+                date=self.flock.started_date + timedelta(days=self.days),
+                harvested=DEFAULT_HARVEST,
+            )
+        response = self.client.get(self.url, headers={"if-none-match": etag})
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()["total"] == self.days + 1
+
+
+class FlockCohortTests(TestCase):
+    """Per-day distributions of the other flocks, loaded once per stats version."""
+
+    flocks = 12
+    days = 40
+
+    def setUp(self):
+        cache.clear()
+        self.farm = make_farm(self.flocks, self.days, seed=3)
+        self.flock = self.farm[0]
+        self.url = reverse("ducks:flock-cohort", kwargs={"pk": self.flock.pk})
+
+    def test_grids_are_aligned_by_day_of_lay(self):
+        # stats columns, flock sizes
+        with self.assertNumQueries(2):
+            data = CohortData.load()
+        assert data.percentage.shape == (self.flocks, self.days)
+        row = data.flock_row(self.flock.pk)
+        stats = self.flock.stats.get(day=7)
+        assert data.percentage[row, 6] == pytest.approx(float(stats.percentage))
+        deaths = sum(
+            self.flock.stats.filter(day__lte=7).values_list("mortality", flat=True),
+        )
+        assert data.mortality[row, 6] == pytest.approx(
+            deaths * 100 / self.flock.number_of_ducks,
+            rel=1e-5,
+        )
+        assert data.flock_row(0) is None
+
+    def test_curves_match_numpy_percentiles(self):
+        Stats.objects.filter(flock=self.farm[1], day=5).delete()
+        data = CohortData.load()
+        comparison = FlockCohortComparison.from_data(self.flock.pk, data)
+        others = np.delete(data.percentage, data.flock_row(self.flock.pk), axis=0)
+        others = others.astype(float)
+
+        assert comparison.labels == list(range(1, self.days + 1))
+        assert comparison.cohort_size[0] == self.flocks - 1
+        assert comparison.cohort_size[4] == self.flocks - 2
+        expected = np.nanpercentile(others, [10, 50, 90], axis=0)
+        for name, values in zip(("p10", "median", "p90"), expected, strict=True):
+            assert comparison.percentage[name] == pytest.approx(values, abs=0.01), name
+        assert comparison.percentage["mean"] == pytest.approx(
+            np.nanmean(others, axis=0),
+            abs=0.01,
+        )
+
+    def test_flock_rank_and_latest_day(self):
+        data = CohortData.load()
+        comparison = FlockCohortComparison.from_data(self.flock.pk, data)
+        row = data.flock_row(self.flock.pk)
+        own = data.percentage[row, -1]
+        others = np.delete(data.percentage[:, -1], row)
+        rank = ((others < own).sum() + (others == own).sum() / 2) / len(others) * 100
+        assert comparison.latest == {
+            "day": self.days,
+            "percentage": round(float(own), 2),
+            "median": comparison.percentage["median"][-1],
+            "rank": round(float(rank), 2),
+            "cohort_size": self.flocks - 1,
+        }
+        assert comparison.percentage["rank"][-1] == comparison.latest["rank"]
+
+    def test_ties_rank_in_the_middle(self):
+        grid = np.array([[1.0, 1.0], [1.0, np.nan], [2.0, np.nan]])
+        ranks = percentile_ranks(grid, [1.0, np.nan])
+        assert ranks[0] == pytest.approx(100 / 3)
+        assert np.isnan(ranks[1])
+
+    def test_flock_without_stats_is_compared_with_every_flock(self):
+        flock = FlockFactory()
+        comparison = FlockCohortComparison.for_flock(flock)
+        assert comparison.cohort_size[0] == self.flocks
+        assert comparison.percentage["flock"] == [None] * self.days
+        assert comparison.latest is None
+
+    def test_endpoint_is_cached_per_stats_version(self):
+        response = self.client.get(self.url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()["latest"]["day"] == self.days
+        with CaptureQueriesContext(connection) as captured:
+            self.client.get(self.url)
+        assert len(data_queries(captured)) == 1  # the flock
+        # Another flock is compared on the grids already loaded.
+        other_url = reverse("ducks:flock-cohort", kwargs={"pk": self.farm[1].pk})
+        with CaptureQueriesContext(connection) as captured:
+            self.client.get(other_url)
+        assert len(data_queries(captured)) == 1
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Stats.objects.create(
+                flock=self.flock,
+                date=FARM_START_DATE + timedelta(days=self.days),
+                harvested=DEFAULT_HARVEST,
+            )
+        payload = self.client.get(self.url).json()
+        assert payload["latest"]["day"] == self.days + 1
+        assert payload["cohort_size"][-1] == 0
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.farm[1].delete()
+        assert self.client.get(self.url).json()["cohort_size"][0] == self.flocks - 2
+
+
+class StatsRollupTests(TestCase):
+    """Weekly/monthly rollups follow every write and match a rebuild."""
+
+    monday = date(2026, 3, 2)
+
+    def setUp(self):
+        cache.clear()
+        self.flock = Flock.objects.create(
+            title="Rollup Flock",
+            number_of_ducks=DEFAULT_DUCK_COUNT,
+            started_date=self.monday - timedelta(days=7),
+        )
+        # Sat/Sun of the previous week (February), then Mon-Wed of March.
+        self.stats = [
+            Stats.objects.create(
+                flock=self.flock,
+                date=self.monday + timedelta(days=offset),
+                harvested=DEFAULT_HARVEST + offset,
+                mortality=1,
+                feed_consumed=1.5,
+            )
+            for offset in (-2, -1, 0, 1, 2)
+        ]
+
+    def rollup_rows(self):
+        return sorted(
+            StatsRollup.objects.filter(flock=self.flock, stats_count__gt=0).values_list(
+                "granularity",
+                "period_start",
+                "stats_count",
+                "total_harvested",
+                "total_percentage",
+                "total_mortality",
+                "total_feed_consumed",
+            ),
+        )
+
+    def assert_rollups_match_rebuild(self):
+        incremental = self.rollup_rows()
+        StatsRollup.objects.rebuild([self.flock.pk])
+        assert incremental == self.rollup_rows()
+
+    def test_created_stats_are_bucketed(self):
+        weeks = StatsRollup.objects.in_range(self.flock, StatsRollup.Granularity.WEEK)
+        assert [(w.period_start, w.stats_count) for w in weeks] == [
+            (self.monday - timedelta(days=7), 2),
+            (self.monday, 3),
+        ]
+        months = list(
+            StatsRollup.objects.in_range(self.flock, StatsRollup.Granularity.MONTH),
+        )
+        assert [m.period_start for m in months] == [date(2026, 2, 1), date(2026, 3, 1)]
+        # Sunday the 1st opens March.
+        assert months[1].stats_count == 4  # noqa: PLR2004
+        assert months[1].total_harvested == 4 * DEFAULT_HARVEST + 2
+        assert months[1].period_end == date(2026, 3, 31)
+        self.assert_rollups_match_rebuild()
+
+    def test_edit_moves_row_between_buckets(self):
+        stats = Stats.objects.get(pk=self.stats[0].pk)
+        stats.date = self.monday + timedelta(days=5)
+        stats.harvested = SECOND_HARVEST
+        stats.save()
+        self.assert_rollups_match_rebuild()
+
+    def test_delete_and_import(self):
+        Stats.objects.get(pk=self.stats[-1].pk).delete()
+        self.assert_rollups_match_rebuild()
+        dataset = Dataset(headers=("date", "harvested", "mortality", "feed_consumed"))
+        for offset in range(2, 40):
+            dataset.append(
+                ((self.monday + timedelta(days=offset)).isoformat(), 20, 0, 1),
+            )
+        job = import_dataset(self.flock, dataset)
+        assert job.status == StatsImportJob.Status.SUCCEEDED
+        self.assert_rollups_match_rebuild()
+
+    def test_duck_count_change_rebuilds_rollups(self):
+        self.flock.number_of_ducks = SMALL_DUCK_COUNT
+        self.flock.save()
+        self.assert_rollups_match_rebuild()
+        week = StatsRollup.objects.in_range(
+            self.flock,
+            StatsRollup.Granularity.WEEK,
+        ).last()
+        assert week.average_percentage == compute_percentage(
+            DEFAULT_HARVEST + 1,
+            SMALL_DUCK_COUNT,
+        )
+
+    def test_detail_page_lists_rollups(self):
+        url = reverse("ducks:flock-detail", kwargs={"pk": self.flock.pk})
+        # flock + summary, rollups, snapshot
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url, {"granularity": "month"})
+        assert len(data_queries(captured)) == 3  # noqa: PLR2004
+        assert [r.period_start for r in response.context["rollups"]] == [
+            date(2026, 2, 1),
+            date(2026, 3, 1),
+        ]
+        response = self.client.get(
+            url,
+            {"granularity": "week", "start_date": self.monday.isoformat()},
+        )
+        assert [r.period_start for r in response.context["rollups"]] == [self.monday]
+
+    def test_chart_endpoint_reads_rollups(self):
+        url = reverse("ducks:flock-chart-data", kwargs={"pk": self.flock.pk})
+        series = self.client.get(url, {"granularity": "week"}).json()["series"]
+        assert series["harvested"]["labels"] == [
+            (self.monday - timedelta(days=7)).isoformat(),
+            self.monday.isoformat(),
+        ]
+        assert series["harvested"]["data"] == [
+            2 * DEFAULT_HARVEST - 3,
+            3 * DEFAULT_HARVEST + 3,
+        ]
+        assert series["mortality"]["data"] == [2, 3]
+        assert series["percentage"]["data"][1] == float(
+            compute_percentage(DEFAULT_HARVEST + 1, DEFAULT_DUCK_COUNT),
+        )
+
+
+class FlockListCacheTests(TestCase):
+    """Cards and chart rows are cached per flock version."""
+
+    def setUp(self):
+        cache.clear()
+        self.flock = Flock.objects.create(
+            title="Cached Flock",
+            number_of_ducks=DEFAULT_DUCK_COUNT,
+            started_date=timezone.now().date() - timedelta(days=10),
+        )
+        Stats.objects.create(
+            flock=self.flock,
+            date=self.flock.started_date,
+            harvested=DEFAULT_HARVEST,
+        )
+        self.url = reverse("ducks:flock-list")
+
+    def test_warm_page_only_lists_flocks(self):
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(self.url)
+        assert len(data_queries(captured)) == 1
+        assert response.context["chart_data"][0]["data"][0] == float(DEFAULT_HARVEST)
+
+    def test_stats_write_bumps_version(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Stats.objects.create(
+                flock=self.flock,
+                date=self.flock.started_date + timedelta(days=1),
+                harvested=SECOND_HARVEST,
+            )
+        response = self.client.get(self.url)
+        assert response.context["chart_data"][0]["data"][:2] == [10.0, 15.0]
+        assert f"<strong>{SECOND_DAY}</strong> stat entries" in response.text
+
+    def test_import_and_delete_bump_version(self):
+        self.client.get(self.url)
+        dataset = Dataset(headers=("date", "harvested"))
+        dataset.append(
+            ((self.flock.started_date + timedelta(days=1)).isoformat(), SECOND_HARVEST),
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            import_dataset(self.flock, dataset)
+        response = self.client.get(self.url)
+        assert response.context["chart_data"][0]["data"][1] == float(SECOND_HARVEST)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.flock.stats.get(day=SECOND_DAY).delete()
+        response = self.client.get(self.url)
+        assert response.context["chart_data"][0]["data"][1] is None
+
+    def test_versions_bump_only_after_commit(self):
+        before = get_flock_versions([self.flock.pk])[self.flock.pk]
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.flock.title = "Renamed"
+            self.flock.save()
+            assert get_flock_versions([self.flock.pk])[self.flock.pk] == before
+        for callback in callbacks:
+            callback()
+        assert get_flock_versions([self.flock.pk])[self.flock.pk] != before
+
+
+class StatsExportTests(TestCase):
+    """The streamed CSV matches what the tablib export used to return."""
+
+    def setUp(self):
+        today = timezone.now().date()
+        self.flock = Flock.objects.create(
+            title="Export Flock",
+            number_of_ducks=DEFAULT_DUCK_COUNT,
+            started_date=today - timedelta(days=10),
+        )
+        for offset in range(5):
+            Stats.objects.create(
+                flock=self.flock,
+                date=self.flock.started_date + timedelta(days=offset),
+                harvested=DEFAULT_HARVEST + offset,
+                feed_consumed=1.5,
+            )
+        self.url = reverse("ducks:flock-export", kwargs={"pk": self.flock.pk})
+
+    def test_export_is_streamed(self):
+        response = self.client.post(self.url, {"format": "0", "sort": "date_desc"})
+        assert response.status_code == HTTPStatus.OK
+        assert response.streaming
+        assert "attachment;" in response["Content-Disposition"]
+
+        expected = (
+            StatsResource()
+            .export(
+                Stats.objects.filter(flock=self.flock).order_by("-date"),
+            )
+            .csv
+        )
+        content = b"".join(response.streaming_content).decode()
+        assert content == expected
+
+    def test_chunks_keep_column_set_and_date_format(self):
+        stats_qs = Stats.objects.filter(flock=self.flock).order_by("date")
+        chunks = list(iter_csv_export(StatsResource(), stats_qs, chunk_size=2))
+        # header, then three chunks of at most two rows
+        assert len(chunks) == 4  # noqa: PLR2004
+        assert chunks[0].strip() == (
+            "date,harvested,percentage,mortality,feed_consumed"
+        )
+        assert chunks[1].startswith(self.flock.started_date.isoformat())
+
+
+class StatsBulkImportTests(TestCase):
+    """In-memory validation and chunked inserts for CSV imports."""
+
+    HEADERS = ("date", "harvested", "mortality", "feed_consumed")
+
+    def setUp(self):
+        today = timezone.now().date()
+        self.flock = Flock.objects.create(
+            title="Import Flock",
+            number_of_ducks=DEFAULT_DUCK_COUNT,
+            started_date=today - timedelta(days=30),
+        )
+        Stats.objects.create(
+            flock=self.flock,
+            date=self.flock.started_date,
+            harvested=DEFAULT_HARVEST,
+        )
+
+    def make_dataset(self, *rows):
+        dataset = Dataset(headers=self.HEADERS)
+        for row in rows:
+            dataset.append(row)
+        return dataset
+
+    def day(self, offset):
+        return (self.flock.started_date + timedelta(days=offset)).isoformat()
+
+    def stats_queries(self, captured):
+        """Captured queries other than the job's own reads and updates."""
+        return [
+            sql for sql in data_queries(captured) if "ducks_statsimportjob" not in sql
+        ]
+
+    def test_rows_are_inserted_with_day_and_percentage(self):
+        rows = [
+            (self.day(offset), DEFAULT_HARVEST + offset, 0, 1) for offset in range(1, 8)
+        ]
+        with CaptureQueriesContext(connection) as captured:
+            job = import_dataset(self.flock, self.make_dataset(*rows), chunk_size=3)
+        assert job.status == StatsImportJob.Status.SUCCEEDED
+        # existing dates, then per chunk: day reservation, insert, summary
+        # delta, rollup upsert
+        assert len(self.stats_queries(captured)) == 1 + 3 * 4
+        stats = list(self.flock.stats.order_by("day"))
+        assert [stat.day for stat in stats] == list(range(1, 9))
+        assert stats[-1].percentage == compute_percentage(17, DEFAULT_DUCK_COUNT)
+        summary = FlockSummary.objects.get(flock=self.flock)
+        assert summary.stats_count == len(stats)
+        assert summary.total_harvested == sum(stat.harvested for stat in stats)
+
+    def test_errors_are_reported_per_row_and_nothing_is_written(self):
+        dataset = self.make_dataset(
+            (self.day(1), DEFAULT_HARVEST, 0, 0),
+            (self.day(1), DEFAULT_HARVEST, 0, 0),
+            (self.day(5), DEFAULT_HARVEST, 0, 0),
+            (self.day(2), EXCESS_HARVEST, 0, 0),
+            ("not a date", DEFAULT_HARVEST, 0, 0),
+        )
+        # Only the existing dates are read; nothing is written.
+        with CaptureQueriesContext(connection) as captured:
+            job = import_dataset(self.flock, dataset)
+        assert len(self.stats_queries(captured)) == 1
+        assert job.status == StatsImportJob.Status.FAILED
+        assert job.rows_failed == 4  # noqa: PLR2004
+        messages = dict(error.split(": ", 1) for error in job.errors)
+        assert list(messages) == ["Row 2", "Row 3", "Row 4", "Row 5"]
+        assert "already exists" in messages["Row 2"]
+        assert "gap of 3 day(s)" in messages["Row 3"]
+        assert "cannot exceed" in messages["Row 4"]
+        assert "does not match any of the formats" in messages["Row 5"]
+        assert self.flock.stats.count() == 1
+
+    def test_import_view_reports_row_errors(self):
+        url = reverse("ducks:flock-import", kwargs={"pk": self.flock.pk})
+        upload = SimpleUploadedFile(
+            "stats.csv",
+            self.make_dataset((self.day(0), DEFAULT_HARVEST, 0, 0)).csv.encode(),
+            content_type="text/csv",
+        )
+        with override_settings(STORAGES=IN_MEMORY_STORAGES):
+            with self.captureOnCommitCallbacks() as callbacks:
+                response = self.client.post(url, {"file": upload})
+            assert response.status_code == HTTPStatus.FOUND
+            assert len(callbacks) == 1
+            job = StatsImportJob.objects.get(flock=self.flock)
+            import_stats(job.pk)
+
+        progress = self.client.get(
+            reverse(
+                "ducks:stats-import-job",
+                kwargs={"pk": self.flock.pk, "job_pk": job.pk},
+            ),
+        ).json()
+        assert progress["status"] == StatsImportJob.Status.FAILED
+        assert progress["rows_failed"] == 1
+        assert progress["errors"][0].startswith("Row 1: ")
+
+
+@override_settings(STORAGES=IN_MEMORY_STORAGES)
+class StatsImportJobTests(TestCase):
+    """Background imports: validated up front, inserted chunk by chunk."""
+
+    def setUp(self):
+        self.flock = Flock.objects.create(
+            title="Job Flock",
+            number_of_ducks=DEFAULT_DUCK_COUNT,
+            started_date=timezone.now().date() - timedelta(days=60),
+        )
+
+    def make_job(self, rows):
+        dataset = Dataset(headers=StatsBulkImportTests.HEADERS)
+        for row in rows:
+            dataset.append(row)
+        return StatsImportJob.objects.create(
+            flock=self.flock,
+            file=SimpleUploadedFile("stats.csv", dataset.csv.encode()),
+        )
+
+    def rows(self, count):
+        return [
+            (
+                (self.flock.started_date + timedelta(days=offset)).isoformat(),
+                DEFAULT_HARVEST,
+                0,
+                1,
+            )
+            for offset in range(count)
+        ]
+
+    def test_rows_are_imported_in_chunks(self):
+        job = self.make_job(self.rows(25))
+        with CaptureQueriesContext(connection) as captured:
+            status = import_stats(job.pk, chunk_size=10)
+        assert status == StatsImportJob.Status.SUCCEEDED
+        progress_updates = [
+            sql
+            for sql in data_queries(captured)
+            if sql.startswith('UPDATE "ducks_statsimportjob"')
+        ]
+        # running, total rows, one per chunk, finished
+        assert len(progress_updates) == 6  # noqa: PLR2004
+        job.refresh_from_db()
+        assert (job.total_rows, job.rows_done, job.rows_failed) == (25, 25, 0)
+        assert job.rows_per_second > 0
+        assert job.finished_at >= job.started_at
+        assert job.progress == 100  # noqa: PLR2004
+        assert list(self.flock.stats.values_list("day", flat=True)) == list(
+            range(1, 26),
+        )
+        assert FlockSummary.objects.get(flock=self.flock).stats_count == 25  # noqa: PLR2004
+
+    def test_invalid_file_writes_nothing(self):
+        rows = self.rows(5)
+        rows[3] = (rows[3][0], EXCESS_HARVEST, 0, 1)
+        job = self.make_job(rows)
+        import_stats(job.pk)
+        job.refresh_from_db()
+        assert job.status == StatsImportJob.Status.FAILED
+        # Row 5 is then reported as a gap after the rejected row 4.
+        assert (job.total_rows, job.rows_done, job.rows_failed) == (5, 0, 2)
+        assert job.errors[0].startswith("Row 4: ")
+        assert not self.flock.stats.exists()
+
+    def test_unreadable_file_and_redelivery(self):
+        job = StatsImportJob.objects.create(
+            flock=self.flock,
+            file=SimpleUploadedFile("stats.csv", b"\xff\xfe\x00"),
+        )
+        import_stats(job.pk)
+        job.refresh_from_db()
+        assert job.status == StatsImportJob.Status.FAILED
+        assert job.errors[0].startswith("Could not read CSV file")
+        # A redelivered message leaves a finished job alone.
+        assert import_stats(job.pk) == StatsImportJob.Status.FAILED
+
+    def test_progress_endpoint(self):
+        job = self.make_job(self.rows(3))
+        url = reverse(
+            "ducks:stats-import-job",
+            kwargs={"pk": self.flock.pk, "job_pk": job.pk},
+        )
+        with CaptureQueriesContext(connection) as captured:
+            progress = self.client.get(url).json()
+        assert len(data_queries(captured)) == 1
+        assert progress["status"] == StatsImportJob.Status.PENDING
+        assert not progress["finished"]
+        import_stats(job.pk)
+        progress = self.client.get(url).json()
+        assert progress["finished"]
+        assert progress["redirect_url"] == reverse(
+            "ducks:flock-detail",
+            kwargs={"pk": self.flock.pk},
+        )
+        other = Flock.objects.create(title="Other", number_of_ducks=SMALL_DUCK_COUNT)
+        url = reverse(
+            "ducks:stats-import-job",
+            kwargs={"pk": other.pk, "job_pk": job.pk},
+        )
+        assert self.client.get(url).status_code == HTTPStatus.NOT_FOUND
+
+
+@override_settings(STORAGES=IN_MEMORY_STORAGES)
+class StatsExportJobTests(TestCase):
+    """Background exports of one or many flocks to the default storage."""
+
+    def setUp(self):
+        start = date(2026, 1, 1)
+        self.flocks = [
+            Flock.objects.create(
+                title=f"Export {index}",
+                number_of_ducks=DEFAULT_DUCK_COUNT,
+                started_date=start,
+            )
+            for index in range(2)
+        ]
+        for flock in self.flocks:
+            for offset in range(5):
+                Stats.objects.create(
+                    flock=flock,
+                    date=start + timedelta(days=offset),
+                    harvested=DEFAULT_HARVEST,
+                    mortality=0,
+                    feed_consumed=1,
+                )
+
+    def make_job(self, flocks, **kwargs):
+        job = StatsExportJob.objects.create(**kwargs)
+        job.flocks.set(flocks)
+        return job
+
+    def test_multi_flock_export_is_written_in_chunks(self):
+        job = self.make_job(self.flocks)
+        with CaptureQueriesContext(connection) as captured:
+            status = export_stats(job.pk, chunk_size=3)
+        assert status == StatsExportJob.Status.SUCCEEDED
+        progress_updates = [
+            sql
+            for sql in data_queries(captured)
+            if sql.startswith('UPDATE "ducks_statsexportjob"')
+        ]
+        # running, one per chunk of 3 out of 10 rows, file/size, finished
+        assert len(progress_updates) == 7  # noqa: PLR2004
+        job.refresh_from_db()
+        assert job.rows_done == 10  # noqa: PLR2004
+        assert job.finished_at >= job.started_at
+        with job.file.open("rb") as file:
+            content = file.read()
+        assert job.size == len(content)
+        lines = content.decode().splitlines()
+        assert lines[0] == (
+            "flock_id,flock,date,harvested,percentage,mortality,feed_consumed"
+        )
+        assert len(lines) == 11  # noqa: PLR2004
+        assert lines[1].startswith(f"{self.flocks[0].pk},Export 0,2026-01-01,")
+        assert lines[-1].startswith(f"{self.flocks[1].pk},Export 1,2026-01-05,")
+
+    def test_single_flock_export_keeps_import_columns(self):
+        job = self.make_job(
+            self.flocks[:1],
+            start_date=date(2026, 1, 2),
+            end_date=date(2026, 1, 3),
+        )
+        export_stats(job.pk)
+        job.refresh_from_db()
+        with job.file.open("rb") as file:
+            lines = file.read().decode().splitlines()
+        assert lines[0] == "date,harvested,percentage,mortality,feed_consumed"
+        assert [line.split(",")[0] for line in lines[1:]] == [
+            "2026-01-02",
+            "2026-01-03",
+        ]
+        # A redelivered message leaves a finished job alone.
+        assert export_stats(job.pk) == StatsExportJob.Status.SUCCEEDED
+
+    def test_create_progress_and_download(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(
+                reverse("ducks:stats-export-job-add"),
+                {"flocks": [flock.pk for flock in self.flocks]},
+            )
+        job = StatsExportJob.objects.get()
+        assert response.url == reverse("ducks:stats-export-job", kwargs={"pk": job.pk})
+        assert len(callbacks) == 1
+        assert set(job.flocks.all()) == set(self.flocks)
+
+        progress_url = reverse("ducks:stats-export-job", kwargs={"pk": job.pk})
+        download_url = reverse("ducks:stats-export-download", kwargs={"pk": job.pk})
+        progress = self.client.get(progress_url, HTTP_ACCEPT="application/json").json()
+        assert not progress["finished"]
+        assert "download_url" not in progress
+        assert self.client.get(download_url).status_code == HTTPStatus.NOT_FOUND
+
+        export_stats(job.pk)
+        assert b"Export #" in self.client.get(progress_url).content
+        progress = self.client.get(progress_url, HTTP_ACCEPT="application/json").json()
+        assert progress["download_url"] == download_url
+        response = self.client.get(download_url)
+        assert response["Content-Disposition"] == (
+            f'attachment; filename="stats_export_{job.pk}.csv"'
+        )
+        assert len(b"".join(response.streaming_content)) == progress["size"]
+
+    def test_invalid_options_queue_nothing(self):
+        response = self.client.post(
+            reverse("ducks:stats-export-job-add"),
+            {
+                "flocks": [self.flocks[0].pk],
+                "start_date": "2026-01-05",
+                "end_date": "2026-01-01",
+            },
+        )
+        assert response.url == reverse("ducks:flock-list")
+        assert not StatsExportJob.objects.exists()
+
+
+class FailingBroadcast:
+    """A broadcast backend whose connection is refused or, once subscribed, drops."""
+
+    def __init__(self, *, subscribed):
+        self.subscribed = subscribed
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        if not self.subscribed:
+            msg = "Connection refused"
+            raise ConnectionError(msg)
+        yield self._messages()
+
+    @staticmethod
+    async def _messages():
+        msg = "Connection reset by peer"
+        raise ConnectionError(msg)
+        yield  # pragma: no cover
+
+
+class StatsBroadcastTests(TestCase):
+    """Committed stats writes are pushed to the flock's websocket subscribers."""
+
+    def setUp(self):
+        self.flock = Flock.objects.create(
+            title="Live Flock",
+            number_of_ducks=DEFAULT_DUCK_COUNT,
+            started_date=date(2026, 1, 1),
+        )
+
+    def run_socket(self, frames, during=None, pushed=0):
+        """Send ``frames``, run ``during`` (sync), collect ``pushed`` frames more."""
+
+        async def scenario():
+            inbox = asyncio.Queue()
+            outbox = asyncio.Queue()
+            app = asyncio.create_task(
+                websocket_application({"type": "websocket"}, inbox.get, outbox.put),
+            )
+            await inbox.put({"type": "websocket.connect"})
+            replies = [await outbox.get()]
+            for frame in frames:
+                await inbox.put({"type": "websocket.receive", "text": frame})
+                replies.append(await outbox.get())
+            if during is not None:
+                await sync_to_async(during)()
+            replies.extend(
+                [
+                    await asyncio.wait_for(outbox.get(), timeout=5)
+                    for _ in range(pushed)
+                ],
+            )
+            await inbox.put({"type": "websocket.disconnect"})
+            await app
+            return replies
+
+        accept, *replies = async_to_sync(scenario)()
+        assert accept == {"type": "websocket.accept"}
+        return [
+            reply["text"] if reply["text"] == "pong!" else json.loads(reply["text"])
+            for reply in replies
+        ]
+
+    def test_subscriber_receives_row_and_aggregates(self):
+        def write():
+            with self.captureOnCommitCallbacks(execute=True):
+                stats = Stats.objects.create(
+                    flock=self.flock,
+                    date=date(2026, 1, 1),
+                    harvested=DEFAULT_HARVEST,
+                    mortality=1,
+                    feed_consumed=2,
+                )
+            with self.captureOnCommitCallbacks(execute=True):
+                Stats.objects.bulk_insert(
+                    self.flock,
+                    [
+                        Stats(
+                            date=date(2026, 1, 1) + timedelta(days=offset),
+                            harvested=DEFAULT_HARVEST,
+                            mortality=0,
+                            feed_consumed=1,
+                        )
+                        for offset in (1, 2)
+                    ],
+                )
+            with self.captureOnCommitCallbacks(execute=True):
+                stats.delete()
+
+        subscribe = json.dumps({"action": "subscribe", "flock": self.flock.pk})
+        subscribed, created, imported, deleted = self.run_socket(
+            [subscribe],
+            during=write,
+            pushed=3,
+        )
+        assert subscribed == {"type": "subscribed", "flock": self.flock.pk}
+        assert created["event"] == "created"
+        assert created["row"]["date"] == "2026-01-01"
+        assert created["row"]["percentage"] == DEFAULT_HARVEST
+        assert created["aggregates"]["stats_count"] == 1
+        assert created["aggregates"]["total_mortality"] == 1
+        assert (imported["event"], imported["count"]) == ("imported", 2)
+        assert imported["row"]["day"] == 3  # noqa: PLR2004
+        assert imported["aggregates"]["total_harvested"] == 3 * DEFAULT_HARVEST
+        assert deleted["event"] == "deleted"
+        assert deleted["row"]["id"] == created["row"]["id"]
+        assert deleted["aggregates"]["stats_count"] == 2  # noqa: PLR2004
+
+    def test_protocol_replies(self):
+        replies = self.run_socket(
+            [
+                "ping",
+                "not json",
+                json.dumps({"action": "subscribe", "flock": 0}),
+                json.dumps({"action": "watch", "flock": self.flock.pk}),
+                json.dumps({"action": "subscribe", "flock": self.flock.pk}),
+                json.dumps({"action": "unsubscribe", "flock": self.flock.pk}),
+            ],
+        )
+        assert replies[0] == "pong!"
+        assert [reply["type"] for reply in replies[1:4]] == ["error"] * 3
+        assert replies[2]["message"] == "Flock 0 does not exist."
+        assert replies[4:] == [
+            {"type": "subscribed", "flock": self.flock.pk},
+            {"type": "unsubscribed", "flock": self.flock.pk},
+        ]
+
+    def test_backend_down_keeps_the_socket_open(self):
+        backend = FailingBroadcast(subscribed=False)
+        subscribe = json.dumps({"action": "subscribe", "flock": self.flock.pk})
+        with (
+            mock.patch("config.websocket.get_broadcast", return_value=backend),
+            self.assertLogs("config.websocket", "ERROR"),
+        ):
+            replies = self.run_socket([subscribe, "ping"])
+        assert replies == [
+            {"type": "error", "message": "Live updates are unavailable."},
+            "pong!",
+        ]
+
+    def test_dropped_subscription_is_reported(self):
+        backend = FailingBroadcast(subscribed=True)
+        subscribe = json.dumps({"action": "subscribe", "flock": self.flock.pk})
+        with (
+            mock.patch("config.websocket.get_broadcast", return_value=backend),
+            self.assertLogs("config.websocket", "ERROR") as logs,
+        ):
+            replies = self.run_socket([subscribe, "ping"], pushed=1)
+        assert "pong!" in replies
+        frames = sorted(
+            (reply for reply in replies if reply != "pong!"),
+            key=lambda reply: reply["type"],
+        )
+        assert frames[0]["type"] == "error"
+        assert frames[0]["flock"] == self.flock.pk
+        assert frames[1] == {"type": "subscribed", "flock": self.flock.pk}
+        assert "Broadcast of flock" in logs.output[0]
+
+
+class ConditionalGetTests(TestCase):
+    """Unchanged pages are answered with 304 before any stats query."""
+
+    def setUp(self):
+        cache.clear()
+        self.flock = Flock.objects.create(
+            title="Conditional Flock",
+            number_of_ducks=DEFAULT_DUCK_COUNT,
+            started_date=timezone.now().date() - timedelta(days=10),
+        )
+        self.stats = Stats.objects.create(
+            flock=self.flock,
+            date=self.flock.started_date,
+            harvested=DEFAULT_HARVEST,
+        )
+        self.url = reverse("ducks:flock-detail", kwargs={"pk": self.flock.pk})
+
+    def revalidate(self, url, response, **kwargs):
+        return self.client.get(
+            url,
+            headers={"if-none-match": response["ETag"], **kwargs.pop("headers", {})},
+            **kwargs,
+        )
+
+    def test_detail_not_modified_without_stats_queries(self):
+        response = self.client.get(self.url)
+        assert response.status_code == HTTPStatus.OK
+        with CaptureQueriesContext(connection) as captured:
+            response = self.revalidate(self.url, response)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        # only the flock + summary row
+        assert len(data_queries(captured)) == 1
+        assert "ducks_stats" not in data_queries(captured)[0]
+
+    def test_last_modified_once_its_second_is_over(self):
+        now = timezone.now()
+        Flock.objects.filter(pk=self.flock.pk).update(updated_at=now)
+        FlockSummary.objects.filter(flock=self.flock).update(updated_at=now)
+        assert "Last-Modified" not in self.client.get(self.url)
+
+        earlier = now - timedelta(hours=1)
+        Flock.objects.filter(pk=self.flock.pk).update(updated_at=earlier)
+        FlockSummary.objects.filter(flock=self.flock).update(updated_at=earlier)
+        response = self.client.get(self.url)
+        assert response["Last-Modified"]
+        response = self.client.get(
+            self.url,
+            headers={"if-modified-since": response["Last-Modified"]},
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    def test_first_visit_etag_is_reused(self):
+        # The first response also sets the CSRF cookie, which must not count.
+        response = self.client.get(self.url)
+        assert "csrftoken" in response.cookies
+        assert self.revalidate(self.url, response).status_code == (
+            HTTPStatus.NOT_MODIFIED
+        )
+
+    def test_xhr_rows_have_their_own_etag(self):
+        xhr = {"x-requested-with": "XMLHttpRequest"}
+        page = self.client.get(self.url)
+        rows = self.client.get(self.url, headers=xhr)
+        assert rows["ETag"] != page["ETag"]
+        response = self.revalidate(self.url, rows, headers=xhr)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    def test_stats_edit_changes_etag(self):
+        response = self.client.get(self.url)
+        stats = Stats.objects.get(pk=self.stats.pk)
+        stats.notes = "Rainy day"
+        stats.save()
+        response = self.revalidate(self.url, response)
+        assert response.status_code == HTTPStatus.OK
+
+    def test_import_changes_etag(self):
+        response = self.client.get(self.url)
+        dataset = Dataset(headers=("date", "harvested"))
+        dataset.append(
+            ((self.flock.started_date + timedelta(days=1)).isoformat(), SECOND_HARVEST),
+        )
+        import_dataset(self.flock, dataset)
+        response = self.revalidate(self.url, response)
+        assert response.status_code == HTTPStatus.OK
+
+    def test_list_not_modified_until_a_flock_is_deleted(self):
+        url = reverse("ducks:flock-list")
+        other = Flock.objects.create(title="Other", number_of_ducks=SMALL_DUCK_COUNT)
+        response = self.client.get(url)
+        with CaptureQueriesContext(connection) as captured:
+            not_modified = self.revalidate(url, response)
+        assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+        assert len(data_queries(captured)) == 1
+        other.delete()
+        assert self.revalidate(url, response).status_code == HTTPStatus.OK
+
+
+class IncomeSweepTests(TestCase):
+    """The what-if sweep agrees with the single-scenario calculator."""
+
+    def post_data(self, mode=None, **sweep):
+        data = {
+            "flock_size": 200,
+            "production_percent": 80,
+            "eggs-TOTAL_FORMS": 2,
+            "eggs-INITIAL_FORMS": 0,
+            "eggs-0-name": "Good",
+            "eggs-0-percent": 90,
+            "eggs-0-price": "8.00",
+            "eggs-1-name": "Cracked",
+            "eggs-1-percent": 10,
+            "eggs-1-price": "5.00",
+            "expenses-TOTAL_FORMS": 1,
+            "expenses-INITIAL_FORMS": 0,
+            "expenses-0-name": "Labor",
+            "expenses-0-cost": "300.00",
+            "feed-quantity_g": 150,
+            "feed-price_per_sack": "1500.00",
+        }
+        if mode:
+            data["mode"] = mode
+        data.update({f"sweep-{name}": value for name, value in sweep.items()})
+        return data
+
+    def test_single_scenario_matches_calculator(self):
+        url = reverse("ducks:income-calculator")
+        result = self.client.post(url, self.post_data()).context["result"]
+        sweep = self.client.post(url, self.post_data(mode="sweep")).context["sweep"]
+        assert sweep.size == 1
+        (row,) = sweep.best_rows()
+        assert row["total_eggs"] == pytest.approx(float(result["total_eggs"]))
+        assert row["total_income"] == pytest.approx(float(result["total_income"]))
+        assert row["feed_cost"] == pytest.approx(float(result["feed"]["cost"]))
+        assert row["net_income"] == pytest.approx(float(result["net_income"]))
+        assert row["production_cost_per_egg"] == pytest.approx(
+            float(result["egg_production_cost"]["total_egg_production_cost"]),
+        )
+        # At the break-even price of good eggs the net income is zero.
+        assert row["income_0"] + row["income_1"] == row["total_income"]
+        break_even = IncomeSweep.evaluate(
+            [200],
+            [80],
+            [row["break_even_egg_price"]],
+            [1500],
+            [("Good", 90, 8), ("Cracked", 10, 5)],
+            150,
+            300,
+        )
+        assert break_even.columns["net_income"][0] == pytest.approx(0)
+
+    def test_egg_types_with_the_same_name(self):
+        sweep = IncomeSweep.evaluate(
+            [100],
+            [80],
+            [5.0],
+            [20.0],
+            [("A", 50, 5), ("A", 50, 3)],
+            150,
+            0,
+        )
+        (row,) = sweep.best_rows()
+        assert (row["income_0"], row["income_1"]) == (200, 120)
+        assert row["total_income"] == 320  # noqa: PLR2004
+        assert row["break_even_egg_price"] == 0
+        assert sweep.column_labels().count("income_A") == 2  # noqa: PLR2004
+
+    def test_grid_csv_and_surface(self):
+        data = self.post_data(
+            mode="sweep-csv",
+            flock_sizes="100:1000:100",
+            production_percents="50, 75, 100",
+            egg_prices="6:9:0.5",
+            feed_prices="1400, 1600",
+        )
+        response = self.client.post(reverse("ducks:income-calculator"), data)
+        assert response["Content-Type"] == "text/csv"
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        assert lines[0].split(",")[-3:] == [
+            "net_income",
+            "production_cost_per_egg",
+            "break_even_egg_price",
+        ]
+        assert len(lines) == 1 + 10 * 3 * 7 * 2
+
+        data["mode"] = "sweep"
+        sweep = self.client.post(reverse("ducks:income-calculator"), data).context[
+            "sweep"
+        ]
+        best = sweep.best_rows(limit=1)[0]
+        assert (best["flock_size"], best["egg_price"]) == (1000, 9)
+        surfaces = sweep.surfaces()
+        assert [surface["feed_price"] for surface in surfaces] == [1400, 1600]
+        assert len(surfaces[0]["rows"]) == 10  # noqa: PLR2004
+        # Dearer feed needs a dearer egg to break even.
+        assert (sweep.break_even[1] > sweep.break_even[0]).all()
+
+    def test_csv_header_quotes_egg_type_names(self):
+        data = self.post_data(mode="sweep-csv", flock_sizes="100, 200")
+        data["eggs-0-name"] = "Grade A, large"
+        response = self.client.post(reverse("ducks:income-calculator"), data)
+        content = b"".join(response.streaming_content).decode()
+        header, *rows = csv.reader(io.StringIO(content))
+        assert header[5:7] == ["income_Grade A, large", "income_Cracked"]
+        assert [len(row) for row in rows] == [len(header)] * 2
+
+    def test_invalid_sweeps_are_reported(self):
+        url = reverse("ducks:income-calculator")
+        response = self.client.post(
+            url,
+            self.post_data(mode="sweep", flock_sizes="10:1:1", egg_prices="a, b"),
+        )
+        assert "sweep" not in response.context
+        errors = response.context["sweep_form"].errors
+        assert set(errors) == {"flock_sizes", "egg_prices"}
+        response = self.client.post(
+            url,
+            self.post_data(
+                mode="sweep",
+                flock_sizes="1:1000:1",
+                production_percents="0:100:1",
+                egg_prices="1:10:1",
+            ),
+        )
+        assert response.context["sweep_form"].non_field_errors()
+
+
+class FlockIncomeReportTests(TestCase):
+    """The calculator's "from flock" mode reads the recorded stats."""
+
+    def setUp(self):
+        self.flock = Flock.objects.create(
+            title="Income Flock",
+            number_of_ducks=DEFAULT_DUCK_COUNT,
+            started_date=date(2026, 1, 1),
+        )
+        for offset, (harvested, feed) in enumerate([(80, 2), (0, 2), (90, 3)]):
+            Stats.objects.create(
+                flock=self.flock,
+                date=date(2026, 1, 1) + timedelta(days=offset),
+                harvested=harvested,
+                mortality=0,
+                feed_consumed=feed,
+            )
+        self.egg_types = [("Good", 90, Decimal("8.00")), ("Cracked", 10, Decimal(5))]
+
+    def test_daily_figures_from_one_query(self):
+        with CaptureQueriesContext(connection) as captured:
+            report = FlockIncomeReport.for_flock(
+                self.flock,
+                egg_types=self.egg_types,
+                feed_price=Decimal(1500),
+                expenses=Decimal(100),
+                start_date=date(2026, 1, 2),
+            )
+        assert len(data_queries(captured)) == 1
+        assert report.days["date"] == [date(2026, 1, 2), date(2026, 1, 3)]
+        rows = report.rows()
+        # 90 eggs: 81 good at 8 + 9 cracked at 5; 3 sacks at 1500 + 100.
+        assert rows[1]["income"] == 693  # noqa: PLR2004
+        assert rows[1]["net_income"] == 693 - 4600
+        assert rows[1]["cumulative_net_income"] == -3100 + 693 - 4600
+        assert rows[0]["cost_per_egg"] is None
+        assert report.totals["cost_per_egg"] == pytest.approx((3100 + 4600) / 90)
+        assert report.totals["income_0"] == 648  # noqa: PLR2004
+
+    def test_egg_types_with_the_same_name(self):
+        report = FlockIncomeReport.for_flock(
+            self.flock,
+            egg_types=[("Good", 90, Decimal("8.00")), ("Good", 10, Decimal(5))],
+            feed_price=Decimal(1500),
+            expenses=0,
+        )
+        # 170 eggs: 153 at 8 + 17 at 5.
+        assert report.totals["income"] == 1309  # noqa: PLR2004
+        assert report.totals["net_income"] == 1309 - 7 * 1500
+        assert report.totals["cost_per_egg"] == pytest.approx(7 * 1500 / 170)
+
+    def test_calculator_mode_ignores_manual_inputs(self):
+        data = {
+            "mode": "flock",
+            "source-flock": self.flock.pk,
+            "eggs-TOTAL_FORMS": 1,
+            "eggs-INITIAL_FORMS": 0,
+            "eggs-0-name": "Good",
+            "eggs-0-percent": 100,
+            "eggs-0-price": "8.00",
+            "expenses-TOTAL_FORMS": 0,
+            "expenses-INITIAL_FORMS": 0,
+            "feed-price_per_sack": "1000.00",
+        }
+        response = self.client.post(reverse("ducks:income-calculator"), data)
+        report = response.context["flock_report"]
+        assert report.day_count == 3  # noqa: PLR2004
+        assert report.totals["net_income"] == 170 * 8 - 7 * 1000
+        assert "result" not in response.context
+        assert b"Realized Income" in response.content
+
+
+class DucksApiTests(TestCase):
+    """Flock/stats viewsets: cursor pages, sparse fields, bulk inserts."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username="collector",
+            password="not-used",  # noqa: S106
+        )
+        self.client.force_login(self.user)
+        today = timezone.now().date()
+        self.flocks = [
+            Flock.objects.create(
+                title=f"API Flock {index}",
+                number_of_ducks=DEFAULT_DUCK_COUNT,
+                started_date=today - timedelta(days=10 + index),
+            )
+            for index in range(3)
+        ]
+        for flock in self.flocks:
+            for offset in range(3):
+                Stats.objects.create(
+                    flock=flock,
+                    date=flock.started_date + timedelta(days=offset),
+                    harvested=DEFAULT_HARVEST,
+                )
+
+    def next_dates(self, flock, count=1):
+        start = flock.started_date + timedelta(days=3)
+        return [(start + timedelta(days=offset)).isoformat() for offset in range(count)]
+
+    def test_requires_authentication(self):
+        self.client.logout()
+        response = self.client.get(reverse("api:stats-list"))
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+    def test_flock_list_sparse_fields_and_cursor(self):
+        url = reverse("api:flock-list")
+        response = self.client.get(url, {"fields": "id,title", "page_size": 2})
+        payload = response.json()
+        assert payload["results"][0] == {
+            "id": self.flocks[2].pk,
+            "title": self.flocks[2].title,
+        }
+        assert len(payload["results"]) == 2  # noqa: PLR2004
+        assert payload["next"]
+        payload = self.client.get(payload["next"]).json()
+        assert payload["results"] == [
+            {"id": self.flocks[0].pk, "title": self.flocks[0].title},
+        ]
+        detail = self.client.get(
+            reverse("api:flock-detail", kwargs={"pk": self.flocks[0].pk}),
+        ).json()
+        assert detail["stats_count"] == 3  # noqa: PLR2004
+        assert detail["average_percentage"] == "10.00"
+
+    def test_stats_list_filters(self):
+        flock = self.flocks[0]
+        response = self.client.get(
+            reverse("api:stats-list"),
+            {
+                "flock": flock.pk,
+                "start_date": (flock.started_date + timedelta(days=1)).isoformat(),
+                "fields": "date,harvested",
+            },
+        )
+        results = response.json()["results"]
+        assert [row["date"] for row in results] == [
+            (flock.started_date + timedelta(days=offset)).isoformat()
+            for offset in (1, 2)
+        ]
+        assert set(results[0]) == {"date", "harvested"}
+        response = self.client.get(
+            reverse("api:stats-list"),
+            {"start_date": "2026-03-02", "end_date": "2026-03-01"},
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert "end_date" in response.json()
+
+    def test_bulk_create_for_many_flocks(self):
+        entries = [
+            {"flock": flock.pk, "date": date, "harvested": 20 + index}
+            for flock in self.flocks
+            for index, date in enumerate(reversed(self.next_dates(flock, 2)))
+        ]
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.post(
+                reverse("api:stats-list"),
+                entries,
+                content_type="application/json",
+            )
+        assert response.status_code == HTTPStatus.CREATED, response.json()
+        # session + user, flocks, recorded dates, last dates,
+        # then 4 writes per flock (day counter, insert, summary, rollups)
+        assert len(data_queries(captured)) == 5 + 4 * len(self.flocks)
+        created = response.json()
+        assert [entry["date"] for entry in created] == [e["date"] for e in entries]
+        # Days follow the dates, not the order of the request.
+        assert [entry["day"] for entry in created[:2]] == [5, 4]
+        assert created[0]["percentage"] == "20.00"
+        summary = FlockSummary.objects.get(flock=self.flocks[0])
+        assert summary.stats_count == 5  # noqa: PLR2004
+        assert summary.total_harvested == 3 * DEFAULT_HARVEST + 41
+
+    def test_bulk_create_reports_errors_per_entry(self):
+        flock = self.flocks[0]
+        entries = [
+            {"flock": flock.pk, "date": self.next_dates(flock)[0], "harvested": 1},
+            {"flock": flock.pk, "date": flock.started_date.isoformat()},
+            {"flock": flock.pk, "date": self.next_dates(flock, 3)[2]},
+            {"flock": 0, "date": self.next_dates(flock)[0]},
+            {"flock": flock.pk, "date": self.next_dates(flock)[0], "harvested": -1},
+        ]
+        response = self.client.post(
+            reverse("api:stats-list"),
+            entries[:3],
+            content_type="application/json",
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        errors = response.json()
+        assert errors[0] == {}
+        assert errors[1]["date"] == [duplicate_date_message(flock.started_date)]
+        assert "gap" in errors[2]["date"][0]
+        assert flock.stats.count() == 3  # noqa: PLR2004
+
+        response = self.client.post(
+            reverse("api:stats-list"),
+            entries[3:],
+            content_type="application/json",
+        )
+        errors = response.json()
+        assert set(errors[0]) == {"flock"}
+        assert set(errors[1]) == {"harvested"}
+
+    def test_single_create_and_update(self):
+        flock = self.flocks[1]
+        response = self.client.post(
+            reverse("api:stats-list"),
+            {"flock": flock.pk, "date": self.next_dates(flock)[0], "harvested": 30},
+            content_type="application/json",
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json()["day"] == 4  # noqa: PLR2004
+        url = reverse("api:stats-detail", kwargs={"pk": response.json()["id"]})
+        response = self.client.patch(
+            url,
+            {"harvested": EXCESS_HARVEST},
+            content_type="application/json",
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert "harvested" in response.json()
+        response = self.client.patch(
+            url,
+            {"harvested": 40},
+            content_type="application/json",
+        )
+        assert response.json()["percentage"] == "40.00"
+        assert FlockSummary.objects.get(flock=flock).total_harvested == 70  # noqa: PLR2004
+
+    def test_update_cannot_move_stats_to_another_flock(self):
+        stats = self.flocks[0].stats.get(day=3)
+        other = self.flocks[1]
+        url = reverse("api:stats-detail", kwargs={"pk": stats.pk})
+        response = self.client.patch(
+            url,
+            {"flock": other.pk, "harvested": 20},
+            content_type="application/json",
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()["flock"] == self.flocks[0].pk
+        stats.refresh_from_db()
+        assert (stats.flock_id, stats.day, stats.harvested) == (
+            self.flocks[0].pk,
+            3,
+            20,
+        )
+        assert other.stats.count() == 3  # noqa: PLR2004
+
+
+class ViewBenchmarkTests(TestCase):
+    def test_make_farm(self):
+        farm = make_farm(3, 20)
+        assert len(farm) == 3  # noqa: PLR2004
+        for flock in farm:
+            flock.refresh_from_db()
+            assert flock.last_day == 20  # noqa: PLR2004
+            assert flock.stats.count() == 20  # noqa: PLR2004
+            assert not flock.stats.filter(harvested__gt=flock.number_of_ducks).exists()
+            summary = FlockSummary.objects.get(flock=flock)
+            assert summary.stats_count == 20  # noqa: PLR2004
+
+    def test_scenario_parse(self):
+        assert Scenario.parse("100x365") == Scenario(100, 365)
+        assert str(Scenario.parse("10X30")) == "10x30"
+        for value in ("0x30", "10", "ax3"):
+            with pytest.raises(ValueError):  # noqa: PT011
+                Scenario.parse(value)
+
+    def test_run_benchmarks(self):
+        results = run_benchmarks([Scenario(2, 12)], repeat=1)
+        cases = results["2x12"]
+        assert set(cases) == {
+            "flock_list",
+            "flock_detail",
+            "flock_detail_xhr",
+            "flock_export",
+            "flock_import",
+            "recalculate_percentage",
+            "flock_cohort",
+            "cohort_load",
+            "cohort_compare",
+        }
+        for metrics in cases.values():
+            assert metrics["wall_time"] > 0
+            assert metrics["peak_memory"] > 0
+        # Only the comparison runs on grids loaded beforehand.
+        assert [name for name, metrics in cases.items() if not metrics["queries"]] == [
+            "cohort_compare",
+        ]
+        # The farms are rolled back.
+        assert not Flock.objects.exists()
+        assert compare(results, results) == []
+
+    def test_compare(self):
+        baseline = {
+            "10x30": {
+                "flock_list": {"wall_time": 0.1, "queries": 4, "peak_memory": 1000},
+            },
+        }
+        results = {
+            "10x30": {
+                "flock_list": {"wall_time": 0.14, "queries": 4, "peak_memory": 1600},
+                # Not in the baseline: skipped.
+                "flock_detail": {"wall_time": 9.0, "queries": 99, "peak_memory": 1},
+            },
+        }
+        assert compare(results, baseline, tolerance=0.5) == [
+            "10x30 flock_list: peak_memory 1600 (baseline 1000, limit 1500)",
+        ]
+        results["10x30"]["flock_list"]["queries"] = 5
+        assert compare(results, baseline, tolerance=1)[0] == (
+            "10x30 flock_list: 5 queries (baseline 4)"
+        )
+
+
+def no_arguments(case):
+    return {}
+
+
+def flock_pk(case):
+    return {"pk": case.flock.pk}
+
+
+def calculator_data(case):
+    return {
+        "flock_size": 200,
+        "production_percent": 80,
+        "eggs-TOTAL_FORMS": 1,
+        "eggs-INITIAL_FORMS": 0,
+        "eggs-0-name": "Good",
+        "eggs-0-percent": 100,
+        "eggs-0-price": "8.00",
+        "expenses-TOTAL_FORMS": 0,
+        "expenses-INITIAL_FORMS": 0,
+        "feed-quantity_g": 150,
+        "feed-price_per_sack": "1500.00",
+    }
+
+
+@dataclass(frozen=True)
+class QueryBudget:
+    """At most ``queries`` data queries for one request to ``url_name``.
+
+    ``url_kwargs``, ``query`` and ``data`` build the request from the test
+    case; every request runs against a cold cache.
+    """
+
+    url_name: str
+    queries: int
+    method: str = "get"
+    url_kwargs: Callable = flock_pk
+    query: Callable = no_arguments
+    data: Callable = no_arguments
+    headers: dict | None = None
+    label: str = ""
+
+    @property
+    def name(self):
+        return f"{self.method.upper()} {self.url_name} {self.label}".strip()
+
+
+# One entry per request a ``ducks:`` URL serves; QueryBudgetTests check
+# that every URL name has one and that it holds for 1 and 100 flocks/rows.
+QUERY_BUDGETS = [
+    QueryBudget("flock-list", 2, url_kwargs=no_arguments),
+    QueryBudget("flock-detail", 3),
+    QueryBudget(
+        "flock-detail",
+        2,
+        headers={"x-requested-with": "XMLHttpRequest"},
+        label="rows",
+    ),
+    QueryBudget("flock-chart-data", 2),
+    QueryBudget("flock-cohort", 3),
+    QueryBudget("flock-add", 0, url_kwargs=no_arguments),
+    QueryBudget(
+        "flock-add",
+        3,
+        "post",
+        url_kwargs=no_arguments,
+        data=lambda case: {
+            "title": "Budget Flock",
+            "number_of_ducks": DEFAULT_DUCK_COUNT,
+            "started_date": FARM_START_DATE,
+        },
+    ),
+    QueryBudget("flock-edit", 1),
+    QueryBudget(
+        "flock-edit",
+        5,
+        "post",
+        data=lambda case: {
+            "title": "Renamed Flock",
+            "number_of_ducks": case.flock.number_of_ducks,
+            "started_date": case.flock.started_date,
+        },
+    ),
+    QueryBudget("flock-delete", 1),
+    QueryBudget("flock-delete", 7, "post"),
+    QueryBudget(
+        "stats-add",
+        1,
+        url_kwargs=no_arguments,
+        query=lambda case: {"flock": case.flock.pk},
+    ),
+    QueryBudget(
+        "stats-add",
+        6,
+        "post",
+        url_kwargs=no_arguments,
+        query=lambda case: {"flock": case.flock.pk},
+        data=lambda case: {
+            "date": case.stats.date + timedelta(days=1),
+            "harvested": DEFAULT_HARVEST,
+            "mortality": 0,
+            "feed_consumed": 0,
+        },
+    ),
+    QueryBudget(
+        "stats-edit",
+        1,
+        url_kwargs=lambda case: {"pk": case.stats.pk},
+        query=lambda case: {"flock": case.flock.pk},
+    ),
+    QueryBudget(
+        "stats-edit",
+        5,
+        "post",
+        url_kwargs=lambda case: {"pk": case.stats.pk},
+        query=lambda case: {"flock": case.flock.pk},
+        data=lambda case: {
+            "date": case.stats.date,
+            "harvested": DEFAULT_HARVEST,
+            "mortality": 0,
+            "feed_consumed": 0,
+        },
+    ),
+    QueryBudget("flock-export", 2, "post", data=lambda case: {"format": 0}),
+    QueryBudget(
+        "stats-export-job-add",
+        4,
+        "post",
+        url_kwargs=no_arguments,
+        data=lambda case: {"flocks": [flock.pk for flock in case.farm]},
+    ),
+    QueryBudget(
+        "stats-export-job",
+        2,
+        url_kwargs=lambda case: {"pk": case.export_job.pk},
+    ),
+    QueryBudget(
+        "stats-export-job",
+        2,
+        url_kwargs=lambda case: {"pk": case.export_job.pk},
+        headers={"accept": "application/json"},
+        label="progress",
+    ),
+    QueryBudget(
+        "stats-export-download",
+        1,
+        url_kwargs=lambda case: {"pk": case.export_job.pk},
+    ),
+    QueryBudget(
+        "flock-import",
+        2,
+        "post",
+        data=lambda case: {
+            "file": SimpleUploadedFile("stats.csv", b"date,harvested\n"),
+        },
+    ),
+    QueryBudget(
+        "stats-import-template",
+        2,
+        query=lambda case: {"job": case.import_job.pk},
+    ),
+    QueryBudget(
+        "stats-import-job",
+        1,
+        url_kwargs=lambda case: {"pk": case.flock.pk, "job_pk": case.import_job.pk},
+    ),
+    QueryBudget("income-calculator", 1, url_kwargs=no_arguments),
+    QueryBudget(
+        "income-calculator",
+        1,
+        "post",
+        url_kwargs=no_arguments,
+        data=calculator_data,
+    ),
+    QueryBudget(
+        "income-calculator",
+        3,
+        "post",
+        url_kwargs=no_arguments,
+        data=lambda case: {
+            **calculator_data(case),
+            "mode": "flock",
+            "source-flock": case.flock.pk,
+        },
+        label="from flock",
+    ),
+]
+
+
+@override_settings(STORAGES=IN_MEMORY_STORAGES)
+class QueryBudgetTests(TestCase):
+    """Every ``ducks:`` request stays within its ``QUERY_BUDGETS`` entry.
+
+    Subclasses set the farm size; the same budget must hold for all of them,
+    so a query per flock or per row fails at the larger size.
+    """
+
+    flocks = 1
+    days = 1
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.farm = make_farm(cls.flocks, cls.days)
+        cls.flock = cls.farm[0]
+        cls.stats = cls.flock.stats.latest("date")
+        cls.import_job = StatsImportJob.objects.create(
+            flock=cls.flock,
+            file=ContentFile(b"date,harvested\n", name="stats.csv"),
+            status=StatsImportJob.Status.SUCCEEDED,
+        )
+        cls.export_job = StatsExportJob.objects.create(
+            file=ContentFile(b"date,harvested\n", name="export.csv"),
+            status=StatsExportJob.Status.SUCCEEDED,
+        )
+        cls.export_job.flocks.set(cls.farm)
+
+    def test_every_url_name_has_a_budget(self):
+        budgeted = {budget.url_name for budget in QUERY_BUDGETS}
+        assert budgeted == {pattern.name for pattern in urlpatterns}
+
+    def test_query_budgets(self):
+        for budget in QUERY_BUDGETS:
+            with self.subTest(budget.name):
+                self.assert_within_budget(budget)
+
+    def assert_within_budget(self, budget):
+        url = reverse(f"ducks:{budget.url_name}", kwargs=budget.url_kwargs(self))
+        query = budget.query(self)
+        if query:
+            url = f"{url}?{'&'.join(f'{k}={v}' for k, v in query.items())}"
+        request = getattr(self.client, budget.method)
+        cache.clear()
+        # Rolled back so that writes do not change the next request.
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as captured:
+                response = request(url, budget.data(self), headers=budget.headers or {})
+                if response.streaming:
+                    b"".join(response.streaming_content)
+            transaction.set_rollback(True)
+        assert response.status_code < HTTPStatus.BAD_REQUEST, response
+        queries = data_queries(captured)
+        assert len(queries) <= budget.queries, "\n".join(
+            [
+                f"{budget.name}: {len(queries)} queries, budget {budget.queries}",
+                *(f"{number}. {sql}" for number, sql in enumerate(queries, 1)),
+            ],
+        )
+
+
+class LargeFarmQueryBudgetTests(QueryBudgetTests):
+    flocks = 100
+    days = 100
+
+
+class ServerTimingTests(TestCase):
+    """``config.timing.ServerTimingMiddleware`` on the flock pages."""
+
+    def setUp(self):
+        cache.clear()
+        self.flock = make_farm(1, 30)[0]
+        self.url = reverse("ducks:flock-detail", kwargs={"pk": self.flock.pk})
+
+    @staticmethod
+    def parse_header(response):
+        timings = {}
+        for metric in response["Server-Timing"].split(", "):
+            name, *params = metric.split(";")
+            timings[name] = dict(param.split("=", 1) for param in params)
+        return timings
+
+    def test_header_and_log_line(self):
+        with self.assertLogs("config.timing", "INFO") as logs:
+            response = self.client.get(self.url)
+        timings = self.parse_header(response)
+        assert list(timings) == ["db", "tpl", "app", "total"]
+        assert timings["db"]["desc"].endswith(' queries"')
+        assert float(timings["tpl"]["dur"]) > 0
+        parts = sum(float(timings[name]["dur"]) for name in ("db", "tpl", "app"))
+        assert parts == pytest.approx(float(timings["total"]["dur"]), abs=0.2)
+
+        (record,) = logs.records
+        assert record.levelname == "INFO"
+        assert record.timings["url_name"] == "ducks:flock-detail"
+        assert record.timings["status"] == HTTPStatus.OK
+        assert "url_name=ducks:flock-detail method=GET" in record.getMessage()
+
+    def test_rendered_rows_count_as_template_time(self):
+        with self.assertLogs("config.timing", "INFO") as logs:
+            self.client.get(self.url, headers={"x-requested-with": "XMLHttpRequest"})
+        assert logs.records[0].timings["template_ms"] > 0
+
+    def test_template_queries_are_not_template_time(self):
+        timings = RequestTimings()
+        # A nested render (an include, a widget) counts once.
+        with timings.rendering(), timings.rendering():
+            timings(
+                lambda *args: time.sleep(0.01),
+                "SELECT 1",
+                (),
+                many=False,
+                context={},
+            )
+        metrics = timings.as_metrics(total=timings.template_time)
+        assert metrics["db_queries"] == 1
+        assert metrics["template_ms"] < metrics["db_ms"]
+        assert metrics["app_ms"] == 0
+
+    @override_settings(SLOW_REQUEST_THRESHOLD=0, SERVER_TIMING_HEADER=False)
+    def test_slow_requests_log_their_sql(self):
+        with self.assertLogs("config.timing", "WARNING") as logs:
+            response = self.client.get(self.url)
+        assert "Server-Timing" not in response
+        line, queries = logs.records
+        assert line.levelname == "WARNING"
+        message = queries.getMessage()
+        assert message.startswith(f"slow request GET {self.url} ran ")
+        assert '"ducks_stats"' in message
+
+
+@override_settings(METRICS_TOKEN=METRICS_TOKEN)
+class MetricsTests(TestCase):
+    """``/metrics`` and the registry behind it (``config.metrics``)."""
+
+    def setUp(self):
+        self.flock = Flock.objects.create(
+            title="Metrics Flock",
+            number_of_ducks=DEFAULT_DUCK_COUNT,
+            started_date=date(2026, 1, 1),
+        )
+
+    def scrape(self):
+        """``/metrics`` as ``{sample: value}``."""
+        response = self.client.get(
+            reverse("metrics"),
+            headers={"authorization": f"Bearer {METRICS_TOKEN}"},
+        )
+        assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+        return {
+            sample: float(value)
+            for sample, _, value in (
+                line.rpartition(" ")
+                for line in response.content.decode().splitlines()
+                if not line.startswith("#")
+            )
+        }
+
+    @staticmethod
+    def make_metrics(registry):
+        return (
+            Counter("jobs_total", "Jobs.", ["queue"], registry=registry),
+            Histogram("job_seconds", "Job runtime.", buckets=(1, 5), registry=registry),
+        )
+
+    def test_text_exposition_format(self):
+        registry = Registry()
+        jobs, seconds = self.make_metrics(registry)
+        jobs.inc(queue='a"b')
+        jobs.inc(2, queue='a"b')
+        for value in (0.5, 1, 3, 9):
+            seconds.observe(value)
+        assert registry.render().splitlines() == [
+            "# HELP job_seconds Job runtime.",
+            "# TYPE job_seconds histogram",
+            'job_seconds_bucket{le="1"} 2',
+            'job_seconds_bucket{le="5"} 3',
+            'job_seconds_bucket{le="+Inf"} 4',
+            "job_seconds_sum 13.5",
+            "job_seconds_count 4",
+            "# HELP jobs_total Jobs.",
+            "# TYPE jobs_total counter",
+            'jobs_total{queue="a\\"b"} 3',
+        ]
+        with pytest.raises(ValueError):  # noqa: PT011
+            jobs.inc(-1, queue="a")
+        with pytest.raises(ValueError):  # noqa: PT011
+            jobs.inc(other="a")
+
+    def test_processes_are_summed_through_the_directory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            # Two workers: one registry each, sharing the directory.
+            registries = [Registry(directory, flush_interval=60) for _ in range(2)]
+            for registry, count in zip(registries, (1, 4), strict=True):
+                jobs, seconds = self.make_metrics(registry)
+                jobs.inc(count, queue="a")
+                seconds.observe(count)
+            registries[0].flush()
+            assert registries[1].collect() == {
+                ("jobs_total", (("queue", "a"),)): 5,
+                ("job_seconds", ()): [1, 1, 0, 5, 2],
+            }
+            # A forked child starts empty, next to its parent's file.
+            registries[1]._pid = -1  # noqa: SLF001
+            jobs.inc(queue="a")
+            totals = registries[1].collect()
+            assert totals[("jobs_total", (("queue", "a"),))] == 1 + 4 + 1
+            assert len(list(Path(directory).glob("*.json"))) == 3  # noqa: PLR2004
+
+    def test_exited_processes_are_archived(self):
+        key = ("jobs_total", (("queue", "a"),))
+        with tempfile.TemporaryDirectory() as directory:
+            # A worker killed without cleaning up (no such pid).
+            dead = Path(directory) / "999999999-0badf00d.json"
+            dead.write_text(json.dumps([["jobs_total", [["queue", "a"]], 2]]))
+            registries = [Registry(directory, flush_interval=60) for _ in range(2)]
+            for registry, count in zip(registries, (1, 4), strict=True):
+                jobs, _ = self.make_metrics(registry)
+                jobs.inc(count, queue="a")
+            registries[0].flush()
+            assert not dead.exists()
+
+            registries[0].retire()
+            assert registries[1].collect()[key] == 2 + 1 + 4
+            names = {path.name for path in Path(directory).glob("*.json")}
+            assert names == {ARCHIVE_FILE_NAME, registries[1]._file_name}  # noqa: SLF001
+            registries[1].retire()
+            fresh = Registry(directory)
+            assert fresh.collect()[key] == 2 + 1 + 4
+            names = {path.name for path in Path(directory).glob("*.json")}
+            assert names == {ARCHIVE_FILE_NAME, fresh._file_name}  # noqa: SLF001
+
+    def test_requests_are_counted_by_url_name(self):
+        url = reverse("ducks:flock-detail", kwargs={"pk": self.flock.pk})
+        labels = 'route="ducks:flock-detail",method="GET"'
+        requests = f'http_requests_total{{{labels},status="200"}}'
+        duration = f"http_request_duration_seconds_count{{{labels}}}"
+        before = self.scrape()
+        self.client.get(url)
+        self.client.get(url)
+        after = self.scrape()
+        assert after[requests] - before.get(requests, 0) == 2  # noqa: PLR2004
+        assert after[duration] - before.get(duration, 0) == 2  # noqa: PLR2004
+
+    def test_token(self):
+        assert self.client.get(reverse("metrics")).status_code == HTTPStatus.FORBIDDEN
+        response = self.client.get(
+            reverse("metrics"),
+            headers={"authorization": "Bearer wrong"},
+        )
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+    @override_settings(METRICS_TOKEN="")
+    def test_hidden_without_token_unless_debug(self):
+        assert self.client.get(reverse("metrics")).status_code == HTTPStatus.NOT_FOUND
+        with override_settings(DEBUG=True):
+            response = self.client.get(reverse("metrics"))
+        assert response.status_code == HTTPStatus.OK
+
+    @override_settings(STORAGES=IN_MEMORY_STORAGES)
+    def test_imports_exports_and_tasks(self):
+        imported = 'ducks_import_rows_total{result="imported"}'
+        uploaded = "ducks_import_upload_bytes_total"
+        exported = 'ducks_export_bytes_total{kind="job"}'
+        downloaded = 'ducks_export_bytes_total{kind="download"}'
+        task_runs = (
+            'celery_task_duration_seconds_count{task="apps.ducks.tasks.import_stats",'
+            'state="SUCCESS"}'
+        )
+        before = self.scrape()
+
+        content = "date,harvested,mortality,feed_consumed\n" + "".join(
+            f"{date(2026, 1, day).isoformat()},{DEFAULT_HARVEST},0,1\n"
+            for day in range(1, 4)
+        )
+        self.client.post(
+            reverse("ducks:flock-import", kwargs={"pk": self.flock.pk}),
+            {"file": SimpleUploadedFile("stats.csv", content.encode())},
+        )
+        job = StatsImportJob.objects.get(flock=self.flock)
+        import_stats.apply(args=[job.pk])
+
+        export_job = StatsExportJob.objects.create()
+        export_job.flocks.set([self.flock])
+        export_stats(export_job.pk)
+        export_job.refresh_from_db()
+        response = self.client.post(
+            reverse("ducks:flock-export", kwargs={"pk": self.flock.pk}),
+            {"format": 0},
+        )
+        download = b"".join(response.streaming_content)
+
+        after = self.scrape()
+        assert after[uploaded] - before.get(uploaded, 0) == len(content)
+        assert after[imported] - before.get(imported, 0) == 3  # noqa: PLR2004
+        assert after[task_runs] - before.get(task_runs, 0) == 1
+        assert after[exported] - before.get(exported, 0) == export_job.size
+        assert after[downloaded] - before.get(downloaded, 0) == len(download)
@@ -1,5 +1,7 @@
 from django.urls import path
 
+from .views import FlockChartDataView
+from .views import FlockCohortView
 from .views import FlockCreateUpdateView
 from .views import FlockDeleteView
 from .views import FlockDetailView
@@ -7,6 +9,10 @@ from .views import FlockListView
 from .views import FlockStatsExportView
 from .views import FlockStatsImportView
 from .views import StatsCreateUpdateView
+from .views import StatsExportJobCreateView
+from .views import StatsExportJobDownloadView
+from .views import StatsExportJobView
+from .views import StatsImportJobView
 from .views import StatsImportTemplateView
 from .views import FlockIncomeCalculatorView
 
@@ -19,11 +25,36 @@ urlpatterns = [
     path("delete/<int:pk>/", FlockDeleteView.as_view(), name="flock-delete"),
     path("stats/add/", StatsCreateUpdateView.as_view(), name="stats-add"),
     path("stats/<int:pk>/edit/", StatsCreateUpdateView.as_view(), name="stats-edit"),
+    path(
+        "flocks/<int:pk>/chart-data/",
+        FlockChartDataView.as_view(),
+        name="flock-chart-data",
+    ),
+    path(
+        "flocks/<int:pk>/cohort/",
+        FlockCohortView.as_view(),
+        name="flock-cohort",
+    ),
     path(
         "flocks/<int:pk>/export/",
         FlockStatsExportView.as_view(),
         name="flock-export",
     ),
+    path(
+        "exports/",
+        StatsExportJobCreateView.as_view(),
+        name="stats-export-job-add",
+    ),
+    path(
+        "exports/<int:pk>/",
+        StatsExportJobView.as_view(),
+        name="stats-export-job",
+    ),
+    path(
+        "exports/<int:pk>/download/",
+        StatsExportJobDownloadView.as_view(),
+        name="stats-export-download",
+    ),
     path(
         "flocks/<int:pk>/import/",
         FlockStatsImportView.as_view(),
@@ -34,6 +65,11 @@ urlpatterns = [
         StatsImportTemplateView.as_view(),
         name="stats-import-template",
     ),
+    path(
+        "flocks/<int:pk>/import/jobs/<int:job_pk>/",
+        StatsImportJobView.as_view(),
+        name="stats-import-job",
+    ),
     path(
         "income-calculator/",
         FlockIncomeCalculatorView.as_view(),
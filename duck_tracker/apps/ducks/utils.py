@@ -1,5 +1,10 @@
+import csv
+from itertools import batched
+
 from import_export.formats import base_formats
 
+EXPORT_CHUNK_SIZE = 2000
+
 
 def get_default_formats():
     """
@@ -16,3 +21,34 @@ def get_default_formats():
         # base_formats.HTML,
     )
     return [f for f in formats if f().can_export()]
+
+
+class Echo:
+    """
+    File-like object whose ``write`` hands the written value back.
+    """
+
+    def write(self, value):
+        return value
+
+
+def iter_csv_export(resource, queryset, chunk_size=EXPORT_CHUNK_SIZE, on_chunk=None):
+    """
+    Yields the CSV that ``resource.export(queryset)`` would produce, one
+    chunk of rows at a time.
+
+    Rows are read with ``queryset.iterator()`` and rendered through the
+    resource's own fields and widgets, so columns and formatting match the
+    tablib export while memory stays flat. ``on_chunk``, if given, is
+    called with the number of rows of each chunk once it is rendered.
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(resource.get_export_headers())
+    rows = queryset.iterator(chunk_size=chunk_size)
+    for chunk in batched(rows, chunk_size, strict=False):
+        data = "".join(
+            writer.writerow(resource.export_resource(instance)) for instance in chunk
+        )
+        if on_chunk is not None:
+            on_chunk(len(chunk))
+        yield data
@@ -64,6 +64,10 @@ def _validate_flock_size(flock, errors):
 # STATS VALIDATORS
 # ==================================================
 
+# Database constraints on ``Stats``; see ``stats_integrity_error``.
+STATS_UNIQUE_DATE = "ducks_stats_unique_flock_date"
+STATS_UNIQUE_DAY = "ducks_stats_unique_flock_day"
+
 
 def validate_stats_entry(stats):
     errors = {}
@@ -74,7 +78,6 @@ def validate_stats_entry(stats):
     _validate_harvested(stats, errors)
     _validate_percentage_bounds(stats, errors)
     _validate_positive_fields(stats, errors)
-    _validate_unique_date(stats, errors)
     _validate_date_bounds(stats, errors)
     _validate_date_immutability(stats, errors)
     _validate_date_gap(stats, errors)
@@ -119,23 +122,34 @@ def _validate_positive_fields(stats, errors):
             )
 
 
-def _validate_unique_date(stats, errors):
-    if not stats.date:
-        return
-
-    qs = type(stats).objects.filter(
-        flock=stats.flock,
-        date=stats.date,
+def duplicate_date_message(stats_date):
+    return (
+        f"A stat entry for {stats_date.strftime(DATE_FORMAT)} "
+        f"already exists for this flock."
     )
 
-    if stats.pk:
-        qs = qs.exclude(pk=stats.pk)
 
-    if qs.exists():
-        errors.setdefault("date", []).append(
-            f"A stat entry for {stats.date.strftime(DATE_FORMAT)} "
-            f"already exists for this flock.",
+def stats_integrity_error(stats, error):
+    """
+    Translate an ``IntegrityError`` raised while saving ``stats`` into the
+    ``ValidationError`` the validators report for the same problem.
+
+    Uniqueness of a date (and day) per flock is enforced by the database
+    rather than checked with a query before every save. Returns ``None``
+    for errors that have no user-facing message.
+    """
+    if STATS_UNIQUE_DATE in str(error):
+        if stats is None or not stats.date:
+            return ValidationError(
+                "A stat entry for one of these dates already exists for this flock.",
+            )
+        return ValidationError({"date": [duplicate_date_message(stats.date)]})
+    if STATS_UNIQUE_DAY in str(error):
+        return ValidationError(
+            "Another entry for this flock was saved at the same time. "
+            "Please try again.",
         )
+    return None
 
 
 def _validate_date_bounds(stats, errors):
@@ -188,10 +202,15 @@ def _validate_date_gap(stats, errors):
 # ==================================================
 
 
-def validate_stats_import_row(row, flock):
+def validate_stats_import_row(row, flock, known_dates=None, last_date=None):
+    """
+    ``known_dates`` (a set) and ``last_date`` let a bulk import check
+    duplicates and gaps in memory instead of querying per row.
+    """
     errors = {}
 
-    _validate_import_date(row, flock, errors)
+    _validate_import_date(row, flock, errors, known_dates)
+    _validate_import_date_gap(row, last_date, errors)
     _validate_import_harvested(row, flock, errors)
     _validate_import_percentage(row, errors)
     _validate_import_mortality(row, flock, errors)
@@ -201,7 +220,7 @@ def validate_stats_import_row(row, flock):
         raise ValidationError(errors)
 
 
-def _validate_import_date(row, flock, errors):
+def _validate_import_date(row, flock, errors, known_dates=None):
     import_date = row.get("date")
     if not import_date:
         return
@@ -218,10 +237,26 @@ def _validate_import_date(row, flock, errors):
             f"This entry cannot be added because the flock ({flock}) has been culled.",
         )
 
-    if flock.stats.filter(date=import_date).exists():
+    if known_dates is not None:
+        duplicate = import_date in known_dates
+    else:
+        duplicate = flock.stats.filter(date=import_date).exists()
+
+    if duplicate:
+        errors.setdefault("date", []).append(duplicate_date_message(import_date))
+
+
+def _validate_import_date_gap(row, last_date, errors):
+    import_date = row.get("date")
+    if not import_date or not last_date:
+        return
+
+    gap_days = (import_date - last_date).days
+    if gap_days > 1:
         errors.setdefault("date", []).append(
-            f"A stat entry for {import_date.strftime(DATE_FORMAT)} "
-            f"already exists for this flock.",
+            f"There is a gap of {gap_days - 1} day(s) after the last entry "
+            f"on {last_date.strftime(DATE_FORMAT)}. "
+            "Please fill in missing dates before adding this entry.",
         )
 
 
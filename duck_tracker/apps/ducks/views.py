@@ -1,17 +1,13 @@
 from decimal import Decimal
 
 from django.contrib import messages
+from django.core.exceptions import ValidationError
 from django.core.paginator import Paginator
-from django.db.models import Avg
-from django.db.models import FloatField
-from django.db.models import IntegerField
-from django.db.models import Max
-from django.db.models import Min
-from django.db.models import Sum
-from django.db.models import Value
-from django.db.models.functions import Coalesce
+from django.http import FileResponse
+from django.http import Http404
 from django.http import HttpResponse
 from django.http import JsonResponse
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.shortcuts import redirect
 from django.template.loader import render_to_string
@@ -19,27 +15,52 @@ from django.urls import reverse
 from django.urls import reverse_lazy
 from django.views import View
 from django.views import generic
-from import_export.exceptions import ImportError as ImportExportError
+from import_export.formats import base_formats
 from import_export.forms import ExportForm
-from tablib import Dataset
-from tablib.core import UnsupportedFormat
 
+from .cache import FLOCK_CACHE_TIMEOUT
+from .cache import get_flock_versions
+from .cache import get_stats_version
 from .formsets import EggProductionCostFormSet
 from .formsets import EggTypeFormSet
 from .formsets import ExpenseTypeFormSet
 from .forms import FeedConsumedForm
 from .forms import FlockForm
 from .forms import FlockIncomeForm
+from .forms import FlockIncomeSourceForm
+from .forms import IncomeSweepForm
 from .forms import StatsForm
 from .forms import FlockFilterForm
+from .forms import StatsExportJobForm
 from .forms import StatsFilterForm
+from .metrics import export_bytes
+from .metrics import export_duration
+from .metrics import import_upload_bytes
+from .metrics import metered_export
+from .mixins import ConditionalGetMixin
 from .models import Flock
 from .models import Stats
+from .models import StatsExportJob
+from .models import StatsImportJob
+from .models import StatsRollup
+from .pagination import KeysetPaginator
 from .resources import StatsResource
+from .services import CHART_MAX_DAYS
+from .services import FlockChartData
+from .services import FlockChartSeries
+from .services import FlockCohortComparison
+from .services import FlockIncomeReport
+from .services import FlockStatsSnapshot
+from .services import IncomeSweep
+from .services import parse_chart_days
+from .services import parse_chart_points
+from .tasks import export_stats
+from .tasks import import_stats
 from .utils import get_default_formats
+from .utils import iter_csv_export
 
 
-class FlockListView(generic.ListView):
+class FlockListView(ConditionalGetMixin, generic.ListView):
     model = Flock
     template_name = "ducks/flock_list.html"
     context_object_name = "flocks"
@@ -78,74 +99,77 @@ class FlockListView(generic.ListView):
         return queryset
 
     def get_queryset(self):
-        queryset = super().get_queryset().prefetch_related("stats")
-        return self.apply_filters(queryset)
+        # Built once: get_last_modified evaluates it, the page reuses the rows.
+        if not hasattr(self, "_flocks"):
+            queryset = super().get_queryset().select_related("summary")
+            self._flocks = self.apply_filters(queryset)
+        return self._flocks
+
+    def get_last_modified(self):
+        flocks = list(self.get_queryset())
+        stamps = [flock.updated_at for flock in flocks] + [
+            flock.flock_summary.updated_at
+            for flock in flocks
+            if flock.flock_summary.updated_at
+        ]
+        return max(stamps, default=None)
+
+    def get_etag_parts(self):
+        # A deleted flock changes the list without moving the newest stamp.
+        return [flock.pk for flock in self.get_queryset()]
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        days = int(self.request.GET.get("days", 30))
-        context["days"] = days
-        max_day = self.get_queryset().aggregate(max_day=Max("stats__day"))["max_day"] or 0
-        context["max_days"] = max_day
+        flocks = list(context["flocks"])
+        versions = get_flock_versions([flock.pk for flock in flocks])
+        for flock in flocks:
+            flock.cache_version = versions[flock.pk]
 
-        chart_data = []
-
-        for flock in context["flocks"]:
-            stats = flock.stats.filter(day__lte=days).order_by("day")
-
-            chart_data.append(
-                {
-                    "label": flock.title,
-                    "data": [s.percentage for s in stats],
-                },
-            )
-
-        context["chart_data"] = chart_data
-        context["chart_days"] = list(range(1, days + 1))
+        series = FlockChartSeries.for_flocks(
+            flocks,
+            parse_chart_days(self.request.GET.get("days")),
+            versions=versions,
+        )
+        context["days"] = series.days
+        context["chart_bucket_size"] = series.bucket_size
+        # last_day is the highest day handed out, i.e. MAX(stats.day).
+        max_day = max((flock.last_day for flock in flocks), default=0)
+        context["max_days"] = min(max_day, CHART_MAX_DAYS)
+        context["card_cache_timeout"] = FLOCK_CACHE_TIMEOUT
+        context["chart_data"] = series.datasets
+        context["chart_days"] = series.labels
         context["form"] = self.form
 
         return context
 
 
-class FlockDetailView(generic.DetailView):
+class FlockDetailView(ConditionalGetMixin, generic.DetailView):
     model = Flock
+    queryset = Flock.objects.select_related("summary")
     template_name = "ducks/flock_detail.html"
     context_object_name = "flock"
     resource_class = StatsResource
     form_class = StatsFilterForm
+    stats_per_page = 10
 
     def apply_filters(self, queryset):
-        # Get date bounds from FULL queryset
-        date_bounds = queryset.aggregate(
-            min_date=Min("date"),
-            max_date=Max("date"),
-        )
-
+        # Date bounds for the widgets are filled in later from the snapshot.
         if self.request.GET:
-            self.form = self.form_class(
-                self.request.GET,
-                min_date=date_bounds["min_date"],
-                max_date=date_bounds["max_date"],
-            )
+            self.form = self.form_class(self.request.GET)
         else:
-            self.form = self.form_class(
-                min_date=date_bounds["min_date"],
-                max_date=date_bounds["max_date"],
-            )
+            self.form = self.form_class()
 
+        self.start_date = self.end_date = None
+        self.sort_descending = False
         if not self.form.is_valid():
             return queryset
 
-        data = self.form.cleaned_data
-
-        start_date = data.get("start_date")
-        end_date = data.get("end_date")
+        start_date, end_date = self.form.get_date_range()
         # max_day = data.get("day")
-        sort = data.get("sort")
+        sort = self.form.cleaned_data.get("sort")
 
-        if start_date and end_date and end_date < start_date:
-            end_date = None
+        self.start_date, self.end_date = start_date, end_date
 
         if start_date:
             queryset = queryset.filter(date__gte=start_date)
@@ -167,90 +191,109 @@ class FlockDetailView(generic.DetailView):
             queryset = queryset.order_by(sort_fields[sort])
         else:
             queryset = queryset.order_by("date", "id")
+        self.sort_descending = sort == "date_desc"
 
         return queryset
 
+    def paginate_stats(self, stats_qs):
+        # Rows carry their harvest deltas so the table renders in one query.
+        rows_qs = stats_qs.with_deltas()
+
+        page_number = self.request.GET.get("page")
+        if page_number and "cursor" not in self.request.GET:
+            # Offset mode, kept for existing ?page=N links.
+            return Paginator(rows_qs, self.stats_per_page).get_page(page_number)
+
+        # Cursor mode: no COUNT(*) and no OFFSET, constant cost at any depth.
+        paginator = KeysetPaginator(
+            rows_qs,
+            self.stats_per_page,
+            keys=("date", "id"),
+            descending=self.sort_descending,
+        )
+        return paginator.get_page(self.request.GET.get("cursor"))
+
+    def is_xhr(self):
+        return self.request.headers.get("x-requested-with") == "XMLHttpRequest"
+
+    def get_object(self, queryset=None):
+        # Fetched once for both the conditional check and the page.
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, "_flock"):
+            self._flock = super().get_object()
+        return self._flock
+
+    def get_last_modified(self):
+        flock = self.get_object()
+        return max(
+            stamp
+            for stamp in (flock.updated_at, flock.flock_summary.updated_at)
+            if stamp
+        )
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         flock = context["flock"]
 
         base_qs = flock.stats.all().order_by("day", "id")
         stats_qs = self.apply_filters(base_qs)
-        all_mortality_zero = not stats_qs.exclude(mortality=0).exists()
-        all_feed_zero = not stats_qs.exclude(feed_consumed=0).exists()
-
-        # --- Aggregates (FULL filtered queryset, not paginated) ---
-        aggregates = stats_qs.aggregate(
-            total_harvested=Coalesce(
-                Sum("harvested"),
-                Value(0),
-                output_field=IntegerField(),
-            ),
-            avg_harvested=Coalesce(
-                Avg("harvested"),
-                Value(0.0),
-                output_field=FloatField(),
-            ),
-            average_percentage=Coalesce(
-                Avg("percentage"),
-                Value(0.0),
-                output_field=FloatField(),
-            ),
-            total_feed_consumed=Coalesce(
-                Sum("feed_consumed"),
-                Value(0),
-                output_field=IntegerField(),
-            ),
-            avg_daily_feed_consumed=Coalesce(
-                Avg("feed_consumed"),
-                Value(0.0),
-                output_field=FloatField(),
-            ),
-            total_mortality=Coalesce(
-                Sum("mortality"),
-                Value(0),
-                output_field=IntegerField(),
-            ),
-        )
-
-        # --- Pagination ---
-        paginator = Paginator(stats_qs, 10)
-        page_number = self.request.GET.get("page", 1)
-        page_obj = paginator.get_page(page_number)
+        granularity = self.form.get_granularity()
+
+        if granularity and not self.is_xhr():
+            # Weekly/monthly view: tens of rollup rows, no pagination needed.
+            rollups = StatsRollup.objects.in_range(
+                flock,
+                granularity,
+                self.start_date,
+                self.end_date,
+            )
+            if self.sort_descending:
+                rollups = rollups.reverse()
+            context.update(
+                {
+                    "granularity": granularity,
+                    "rollups": list(rollups),
+                    "stats": [],
+                    "next_cursor": None,
+                },
+            )
+        else:
+            # --- Pagination ---
+            page_obj = self.paginate_stats(stats_qs)
+            context.update(
+                {
+                    "context_stats": page_obj,  # optional
+                    "stats": page_obj.object_list,  # ✅ FIX
+                    "next_cursor": getattr(page_obj, "next_cursor", None),
+                },
+            )
 
-        date_bounds = base_qs.aggregate(
-            min_date=Min("date"),
-            max_date=Max("date"),
-        )
+        # Infinite-scroll requests only render rows.
+        if self.is_xhr():
+            return context
 
-        # Serialize for chart
-        chart_data = list(
-            stats_qs.values(
-                "day",
-                "date",
-                "harvested",
-                "percentage",
-                "mortality",
-                "feed_consumed",
-            ),
+        # Bounds, aggregates and zero-column flags in one query.
+        snapshot = FlockStatsSnapshot.for_flock(
+            flock,
+            start_date=self.start_date,
+            end_date=self.end_date,
         )
+        self.form.set_date_bounds(snapshot.min_date, snapshot.max_date)
 
         context.update(
             {
-                "all_mortality_zero": all_mortality_zero,
-                "all_feed_zero": all_feed_zero,
+                "snapshot": snapshot,
+                "all_mortality_zero": snapshot.all_mortality_zero,
+                "all_feed_zero": snapshot.all_feed_zero,
                 "flock": flock,
-                "flock_stats_json": chart_data,  # for JS
-                "context_stats": page_obj,  # optional
-                "stats": page_obj.object_list,  # ✅ FIX
-                "flock_stats": stats_qs,  # ✅ full queryset for charts
-                "aggregates": aggregates,
+                "aggregates": snapshot.aggregates,
                 "has_date_filter": bool(
                     self.request.GET.get("start_date")
                     or self.request.GET.get("end_date"),
                 ),
-                "min_date": date_bounds["min_date"],
-                "max_date": date_bounds["max_date"],
+                "min_date": snapshot.min_date,
+                "max_date": snapshot.max_date,
                 "form": self.form,
                 "export_form": self.get_export_form(),
             },
@@ -265,7 +308,7 @@ class FlockDetailView(generic.DetailView):
         )
 
     def render_to_response(self, context, **response_kwargs):
-        if self.request.headers.get("x-requested-with") == "XMLHttpRequest":
+        if self.is_xhr():
             page_obj = context["context_stats"]  # use the Page object
 
             html = render_to_string(
@@ -281,12 +324,69 @@ class FlockDetailView(generic.DetailView):
                 {
                     "html": html,
                     "has_next": page_obj.has_next(),
+                    "next_cursor": context["next_cursor"],
                 },
             )
 
         return super().render_to_response(context, **response_kwargs)
 
 
+class FlockChartDataView(ConditionalGetMixin, generic.DetailView):
+    """Downsampled chart series of one flock, fetched lazily by the detail page."""
+
+    model = Flock
+    queryset = Flock.objects.select_related("summary")
+    form_class = StatsFilterForm
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, "_flock"):
+            self._flock = super().get_object()
+        return self._flock
+
+    def get_last_modified(self):
+        flock = self.get_object()
+        return max(
+            stamp
+            for stamp in (flock.updated_at, flock.flock_summary.updated_at)
+            if stamp
+        )
+
+    def get_context_data(self, **kwargs):
+        flock = self.object
+        form = self.form_class(self.request.GET)
+        start_date, end_date = form.get_date_range()
+        chart = FlockChartData.for_flock(
+            flock,
+            start_date=start_date,
+            end_date=end_date,
+            points=parse_chart_points(self.request.GET.get("points")),
+            granularity=form.get_granularity(),
+            version=get_flock_versions([flock.pk])[flock.pk],
+        )
+        return {"chart": chart}
+
+    def render_to_response(self, context, **response_kwargs):
+        return JsonResponse(context["chart"].as_json())
+
+
+class FlockCohortView(generic.DetailView):
+    """The flock against every other flock by day of lay, fetched by the detail page."""
+
+    model = Flock
+
+    def get_context_data(self, **kwargs):
+        comparison = FlockCohortComparison.for_flock(
+            self.object,
+            version=get_stats_version(),
+        )
+        return {"comparison": comparison}
+
+    def render_to_response(self, context, **response_kwargs):
+        return JsonResponse(context["comparison"].as_json())
+
+
 class FlockCreateUpdateView(generic.UpdateView):
     model = Flock
     form_class = FlockForm
@@ -349,9 +449,8 @@ class StatsCreateUpdateView(generic.UpdateView):
         # Determine flock for create (GET/POST param) or update (instance)
         flock = None
         if getattr(self, "creating", False):
-            flock_id = self.request.GET.get("flock") or self.request.POST.get("flock")
-            if flock_id:
-                flock = get_object_or_404(Flock, pk=flock_id)
+            if self.get_flock_id():
+                flock = self.get_flock()
         else:
             flock = getattr(self.object, "flock", None)
 
@@ -366,11 +465,26 @@ class StatsCreateUpdateView(generic.UpdateView):
             return None  # Create new instance
         return super().get_object(queryset)  # Update existing instance
 
+    def get_queryset(self):
+        return super().get_queryset().select_related("flock")
+
+    def get_flock_id(self):
+        return self.request.GET.get("flock") or self.request.POST.get("flock")
+
+    def get_flock(self):
+        """The ``?flock=`` flock, looked up once per request."""
+        if not hasattr(self, "_flock"):
+            flock_id = self.get_flock_id()
+            if self.object and str(self.object.flock_id) == flock_id:
+                self._flock = self.object.flock
+            else:
+                self._flock = get_object_or_404(Flock, pk=flock_id)
+        return self._flock
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         # allow flock to be provided via GET params (?flock=1)
-        flock_id = self.request.GET.get("flock")
-        flock = get_object_or_404(Flock, pk=flock_id)
+        flock = self.get_flock()
         context["flock"] = flock
         if self.object:
             context["page_title"] = (
@@ -398,18 +512,22 @@ class StatsCreateUpdateView(generic.UpdateView):
         # For create, accept flock via kwargs or GET param;
         # for update, object already has flock
         if getattr(self, "creating", False):
-            flock_id = self.request.GET.get("flock") or self.request.POST.get("flock")
-            if not flock_id:
+            if not self.get_flock_id():
                 form.add_error(
                     None,
                     "No flock specified. Please provide a `flock` parameter.",
                 )
                 return self.form_invalid(form)
-            flock = get_object_or_404(Flock, pk=flock_id)
+            flock = self.get_flock()
             self.object = form.save(commit=False)
             # also prefer the form-provided flock if present
             self.object.flock = getattr(form, "flock", flock)
-            self.object.save()
+            try:
+                self.object.save()
+            except ValidationError as e:
+                # Duplicate dates are caught by the database constraint.
+                form.add_error(None, e)
+                return self.form_invalid(form)
             messages.success(self.request, "Stats entry created successfully.")
             return redirect(self.get_success_url())
 
@@ -425,6 +543,10 @@ class StatsImportTemplateView(generic.TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["flock"] = get_object_or_404(Flock, pk=self.kwargs["pk"])
+        job_pk = self.request.GET.get("job")
+        if job_pk and job_pk.isdigit():
+            import_jobs = context["flock"].import_jobs
+            context["import_job"] = import_jobs.filter(pk=job_pk).first()
         return context
 
 
@@ -482,17 +604,24 @@ class FlockStatsExportView(View):
         file_format = self.get_file_format(export_form)
         ext = file_format.get_extension()
 
-        # Export stats only
-        stats_dataset = StatsResource().export(stats_qs)
-        export_data = file_format.export_data(stats_dataset)
+        filename = f"flock_{flock.title}_stats.{ext}"
+        resource = self.resource_class()
 
-        response = HttpResponse(
-            export_data,
-            content_type=file_format.get_content_type(),
-        )
-        response["Content-Disposition"] = (
-            f'attachment; filename="flock_{flock.title}_stats.{ext}"'
-        )
+        # CSV is streamed row by row; other formats go through tablib.
+        if isinstance(file_format, base_formats.CSV):
+            response = StreamingHttpResponse(
+                metered_export(iter_csv_export(resource, stats_qs)),
+                content_type=file_format.get_content_type(),
+            )
+        else:
+            with export_duration.time(kind="download"):
+                export_data = file_format.export_data(resource.export(stats_qs))
+            export_bytes.inc(len(export_data), kind="download")
+            response = HttpResponse(
+                export_data,
+                content_type=file_format.get_content_type(),
+            )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
         return response
 
     @staticmethod
@@ -501,8 +630,70 @@ class FlockStatsExportView(View):
         return get_default_formats()[format_index]()
 
 
+class StatsExportJobCreateView(View):
+    """Queue ``export_stats`` for one or more flocks, then show its progress."""
+
+    def post(self, request):
+        form = StatsExportJobForm(request.POST)
+        if not form.is_valid():
+            messages.error(request, "Invalid export options.")
+            return redirect("ducks:flock-list")
+
+        job = form.save(commit=False)
+        job.created_by = request.user if request.user.is_authenticated else None
+        job.save()
+        form.save_m2m()
+        # Queued once the job row is committed, so the worker can see it.
+        export_stats.delay_on_commit(job.pk)
+        return redirect("ducks:stats-export-job", pk=job.pk)
+
+
+class StatsExportJobView(generic.DetailView):
+    """Progress of a background export; JSON for the polling script."""
+
+    model = StatsExportJob
+    template_name = "ducks/stats_export_job.html"
+    context_object_name = "export_job"
+
+    def get_queryset(self):
+        return super().get_queryset().prefetch_related("flocks")
+
+    def render_to_response(self, context, **response_kwargs):
+        if self.request.headers.get("accept") != "application/json":
+            return super().render_to_response(context, **response_kwargs)
+
+        job = context["object"]
+        data = job.as_progress()
+        if job.status == StatsExportJob.Status.SUCCEEDED:
+            data["download_url"] = reverse(
+                "ducks:stats-export-download",
+                kwargs={"pk": job.pk},
+            )
+        return JsonResponse(data)
+
+
+class StatsExportJobDownloadView(generic.DetailView):
+    """Stream the CSV written by a finished export job."""
+
+    model = StatsExportJob
+
+    def get_queryset(self):
+        return super().get_queryset().filter(status=StatsExportJob.Status.SUCCEEDED)
+
+    def render_to_response(self, context, **response_kwargs):
+        job = context["object"]
+        if not job.file:
+            raise Http404
+        return FileResponse(
+            job.file.open("rb"),
+            as_attachment=True,
+            filename=f"stats_export_{job.pk}.csv",
+            content_type="text/csv",
+        )
+
+
 class FlockStatsImportView(View):
-    resource_class = StatsResource
+    """Store the upload as a ``StatsImportJob`` and queue ``import_stats``."""
 
     def post(self, request, pk):
         flock = get_object_or_404(Flock, pk=pk)
@@ -518,50 +709,38 @@ class FlockStatsImportView(View):
             messages.error(request, "Only CSV files are allowed.")
             return redirect("ducks:flock-detail", pk=flock.pk)
 
-        dataset = Dataset()
+        job = StatsImportJob.objects.create(
+            flock=flock,
+            file=file,
+            created_by=request.user if request.user.is_authenticated else None,
+        )
+        import_upload_bytes.inc(file.size)
+        # Queued once the job row is committed, so the worker can see it.
+        import_stats.delay_on_commit(job.pk)
 
-        try:
-            raw = file.read().decode("utf-8-sig")
-            dataset.load(raw, format="csv")
-        except (UnicodeDecodeError, UnsupportedFormat) as e:
-            messages.error(request, f"Could not read CSV file: {e}")
-            return redirect("ducks:stats-import-template", pk=flock.pk)
+        url = reverse("ducks:stats-import-template", kwargs={"pk": flock.pk})
+        return redirect(f"{url}?job={job.pk}")
 
-        resource = self.resource_class()
-        resource.flock = flock  # REQUIRED
 
-        result = resource.import_data(
-            dataset,
-            dry_run=True,
-            raise_errors=False,
-        )
+class StatsImportJobView(generic.DetailView):
+    """Progress of a background import, polled by the import page."""
 
-        if result.has_errors():
-            errors = [
-                f"Row {row}: {err.error}"
-                for row, row_errors in result.row_errors()
-                for err in row_errors
-            ]
-            messages.error(
-                request,
-                "Import failed:\n" + "\n".join(errors[:5]),
-            )
-            return redirect("ducks:stats-import-template", pk=flock.pk)
+    model = StatsImportJob
+    pk_url_kwarg = "job_pk"
 
-        try:
-            resource.import_data(
-                dataset,
-                dry_run=False,
-                raise_errors=True,
-            )
-        except ImportExportError as e:
-            # Run each row error through messages
-            messages.error(request, f"Import failed: {e.args[0]}")
+    def get_queryset(self):
+        return super().get_queryset().filter(flock_id=self.kwargs["pk"])
 
-            return redirect("ducks:stats-import-template", pk=flock.pk)
+    def render_to_response(self, context, **response_kwargs):
+        job = context["object"]
+        data = job.as_progress()
+        if job.status == StatsImportJob.Status.SUCCEEDED:
+            data["redirect_url"] = reverse(
+                "ducks:flock-detail",
+                kwargs={"pk": job.flock_id},
+            )
+        return JsonResponse(data)
 
-        messages.success(request, "Stats imported successfully.")
-        return redirect("ducks:flock-detail", pk=flock.pk)
 
 class FlockIncomeCalculatorView(generic.FormView):
     template_name = "ducks/flock_income_calculator.html"
@@ -592,9 +771,69 @@ class FlockIncomeCalculatorView(generic.FormView):
                 prefix="production-cost",
             )
             context["feed_form"] = FeedConsumedForm(prefix="feed")
+        context["sweep_form"] = IncomeSweepForm(
+            self.request.POST or None,
+            prefix="sweep",
+        )
+        context["source_form"] = FlockIncomeSourceForm(
+            self.request.POST or None,
+            prefix="source",
+        )
 
         return context
 
+    def post(self, request, *args, **kwargs):
+        if request.POST.get("mode") == "flock":
+            return self.from_flock()
+        return super().post(request, *args, **kwargs)
+
+    def from_flock(self):
+        """Realized income of a recorded flock ("from flock" mode).
+
+        Harvest, laying % and feed come from the flock's stats instead of the
+        manual flock size, production % and grams per duck; the egg types,
+        feed price and daily expenses are the calculator's own inputs.
+        """
+        context = self.get_context_data()
+        source_form = context["source_form"]
+        egg_type_formset = context["eggType_formset"]
+        expense_formset = context["expense_formset"]
+        feed_form = context["feed_form"]
+        # The recorded sacks replace the grams per duck.
+        feed_form.fields["quantity_g"].required = False
+        forms_valid = [
+            source_form.is_valid(),
+            egg_type_formset.is_valid(),
+            expense_formset.is_valid(),
+            feed_form.is_valid(),
+        ]
+        if not all(forms_valid):
+            return self.render_to_response(context)
+
+        egg_types = [
+            (
+                egg_form.cleaned_data["name"],
+                egg_form.cleaned_data["percent"],
+                egg_form.cleaned_data["price"],
+            )
+            for egg_form in egg_type_formset
+            if egg_form.cleaned_data and not egg_form.cleaned_data.get("DELETE")
+        ]
+        expenses = sum(
+            expense_form.cleaned_data["cost"]
+            for expense_form in expense_formset
+            if expense_form.cleaned_data and not expense_form.cleaned_data.get("DELETE")
+        )
+        context["flock_report"] = FlockIncomeReport.for_flock(
+            source_form.cleaned_data["flock"],
+            egg_types=egg_types,
+            feed_price=feed_form.cleaned_data["price_per_sack"],
+            expenses=expenses,
+            start_date=source_form.cleaned_data["start_date"],
+            end_date=source_form.cleaned_data["end_date"],
+        )
+        return self.render_to_response(context)
+
     def form_valid(self, form):
         context = self.get_context_data()
         eggType_formset = context["eggType_formset"]
@@ -710,4 +949,46 @@ class FlockIncomeCalculatorView(generic.FormView):
             "egg_production_cost": egg_production_cost_breakdown
         }
 
+        if self.request.POST.get("mode") in ("sweep", "sweep-csv"):
+            return self.sweep(form, context)
+        return self.render_to_response(context)
+
+    def sweep(self, form, context):
+        """Evaluate every combination of the sweep form's values (what-if mode).
+
+        Blank sweep fields keep the calculator's single value; the first egg
+        type's price is the one swept.
+        """
+        sweep_form = context["sweep_form"]
+        if not sweep_form.is_valid():
+            return self.render_to_response(context)
+
+        egg_types = [
+            (
+                egg_form.cleaned_data["name"],
+                egg_form.cleaned_data["percent"],
+                egg_form.cleaned_data["price"],
+            )
+            for egg_form in context["eggType_formset"]
+            if egg_form.cleaned_data and not egg_form.cleaned_data.get("DELETE")
+        ]
+        feed = context["feed_form"].cleaned_data
+        values = sweep_form.cleaned_data
+        sweep = IncomeSweep.evaluate(
+            flock_sizes=values["flock_sizes"] or [form.cleaned_data["flock_size"]],
+            production_percents=values["production_percents"]
+            or [form.cleaned_data["production_percent"]],
+            egg_prices=values["egg_prices"] or [egg_types[0][2] if egg_types else 0],
+            feed_prices=values["feed_prices"] or [feed["price_per_sack"]],
+            egg_types=egg_types,
+            feed_quantity_g=feed["quantity_g"],
+            expenses_total=context["result"]["expenses_total"],
+        )
+
+        if self.request.POST["mode"] == "sweep-csv":
+            response = StreamingHttpResponse(sweep.iter_csv(), content_type="text/csv")
+            response["Content-Disposition"] = 'attachment; filename="income_sweep.csv"'
+            return response
+
+        context["sweep"] = sweep
         return self.render_to_response(context)
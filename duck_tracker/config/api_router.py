@@ -2,11 +2,15 @@ from django.conf import settings
 from rest_framework.routers import DefaultRouter
 from rest_framework.routers import SimpleRouter
 
+from apps.ducks.api.views import FlockViewSet
+from apps.ducks.api.views import StatsViewSet
 from duck_tracker.users.api.views import UserViewSet
 
 router = DefaultRouter() if settings.DEBUG else SimpleRouter()
 
 router.register("users", UserViewSet)
+router.register("flocks", FlockViewSet)
+router.register("stats", StatsViewSet)
 
 
 app_name = "api"
@@ -0,0 +1,413 @@
+"""
+In-process metrics in the Prometheus text format, served at ``/metrics``.
+
+Counters and histograms are kept in memory by each process. When
+``METRICS_DIR`` is set (production: one empty directory shared by the
+gunicorn and Celery workers of a host, cleared on deploy), every process
+also writes its values to its own file there, at most every
+``METRICS_FLUSH_INTERVAL`` seconds and after each Celery task; ``/metrics``
+sums the files of all processes. Without it only the serving process's
+values are exposed, which is enough for ``runserver`` and the tests.
+
+So that counters never go backwards, an exiting worker adds its values to
+``archive.json`` and removes its own file; files of workers that died
+without exiting cleanly are archived by the next process to start.
+"""
+
+import atexit
+import bisect
+import fcntl
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+from celery.signals import task_postrun
+from celery.signals import task_prerun
+from celery.signals import worker_process_shutdown
+from django.conf import settings
+from django.http import Http404
+from django.http import HttpResponse
+from django.http import HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+ARCHIVE_FILE_NAME = "archive.json"
+LOCK_FILE_NAME = ".lock"
+
+
+class Registry:
+    """Metric definitions and this process's samples.
+
+    A counter sample is a float; a histogram sample is a list of its bucket
+    counts (not cumulative), followed by the sum and the count.
+    """
+
+    def __init__(self, directory=None, flush_interval=None):
+        self._directory = directory
+        self._flush_interval = flush_interval
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self._archived_dead = False
+        self._reset()
+
+    def _reset(self):
+        # After a fork the parent's samples are the parent's to report.
+        self._pid = os.getpid()
+        self._samples = {}
+        self._retired = False
+        self._file_name = f"{self._pid}-{uuid.uuid4().hex[:8]}.json"
+        self._flushed_at = time.monotonic()
+
+    @property
+    def directory(self):
+        directory = self._directory or getattr(settings, "METRICS_DIR", None)
+        return Path(directory) if directory else None
+
+    @property
+    def flush_interval(self):
+        if self._flush_interval is not None:
+            return self._flush_interval
+        return getattr(settings, "METRICS_FLUSH_INTERVAL", 5.0)
+
+    def register(self, metric):
+        if metric.name in self._metrics:
+            msg = f"Metric {metric.name!r} is already registered."
+            raise ValueError(msg)
+        self._metrics[metric.name] = metric
+
+    def update(self, name, labels, update):
+        """Replace one sample by ``update(sample)``; flush when it is time."""
+        with self._lock:
+            if os.getpid() != self._pid:
+                self._reset()
+            key = (name, labels)
+            self._samples[key] = update(self._samples.get(key))
+            flush = (
+                self.directory is not None
+                and time.monotonic() - self._flushed_at >= self.flush_interval
+            )
+        if flush:
+            self.flush()
+
+    def flush(self):
+        """Write this process's samples to its file in ``directory``."""
+        directory = self.directory
+        if directory is None:
+            return
+        with self._lock:
+            if os.getpid() != self._pid:
+                self._reset()
+            if self._retired:
+                return
+            samples = dict(self._samples)
+            path = directory / self._file_name
+            self._flushed_at = time.monotonic()
+        directory.mkdir(parents=True, exist_ok=True)
+        _write_samples(path, samples)
+        if not self._archived_dead:
+            self._archived_dead = True
+            with _locked(directory, exclusive=True):
+                _archive(directory, _files_of_dead_processes(directory))
+
+    def retire(self):
+        """Move this process's samples to the archive file, on exit."""
+        directory = self.directory
+        if directory is None or os.getpid() != self._pid:
+            return
+        self.flush()
+        with self._lock:
+            self._retired = True
+        with _locked(directory, exclusive=True):
+            _archive(directory, [directory / self._file_name])
+
+    def collect(self):
+        """Samples of every process, summed: ``{(name, labels): value}``."""
+        directory = self.directory
+        if directory is None:
+            with self._lock:
+                return {key: _copy(value) for key, value in self._samples.items()}
+
+        self.flush()
+        totals = {}
+        # Shared: files are never counted both alone and in the archive.
+        with _locked(directory, exclusive=False):
+            for path in directory.glob("*.json"):
+                for key, value in _read_samples(path).items():
+                    totals[key] = _add(totals.get(key), value)
+        return totals
+
+    def render(self):
+        """Every registered metric in the text exposition format."""
+        samples = {}
+        for (name, labels), value in self.collect().items():
+            samples.setdefault(name, []).append((labels, value))
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            lines.append(f"# HELP {name} {_escape_help(metric.documentation)}")
+            lines.append(f"# TYPE {name} {metric.type}")
+            for labels, value in sorted(samples.get(name, [])):
+                lines.extend(metric.render_sample(labels, value))
+        return "\n".join(lines) + "\n"
+
+
+def _read_samples(path):
+    try:
+        samples = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}  # being replaced, or removed by a deploy
+    return {
+        (name, tuple(tuple(pair) for pair in labels)): value
+        for name, labels, value in samples
+    }
+
+
+def _write_samples(path, samples):
+    temporary = path.with_suffix(".tmp")
+    temporary.write_text(
+        json.dumps(
+            [
+                [name, [list(pair) for pair in labels], value]
+                for (name, labels), value in samples.items()
+            ],
+        ),
+    )
+    temporary.replace(path)
+
+
+@contextmanager
+def _locked(directory, *, exclusive):
+    """Hold the directory's lock; archiving takes it exclusively."""
+    with (directory / LOCK_FILE_NAME).open("a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        yield  # closing the file releases the lock
+
+
+def _archive(directory, paths):
+    """Add the samples of ``paths`` to the archive file and remove them."""
+    paths = [path for path in paths if path.exists()]
+    if not paths:
+        return
+    archive = directory / ARCHIVE_FILE_NAME
+    totals = _read_samples(archive)
+    for path in paths:
+        for key, value in _read_samples(path).items():
+            totals[key] = _add(totals.get(key), value)
+    _write_samples(archive, totals)
+    for path in paths:
+        path.unlink(missing_ok=True)
+
+
+def _files_of_dead_processes(directory):
+    """Files whose process no longer runs (``<pid>-<id>.json``, same host)."""
+    for path in directory.glob("*-*.json"):
+        pid, _, _ = path.name.partition("-")
+        if not pid.isdigit():
+            continue
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            yield path
+        except (PermissionError, OverflowError):
+            continue  # another user's process, or not a pid
+
+
+def _copy(value):
+    return list(value) if isinstance(value, list) else value
+
+
+def _add(total, value):
+    if total is None:
+        return _copy(value)
+    if isinstance(total, list):
+        return [a + b for a, b in zip(total, value, strict=True)]
+    return total + value
+
+
+def _escape_help(text):
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(
+            key,
+            str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'),
+        )
+        for key, value in labels
+    )
+    return f"{{{pairs}}}"
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Metric:
+    type = ""
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.registry = registry or REGISTRY
+        self.registry.register(self)
+
+    def label_key(self, labels):
+        if set(labels) != set(self.labelnames):
+            msg = f"{self.name} takes the labels {self.labelnames}, got {tuple(labels)}"
+            raise ValueError(msg)
+        return tuple((name, str(labels[name])) for name in self.labelnames)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        if amount < 0:
+            msg = "Counters only go up."
+            raise ValueError(msg)
+        self.registry.update(
+            self.name,
+            self.label_key(labels),
+            lambda value: (value or 0) + amount,
+        )
+
+    def render_sample(self, labels, value):
+        yield f"{self.name}{_format_labels(labels)} {_format_value(value)}"
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, *args, buckets=DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = (*sorted(buckets), math.inf)
+
+    def observe(self, value, **labels):
+        index = bisect.bisect_left(self.buckets, value)
+
+        def update(sample):
+            sample = sample or [0] * (len(self.buckets) + 2)
+            sample[index] += 1
+            sample[-2] += value
+            sample[-1] += 1
+            return sample
+
+        self.registry.update(self.name, self.label_key(labels), update)
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render_sample(self, labels, value):
+        cumulative = 0
+        for bound, count in zip(self.buckets, value, strict=False):
+            cumulative += count
+            bucket_labels = (*labels, ("le", _format_value(bound)))
+            yield f"{self.name}_bucket{_format_labels(bucket_labels)} {cumulative}"
+        yield f"{self.name}_sum{_format_labels(labels)} {_format_value(value[-2])}"
+        yield f"{self.name}_count{_format_labels(labels)} {value[-1]}"
+
+
+REGISTRY = Registry()
+atexit.register(REGISTRY.retire)
+
+http_requests = Counter(
+    "http_requests_total",
+    "Requests served, by URL name, method and status.",
+    ["route", "method", "status"],
+)
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Time to the response (streamed bodies excluded), by URL name and method.",
+    ["route", "method"],
+)
+celery_task_duration = Histogram(
+    "celery_task_duration_seconds",
+    "Runtime of Celery tasks, by task name and final state.",
+    ["task", "state"],
+    buckets=(0.1, 0.5, 1, 5, 10, 30, 60, 120, 300, 600, 1800),
+)
+
+
+class MetricsMiddleware:
+    """Count and time every request by URL name (``unmatched`` for 404s)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+        match = request.resolver_match
+        route = match.view_name if match else "unmatched"
+        http_request_duration.observe(
+            time.perf_counter() - started,
+            route=route,
+            method=request.method,
+        )
+        http_requests.inc(
+            route=route,
+            method=request.method,
+            status=response.status_code,
+        )
+        return response
+
+
+def metrics_view(request):
+    """``/metrics``; needs ``Authorization: Bearer <METRICS_TOKEN>``.
+
+    Without a token configured it is only served with ``DEBUG`` on.
+    """
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if not token:
+        if not settings.DEBUG:
+            raise Http404
+    elif not constant_time_compare(
+        request.headers.get("authorization", ""),
+        f"Bearer {token}",
+    ):
+        return HttpResponseForbidden()
+    return HttpResponse(REGISTRY.render(), content_type=CONTENT_TYPE)
+
+
+_task_started = {}
+
+
+@task_prerun.connect
+def start_task_timer(task_id=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+
+
+@worker_process_shutdown.connect
+def retire_worker_process(**kwargs):
+    # Celery's pool processes leave with os._exit(), skipping atexit.
+    REGISTRY.retire()
+
+
+@task_postrun.connect
+def observe_task(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is None:
+        return
+    celery_task_duration.observe(
+        time.perf_counter() - started,
+        task=task.name,
+        state=state or "UNKNOWN",
+    )
+    # Workers may be recycled between tasks: report right away.
+    REGISTRY.flush()
@@ -144,6 +144,8 @@ AUTH_PASSWORD_VALIDATORS = [
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#middleware
 MIDDLEWARE = [
+    "config.timing.ServerTimingMiddleware",
+    "config.metrics.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
@@ -184,7 +186,8 @@ MEDIA_URL = "/media/"
 TEMPLATES = [
     {
         # https://docs.djangoproject.com/en/dev/ref/settings/#std:setting-TEMPLATES-BACKEND
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # DjangoTemplates that reports render time to ServerTimingMiddleware
+        "BACKEND": "config.timing.TimedDjangoTemplates",
         # https://docs.djangoproject.com/en/dev/ref/settings/#dirs
         "DIRS": [str(APPS_DIR / "templates")],
         # https://docs.djangoproject.com/en/dev/ref/settings/#app-dirs
@@ -359,6 +362,8 @@ SPECTACULAR_SETTINGS = {
 }
 # Your stuff...
 # ------------------------------------------------------------------------------
+# Pushes stats changes to the flock pages' websocket subscribers.
+DUCKS_BROADCAST_BACKEND = "apps.ducks.broadcast.RedisBroadcast"
 DATE_FORMAT = "%b %d, %Y"  # e.g., 'Jun 25, 2024'
 DATE_INPUT_FORMATS = [
     "%Y-%m-%d",
@@ -379,4 +384,21 @@ CKEDITOR_CONFIGS = {
         "height": 200,
         "width": "100%",
     }
-}
\ No newline at end of file
+}
+
+# Request timings (config.timing.ServerTimingMiddleware)
+# ------------------------------------------------------------------------------
+# The header shows query counts and timings to every client: off unless asked for.
+SERVER_TIMING_HEADER = env.bool("DJANGO_SERVER_TIMING_HEADER", default=False)
+# Seconds; slower requests are logged with every query they ran.
+SLOW_REQUEST_THRESHOLD = env.float("DJANGO_SLOW_REQUEST_THRESHOLD", default=1.0)
+
+# Metrics (config.metrics), served at /metrics
+# ------------------------------------------------------------------------------
+# A directory shared by all worker processes of a host (cleared on deploy);
+# unset, /metrics only reports the process that serves it.
+METRICS_DIR = env("DJANGO_METRICS_DIR", default=None)
+METRICS_FLUSH_INTERVAL = env.float("DJANGO_METRICS_FLUSH_INTERVAL", default=5.0)
+# Scrapers must send "Authorization: Bearer <token>". Without a token /metrics
+# is only served when DEBUG is on.
+METRICS_TOKEN = env("DJANGO_METRICS_TOKEN", default="")
@@ -70,3 +70,4 @@ CELERY_TASK_ALWAYS_EAGER = True
 CELERY_TASK_EAGER_PROPAGATES = True
 # Your stuff...
 # ------------------------------------------------------------------------------
+SERVER_TIMING_HEADER = env.bool("DJANGO_SERVER_TIMING_HEADER", default=True)
@@ -133,6 +133,11 @@ ACCOUNT_EMAIL_SUBJECT_PREFIX = EMAIL_SUBJECT_PREFIX
 # Django Admin URL regex.
 ADMIN_URL = env("DJANGO_ADMIN_URL")
 
+# METRICS
+# ------------------------------------------------------------------------------
+# Bearer token of the /metrics scraper (config.metrics).
+METRICS_TOKEN = env("DJANGO_METRICS_TOKEN")
+
 # Anymail
 # ------------------------------------------------------------------------------
 # https://anymail.readthedocs.io/en/stable/installation/#installing-anymail
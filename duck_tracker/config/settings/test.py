@@ -36,3 +36,5 @@ TEMPLATES[0]["OPTIONS"]["debug"] = True  # type: ignore[index]
 MEDIA_URL = "http://media.testserver/"
 # Your stuff...
 # ------------------------------------------------------------------------------
+DUCKS_BROADCAST_BACKEND = "apps.ducks.broadcast.InProcessBroadcast"
+SERVER_TIMING_HEADER = True
@@ -0,0 +1,165 @@
+"""
+Per-request performance timings, sent as ``Server-Timing`` and logged.
+
+``ServerTimingMiddleware`` splits the time of every request into::
+
+    Server-Timing: db;dur=12.1;desc="7 queries", tpl;dur=30.4, app;dur=8.0,
+                   total;dur=50.5
+
+``db`` is every query run through ``connection.execute_wrapper``; ``tpl`` is
+template rendering through the ``TimedDjangoTemplates`` backend (including
+form widgets, which ``FORM_RENDERER`` renders through it), minus the queries
+that rendering ran; ``app`` is the rest of the Python time. The same figures
+are logged as one ``key=value`` line tagged with the URL name, and requests
+slower than ``SLOW_REQUEST_THRESHOLD`` seconds also log every query they ran.
+Streamed response bodies are produced after the middleware returns and are
+not included.
+"""
+
+import logging
+import time
+from contextlib import ExitStack
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from dataclasses import field
+
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import DjangoTemplates
+from django.template.backends.django import Template
+
+logger = logging.getLogger(__name__)
+
+current_timings = ContextVar("current_timings", default=None)
+
+
+@dataclass
+class RequestTimings:
+    """Time spent in the database and in templates during one request."""
+
+    queries: list = field(default_factory=list)  # (sql, seconds)
+    db_time: float = 0.0
+    template_time: float = 0.0
+    template_db_time: float = 0.0
+    template_depth: int = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.queries.append((sql, duration))
+            self.db_time += duration
+            if self.template_depth:
+                self.template_db_time += duration
+
+    @contextmanager
+    def rendering(self):
+        """Time a template render; nested renders count once."""
+        self.template_depth += 1
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.template_depth -= 1
+            if not self.template_depth:
+                self.template_time += time.perf_counter() - started
+
+    def as_metrics(self, total):
+        """Milliseconds per part of the request, summing to ``total_ms``."""
+        template = self.template_time - self.template_db_time
+        return {
+            "db_queries": len(self.queries),
+            "db_ms": round(self.db_time * 1000, 1),
+            "template_ms": round(template * 1000, 1),
+            "app_ms": round((total - self.db_time - template) * 1000, 1),
+            "total_ms": round(total * 1000, 1),
+        }
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        timings = current_timings.get()
+        if timings is None:
+            return super().render(context, request)
+        with timings.rendering():
+            return super().render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """``DjangoTemplates`` whose renders are added to the request's timings."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
+
+
+def server_timing_header(metrics):
+    return ", ".join(
+        [
+            f'db;dur={metrics["db_ms"]};desc="{metrics["db_queries"]} queries"',
+            f"tpl;dur={metrics['template_ms']}",
+            f"app;dur={metrics['app_ms']}",
+            f"total;dur={metrics['total_ms']}",
+        ],
+    )
+
+
+class ServerTimingMiddleware:
+    """Measure every request; keep it first in ``MIDDLEWARE`` to time the rest."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timings))
+                response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        total = time.perf_counter() - started
+
+        metrics = timings.as_metrics(total)
+        if settings.SERVER_TIMING_HEADER:
+            response["Server-Timing"] = server_timing_header(metrics)
+        self.log(request, response, metrics, timings, total)
+        return response
+
+    @staticmethod
+    def log(request, response, metrics, timings, total):
+        match = request.resolver_match
+        fields = {
+            "url_name": match.view_name if match else "-",
+            "method": request.method,
+            "status": response.status_code,
+            **metrics,
+        }
+        slow = total >= settings.SLOW_REQUEST_THRESHOLD
+        logger.log(
+            logging.WARNING if slow else logging.INFO,
+            "request %s",
+            " ".join(f"{key}={value}" for key, value in fields.items()),
+            extra={"timings": fields},
+        )
+        if slow:
+            logger.warning(
+                "slow request %s %s ran %d queries:\n%s",
+                request.method,
+                request.path,
+                len(timings.queries),
+                "\n".join(
+                    f"{duration * 1000:8.1f} ms  {sql}"
+                    for sql, duration in timings.queries
+                ),
+                extra={"timings": fields},
+            )
@@ -1,13 +1,150 @@
+"""
+Websocket protocol of the flock pages.
+
+Frames are JSON text, except the ``ping`` -> ``pong!`` keepalive::
+
+    -> {"action": "subscribe", "flock": 12}
+    <- {"type": "subscribed", "flock": 12}
+    <- {"type": "stats", "flock": 12, "event": "created", "count": 1,
+        "row": {...}, "aggregates": {...}}
+    -> {"action": "unsubscribe", "flock": 12}
+    <- {"type": "unsubscribed", "flock": 12}
+
+A ``stats`` frame is pushed after every committed ``Stats`` write of a
+subscribed flock (see ``apps.ducks.models.publish_stats_change``), through
+the backend of ``apps.ducks.broadcast.get_broadcast``. If the backend fails
+the socket stays open: a failed subscribe is answered with an ``error``
+frame, and a subscription that breaks later ends with one naming its flock::
+
+    <- {"type": "error", "flock": 12, "message": "Live updates stopped..."}
+"""
+
+import asyncio
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+
+from apps.ducks.broadcast import flock_channel
+from apps.ducks.broadcast import get_broadcast
+from apps.ducks.models import Flock
+
+logger = logging.getLogger(__name__)
+
+# Enough for every flock card a page shows; caps the tasks of one socket.
+MAX_SUBSCRIPTIONS = 50
+
+
 async def websocket_application(scope, receive, send):
-    while True:
-        event = await receive()
+    subscriptions = {}
+    try:
+        while True:
+            event = await receive()
+
+            if event["type"] == "websocket.connect":
+                await send({"type": "websocket.accept"})
+
+            if event["type"] == "websocket.disconnect":
+                break
+
+            if event["type"] == "websocket.receive":
+                if event.get("text") == "ping":
+                    await send({"type": "websocket.send", "text": "pong!"})
+                else:
+                    reply = await handle_message(event.get("text"), subscriptions, send)
+                    await send_json(send, reply)
+    finally:
+        for task in subscriptions.values():
+            task.cancel()
+        # Also collects the error of a forwarding task whose send failed.
+        await asyncio.gather(*subscriptions.values(), return_exceptions=True)
+
+
+async def handle_message(text, subscriptions, send):
+    """Apply one client frame to ``subscriptions``; returns the reply."""
+    try:
+        message = json.loads(text or "")
+        action = message["action"]
+        flock_id = int(message["flock"])
+    except (TypeError, ValueError, KeyError):
+        return {"type": "error", "message": "Expected an action and a flock id."}
+
+    if action == "subscribe":
+        return await subscribe(flock_id, subscriptions, send)
+
+    if action == "unsubscribe":
+        task = subscriptions.pop(flock_id, None)
+        if task is not None:
+            task.cancel()
+        return {"type": "unsubscribed", "flock": flock_id}
+
+    return {"type": "error", "message": f"Unknown action {action!r}."}
+
+
+async def subscribe(flock_id, subscriptions, send):
+    task = subscriptions.get(flock_id)
+    if task is not None:
+        if not task.done():
+            return {"type": "subscribed", "flock": flock_id}
+        del subscriptions[flock_id]  # stopped by a backend failure
+    if len(subscriptions) >= MAX_SUBSCRIPTIONS:
+        return {"type": "error", "message": "Too many subscriptions."}
+    if not await flock_exists(flock_id):
+        return {"type": "error", "message": f"Flock {flock_id} does not exist."}
+    task = await start_forwarding(flock_id, send)
+    if task is None:
+        return {"type": "error", "message": "Live updates are unavailable."}
+    subscriptions[flock_id] = task
+    return {"type": "subscribed", "flock": flock_id}
+
+
+@sync_to_async
+def flock_exists(flock_id):
+    return Flock.objects.filter(pk=flock_id).exists()
+
+
+async def start_forwarding(flock_id, send):
+    """Forward the flock's broadcasts to ``send`` until cancelled.
+
+    Returns once the subscription is in place, so no change committed after
+    the ``subscribed`` reply can be missed, or ``None`` if the backend could
+    not subscribe.
+    """
+    subscribed = asyncio.Event()
+
+    async def forward():
+        channel = flock_channel(flock_id)
+        try:
+            async with get_broadcast().subscribe(channel) as messages:
+                subscribed.set()
+                async for message in messages:
+                    await send_json(send, message)
+        except Exception:
+            if not subscribed.is_set():
+                raise
+            logger.exception("Broadcast of flock %s stopped", flock_id)
+            await send_json(
+                send,
+                {
+                    "type": "error",
+                    "flock": flock_id,
+                    "message": "Live updates stopped; subscribe again to resume.",
+                },
+            )
 
-        if event["type"] == "websocket.connect":
-            await send({"type": "websocket.accept"})
+    task = asyncio.create_task(forward())
+    waiter = asyncio.create_task(subscribed.wait())
+    await asyncio.wait({task, waiter}, return_when=asyncio.FIRST_COMPLETED)
+    if not waiter.done():
+        waiter.cancel()
+        logger.error(
+            "Could not subscribe to flock %s",
+            flock_id,
+            exc_info=task.exception(),
+        )
+        return None
+    return task
 
-        if event["type"] == "websocket.disconnect":
-            break
 
-        if event["type"] == "websocket.receive":
-            if event["text"] == "ping":
-                await send({"type": "websocket.send", "text": "pong!"})
+async def send_json(send, message):
+    await send({"type": "websocket.send", "text": json.dumps(message)})